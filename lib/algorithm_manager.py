@@ -4,6 +4,13 @@ from lib.algorithms import Algorithm
 from lib.algorithms.astar import AStar
 from lib.algorithms.bfs import BFS
 from lib.algorithms.bibfs import BiBFS
+from lib.algorithms.bucket_astar import BucketAStar
+from lib.algorithms.flood import Flood
+from lib.algorithms.hpa import HPAStar
+from lib.algorithms.jps import JPS
+from lib.algorithms.level_bfs import LevelBFS
+from lib.algorithms.lpastar import LPAStar
+from lib.algorithms.nbastar import NBAStar
 from lib.grid import Grid
 
 
@@ -14,12 +21,26 @@ class AlgorithmManager:
         AStar,
         BFS,
         BiBFS,
+        LevelBFS,
+        Flood,
+        JPS,
+        BucketAStar,
+        HPAStar,
+        LPAStar,
+        NBAStar,
     )
 
     LABELS: tuple[str, ...] = (
         "A*",
         "BFS",
         "Bi-BFS",
+        "Level BFS",
+        "Flood Fill",
+        "Jump Point Search",
+        "A* (Bucket Queue)",
+        "HPA*",
+        "LPA* (Incremental)",
+        "NBA* (Bidirectional A*)",
     )
 
     algorithm_instance: Algorithm | None
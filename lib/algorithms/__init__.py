@@ -1,4 +1,5 @@
 import abc
+import dataclasses
 
 import numpy as np
 import numpy.typing as npt
@@ -6,11 +7,147 @@ import numpy.typing as npt
 from lib.grid import Grid
 
 
-class Algorithm(abc.ABC):
-    __slots__: tuple[str, ...] = ("grid", "parent", "path", "origin", "target")
+class UnreachableError(ValueError):
+    pass
+
+
+@dataclasses.dataclass(slots=True)
+class Outcome:
+    solution_found: bool
+    steps: int
+    peak_frontier: int
+
+
+class Ledger:
+    __slots__: tuple[str, ...] = ("cells", "closed", "count", "length", "position")
+
+    cells: npt.NDArray[np.int32]
+    closed: int
+    count: int
+    length: int
+    position: npt.NDArray[np.int32]
+
+    def __init__(self, length: int, positions: bool):
+        # every cell seen so far sits in cells, the closed ones first and the
+        # frontier after them, so both snapshots are slices of one buffer
+        # that grows with the search rather than the grid
+        self.cells = np.empty(min(length, 1024), dtype=np.int32)
+        self.closed = 0
+        self.count = 0
+        self.length = length
+
+        # position tells a cell's slot, -1 while it is unseen, searches that
+        # close cells in the order they opened them go without and keep it empty
+        self.position = np.full(length if positions else 0, -1, dtype=np.int32)
+
+    def reserve(self, extra: int) -> npt.NDArray[np.int32]:
+        needed = min(self.count + extra, self.length)
+
+        if needed > len(self.cells):
+            capacity = min(max(needed, len(self.cells) << 1), self.length)
+            cells = np.empty(capacity, dtype=np.int32)
+            cells[: self.count] = self.cells[: self.count]
+            self.cells = cells
+
+        return self.cells
+
+    def swap(self, a: int, b: int):
+        cells = self.cells
+        first = int(cells[a])
+        second = int(cells[b])
+
+        cells[a] = second
+        cells[b] = first
+        self.position[second] = a
+        self.position[first] = b
+
+    def append(self, cell: int):
+        self.reserve(1)[self.count] = cell
+
+        if len(self.position) > 0:
+            self.position[cell] = self.count
+
+        self.count += 1
+
+    def open(self, cell: int):
+        slot = int(self.position[cell])
+
+        if slot < 0:
+            self.append(cell)
+        elif slot < self.closed:
+            self.closed -= 1
+            self.swap(slot, self.closed)
+
+    def close(self, cell: int):
+        slot = int(self.position[cell])
+
+        if slot < 0:
+            self.append(cell)
+            slot = self.count - 1
+
+        if slot >= self.closed:
+            self.swap(slot, self.closed)
+            self.closed += 1
+
+    def discard(self, cell: int):
+        slot = int(self.position[cell])
+
+        if slot < 0:
+            return
+
+        if slot < self.closed:
+            self.closed -= 1
+            self.swap(slot, self.closed)
+            slot = self.closed
 
+        self.count -= 1
+        self.swap(slot, self.count)
+        self.position[cell] = -1
+
+    def extend(self, cells: npt.NDArray[np.intp]):
+        end = self.count + len(cells)
+
+        self.reserve(len(cells))[self.count : end] = cells
+
+        if len(self.position) > 0:
+            self.position[cells] = np.arange(self.count, end, dtype=np.int32)
+
+        self.count = end
+
+    def close_frontier(self):
+        self.closed = self.count
+
+    def explored(self) -> npt.NDArray[np.int32]:
+        return self.cells[: self.count]
+
+    def frontier(self) -> npt.NDArray[np.int32]:
+        return self.cells[self.closed : self.count]
+
+
+class Algorithm(abc.ABC):
+    __slots__: tuple[str, ...] = (
+        "closed",
+        "grid",
+        "ledger",
+        "opened",
+        "origin",
+        "parent",
+        "path",
+        "target",
+    )
+
+    # searches that close cells in the order they opened them, their ledger
+    # keeps no positions
+    CLOSES_IN_ORDER: bool = False
+
+    # distances at or above it count as unreached in int32 distance arrays
+    INFINITY: int = 1 << 30
+
+    closed: list[int] | None
     grid: Grid
-    parent: npt.NDArray[np.intp]
+    ledger: Ledger
+    opened: list[int] | None
+    parent: npt.NDArray[np.int32]
     path: npt.NDArray[np.intp] | None
     origin: int
     target: int
@@ -24,8 +161,15 @@ class Algorithm(abc.ABC):
         if target >= length:
             raise IndexError("target index out of range")
 
+        if not grid.connected(origin, target):
+            raise UnreachableError("target is unreachable from the origin")
+
+        self.closed = None
         self.grid = grid
-        self.parent = np.full(self.grid.height * self.grid.width, -1, dtype=np.intp)
+        self.ledger = Ledger(length, not self.CLOSES_IN_ORDER)
+        self.ledger.append(origin)
+        self.opened = None
+        self.parent = np.full(self.grid.height * self.grid.width, -1, dtype=np.int32)
         self.path = None
         self.origin = origin
         self.target = target
@@ -43,11 +187,50 @@ class Algorithm(abc.ABC):
 
         self.path = np.array(path, dtype=np.intp)
 
-    @abc.abstractmethod
-    def explored(self) -> npt.NDArray[np.intp]: ...
+    def track_changes(self):
+        self.closed = []
+        self.opened = []
 
-    @abc.abstractmethod
-    def frontier(self) -> npt.NDArray[np.intp]: ...
+    def take_changes(self) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]:
+        if self.closed is None or self.opened is None:
+            raise RuntimeError("changes are not being tracked")
+
+        opened = np.array(self.opened, dtype=np.intp)
+        closed = np.array(self.closed, dtype=np.intp)
+
+        self.opened.clear()
+        self.closed.clear()
+
+        return opened, closed
+
+    # both are views into the ledger, valid until the search moves on
+    def explored(self) -> npt.NDArray[np.int32]:
+        return self.ledger.explored()
+
+    def frontier(self) -> npt.NDArray[np.int32]:
+        return self.ledger.frontier()
+
+    def frontier_size(self) -> int:
+        return self.ledger.count - self.ledger.closed
+
+    def repair(self, cells: npt.NDArray[np.intp]) -> bool:
+        # only incremental searches can follow edits to their grid, the rest
+        # report False and are started over
+        return False
+
+    def run_to_completion(self) -> Outcome:
+        # steps only counts the calls that returned None, exactly what a loop
+        # over step() would see, subclasses replace it with a tighter loop
+        step = self.step
+        frontier_size = self.frontier_size
+        steps = 0
+        peak_frontier = frontier_size()
+
+        while (solution_found := step()) is None:
+            steps += 1
+            peak_frontier = max(peak_frontier, frontier_size())
+
+        return Outcome(solution_found, steps, peak_frontier)
 
     @abc.abstractmethod
     def step(self) -> bool | None: ...
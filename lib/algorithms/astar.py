@@ -6,54 +6,141 @@ import numpy.typing as npt
 
 from lib.grid import Grid
 
-from . import Algorithm
+from . import Algorithm, Outcome
 
 
 class AStar(Algorithm):
     __slots__: tuple[str, ...] = ("distance", "queue")
 
-    distance: npt.NDArray[np.int16]
-    queue: list[tuple[int, int]]
+    distance: npt.NDArray[np.int32] | npt.NDArray[np.float64]
+    queue: list[tuple[int | float, int]]
 
     def __init__(self, grid: Grid, origin: int, target: int):
         super().__init__(grid, origin, target)
 
-        self.distance = np.full(grid.height * grid.width, -1, dtype=np.int16)
+        self.distance = np.full(grid.height * grid.width, -1, dtype=grid.cost_type)
         self.distance[self.origin] = 0
-        self.queue = [(self.heuristic(self.origin), self.origin)]
+        self.queue = [(grid.distance(self.origin, self.target), self.origin)]
 
-    def heuristic(self, index: int) -> int:
-        y, x = divmod(index, self.grid.width)
-        ty, tx = divmod(self.target, self.grid.width)
+    @typing.override
+    def run_to_completion(self) -> Outcome:
+        if self.opened is not None:
+            return super().run_to_completion()
+
+        moves = self.grid.moves
+        cells = memoryview(self.ledger.cells)
+        capacity = len(cells)
+        degree = len(self.grid.deltas)
+        distance = memoryview(self.distance)
+        mask = memoryview(self.grid.passable)
+        parent = memoryview(self.parent)
+        position = memoryview(self.ledger.position)
+        queue = self.queue
+        target = self.target
+        estimate = self.grid.distance
+        pop = heapq.heappop
+        push = heapq.heappush
+
+        closed = self.ledger.closed
+        count = self.ledger.count
+
+        solution_found = False
+        steps = 0
+        peak_frontier = count - closed
+
+        while len(queue) > 0:
+            _, cell = pop(queue)
+            slot = position[cell]
+
+            # entries left behind when a cheaper route reached their cell
+            if slot < closed:
+                continue
 
-        return abs(x - tx) + abs(y - ty)
+            # the ledger updates of close() and open() written out in place
+            other = cells[closed]
+            cells[slot] = other
+            position[other] = slot
+            cells[closed] = cell
+            position[cell] = closed
+            closed += 1
 
-    @typing.override
-    def explored(self) -> npt.NDArray[np.intp]:
-        return np.flatnonzero(self.distance > -1)
+            if cell == target:
+                solution_found = True
+                break
 
-    @typing.override
-    def frontier(self) -> npt.NDArray[np.intp]:
-        return np.fromiter((idx for _, idx in self.queue), dtype=np.intp)
+            if count + degree > capacity:
+                self.ledger.count = count
+                cells = memoryview(self.ledger.reserve(degree))
+                capacity = len(cells)
+
+            base = distance[cell]
+
+            for delta, move in moves[mask[cell]]:
+                neighbour = cell + delta
+                cost = base + move
+
+                if -1 < distance[neighbour] <= cost:
+                    continue
+
+                distance[neighbour] = cost
+                parent[neighbour] = cell
+
+                if position[neighbour] < 0:
+                    cells[count] = neighbour
+                    position[neighbour] = count
+                    count += 1
+
+                push(queue, (cost + estimate(neighbour, target), neighbour))
+
+            steps += 1
+
+            peak_frontier = max(peak_frontier, count - closed)
+
+        self.ledger.closed = closed
+        self.ledger.count = count
+
+        return Outcome(solution_found, steps, peak_frontier)
 
     @typing.override
     def step(self) -> bool | None:
-        if len(self.queue) == 0:
-            return False
+        position = self.ledger.position
+
+        while True:
+            if len(self.queue) == 0:
+                return False
+
+            _, cell = heapq.heappop(self.queue)
+
+            if position[cell] >= self.ledger.closed:
+                break
 
-        _, cell = heapq.heappop(self.queue)
+        self.ledger.close(cell)
+
+        if self.closed is not None:
+            self.closed.append(cell)
 
         if cell == self.target:
             return True
 
-        for neighbour in self.grid.neighbours(cell):
-            if self.distance[neighbour] > -1:
+        base = self.distance[cell].item()
+
+        for delta, move in self.grid.moves[self.grid.passable[cell]]:
+            neighbour = cell + delta
+            cost = base + move
+
+            if -1 < self.distance[neighbour] <= cost:
                 continue
 
-            self.distance[neighbour] = self.distance[cell] + 1
+            self.distance[neighbour] = cost
             self.parent[neighbour] = cell
-            score = int(self.distance[neighbour]) + self.heuristic(neighbour)
+            score = cost + self.grid.distance(neighbour, self.target)
 
             heapq.heappush(self.queue, (score, neighbour))
 
+            if position[neighbour] < 0:
+                self.ledger.open(neighbour)
+
+                if self.opened is not None:
+                    self.opened.append(neighbour)
+
         return None
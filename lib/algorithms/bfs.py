@@ -1,51 +1,110 @@
-import collections
 import typing
 
-import numpy as np
-import numpy.typing as npt
-
 from lib.grid import Grid
 
-from . import Algorithm
+from . import Algorithm, Outcome
 
 
 class BFS(Algorithm):
-    __slots__: tuple[str, ...] = ("queue", "_visited")
+    __slots__: tuple[str, ...] = ("_visited",)
+
+    # the ledger's frontier is the queue itself
+    CLOSES_IN_ORDER: bool = True
 
-    queue: collections.deque[int]
-    _visited: npt.NDArray[np.bool_]
+    _visited: bytearray
 
     def __init__(self, grid: Grid, origin: int, target: int):
         super().__init__(grid, origin, target)
 
-        self.queue = collections.deque((self.origin,))
-        self._visited = np.full(grid.height * grid.width, False, dtype=np.bool_)
-        self._visited[self.origin] = True
+        self._visited = bytearray((grid.height * grid.width + 7) >> 3)
+        self._visited[self.origin >> 3] |= 1 << (self.origin & 7)
 
     @typing.override
-    def explored(self) -> npt.NDArray[np.intp]:
-        return np.flatnonzero(self._visited == True)
+    def run_to_completion(self) -> Outcome:
+        if self.opened is not None:
+            return super().run_to_completion()
 
-    @typing.override
-    def frontier(self) -> npt.NDArray[np.intp]:
-        return np.fromiter(self.queue, dtype=np.intp)
+        ledger = self.ledger
+        adjacency = self.grid.adjacency
+        degree = len(self.grid.deltas)
+        mask = memoryview(self.grid.passable)
+        parent = memoryview(self.parent)
+        queue = memoryview(ledger.cells)
+        capacity = len(queue)
+        visited = self._visited
+        target = self.target
+        head = ledger.closed
+        tail = ledger.count
+
+        solution_found = False
+        steps = 0
+        peak_frontier = tail - head
+
+        while head < tail:
+            if tail + degree > capacity:
+                ledger.count = tail
+                queue = memoryview(ledger.reserve(degree))
+                capacity = len(queue)
+
+            cell = queue[head]
+            head += 1
+
+            if cell == target:
+                solution_found = True
+                break
+
+            for delta in adjacency[mask[cell]]:
+                neighbour = cell + delta
+                byte = neighbour >> 3
+                bit = 1 << (neighbour & 7)
+
+                if visited[byte] & bit:
+                    continue
+
+                visited[byte] |= bit
+                parent[neighbour] = cell
+                queue[tail] = neighbour
+                tail += 1
+
+            steps += 1
+
+            peak_frontier = max(peak_frontier, tail - head)
+
+        ledger.closed = head
+        ledger.count = tail
+
+        return Outcome(solution_found, steps, peak_frontier)
 
     @typing.override
     def step(self) -> bool | None:
-        if len(self.queue) == 0:
+        ledger = self.ledger
+
+        if ledger.closed == ledger.count:
             return False
 
-        cell = self.queue.popleft()
+        cell = int(ledger.cells[ledger.closed])
+        ledger.closed += 1
+
+        if self.closed is not None:
+            self.closed.append(cell)
 
         if cell == self.target:
             return True
 
-        for neighbour in self.grid.neighbours(cell):
-            if self._visited[neighbour]:
+        for delta in self.grid.adjacency[self.grid.passable[cell]]:
+            neighbour = cell + delta
+
+            byte = neighbour >> 3
+            bit = 1 << (neighbour & 7)
+
+            if self._visited[byte] & bit:
                 continue
 
-            self.queue.append(neighbour)
+            ledger.append(neighbour)
             self.parent[neighbour] = cell
-            self._visited[neighbour] = True
+            self._visited[byte] |= bit
+
+            if self.opened is not None:
+                self.opened.append(neighbour)
 
         return None
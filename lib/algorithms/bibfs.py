@@ -1,4 +1,3 @@
-import collections
 import enum
 import typing
 
@@ -7,7 +6,7 @@ import numpy.typing as npt
 
 from lib.grid import Grid
 
-from . import Algorithm
+from . import Algorithm, Outcome
 
 
 class Turn(enum.IntEnum):
@@ -17,72 +16,152 @@ class Turn(enum.IntEnum):
 
 
 class BiBFS(Algorithm):
-    __slots__: tuple[str, ...] = ("frontier_count", "queue", "_visited")
+    __slots__: tuple[str, ...] = ("_visited", "frontier_count")
+
+    # both sides share one queue, the ledger's frontier, and a queued cell's
+    # side is the one that visited it
+    CLOSES_IN_ORDER: bool = True
 
     frontier_count: list[int]
-    queue: collections.deque[tuple[int, Turn]]
     _visited: npt.NDArray[np.int8]
 
     def __init__(self, grid: Grid, origin: int, target: int):
         super().__init__(grid, origin, target)
 
+        if self.origin != self.target:
+            self.ledger.append(self.target)
+
         self.frontier_count = [1, 1]
-        self.queue = collections.deque(
-            ((self.origin, Turn.Origin), (self.target, Turn.Target))
-        )
         self._visited = np.full(grid.height * grid.width, Turn.Neither, dtype=np.int8)
         self._visited[self.origin] = Turn.Origin
         self._visited[self.target] = Turn.Target
 
-    @typing.override
-    def explored(self) -> npt.NDArray[np.intp]:
-        return np.flatnonzero(self._visited != Turn.Neither)
+    def splice(self, cell: int, neighbour: int, turn: int):
+        match turn:
+            case Turn.Origin:
+                previous = cell
+                current = neighbour
+            case Turn.Target:
+                previous = neighbour
+                current = cell
+            case _:
+                raise RuntimeError("reached unreachable case")
+        next = int(self.parent[current])
+
+        while current > -1:
+            self.parent[current] = previous
+            previous = current
+            current = next
+
+            if next > -1:
+                next = int(self.parent[next])
 
     @typing.override
-    def frontier(self) -> npt.NDArray[np.intp]:
-        return np.fromiter((idx for idx, _ in self.queue), dtype=np.intp)
+    def run_to_completion(self) -> Outcome:
+        if self.opened is not None:
+            return super().run_to_completion()
+
+        if self.origin == self.target:
+            return Outcome(True, 0, self.frontier_size())
+
+        ledger = self.ledger
+        adjacency = self.grid.adjacency
+        counts = self.frontier_count
+        degree = len(self.grid.deltas)
+        mask = memoryview(self.grid.passable)
+        parent = memoryview(self.parent)
+        queue = memoryview(ledger.cells)
+        capacity = len(queue)
+        visited = memoryview(self._visited)
+        neither = int(Turn.Neither)
+        head = ledger.closed
+        tail = ledger.count
+
+        solution_found = False
+        steps = 0
+        peak_frontier = tail - head
+
+        while head < tail and 0 not in counts:
+            if tail + degree > capacity:
+                ledger.count = tail
+                queue = memoryview(ledger.reserve(degree))
+                capacity = len(queue)
+
+            cell = queue[head]
+            turn = visited[cell]
+            head += 1
+            counts[turn] -= 1
+
+            for delta in adjacency[mask[cell]]:
+                neighbour = cell + delta
+                side = visited[neighbour]
+
+                if side == turn:
+                    continue
+
+                if side != neither:
+                    solution_found = True
+                    break
+
+                queue[tail] = neighbour
+                tail += 1
+                counts[turn] += 1
+                parent[neighbour] = cell
+                visited[neighbour] = turn
+
+            if solution_found:
+                self.splice(cell, neighbour, turn)
+                break
+
+            steps += 1
+            peak_frontier = max(peak_frontier, tail - head)
+
+        ledger.closed = head
+        ledger.count = tail
+
+        return Outcome(solution_found, steps, peak_frontier)
 
     @typing.override
     def step(self) -> bool | None:
-        if len(self.queue) == 0 or any(
-            map(lambda count: count == 0, self.frontier_count)
-        ):
+        ledger = self.ledger
+
+        if self.origin == self.target:
+            return True
+
+        if ledger.closed == ledger.count or 0 in self.frontier_count:
             return False
 
-        cell, turn = self.queue.popleft()
+        visited = self._visited
+
+        cell = int(ledger.cells[ledger.closed])
+        turn = int(visited[cell])
+        ledger.closed += 1
         self.frontier_count[turn] -= 1
 
-        for neighbour in self.grid.neighbours(cell):
-            visited = Turn(self._visited[neighbour])
+        if self.closed is not None:
+            self.closed.append(cell)
+
+        for delta in self.grid.adjacency[self.grid.passable[cell]]:
+            neighbour = cell + delta
 
-            if visited == turn:
+            # compared as plain integers, building a Turn for every neighbour
+            # costs more than the rest of the loop
+            side = int(visited[neighbour])
+
+            if side == turn:
                 continue
 
-            if visited != Turn.Neither and visited != turn:
-                match turn:
-                    case Turn.Origin:
-                        previous = cell
-                        current = neighbour
-                    case Turn.Target:
-                        previous = neighbour
-                        current = cell
-                    case Turn.Neither:
-                        raise RuntimeError("reached unreachable case")
-                next = int(self.parent[current])
-
-                while current > -1:
-                    self.parent[current] = previous
-                    previous = current
-                    current = next
-
-                    if next > -1:
-                        next = int(self.parent[next])
+            if side != Turn.Neither:
+                self.splice(cell, neighbour, turn)
 
                 return True
 
-            self.queue.append((neighbour, turn))
+            ledger.append(neighbour)
             self.frontier_count[turn] += 1
             self.parent[neighbour] = cell
-            self._visited[neighbour] = turn
+            visited[neighbour] = turn
+
+            if self.opened is not None:
+                self.opened.append(neighbour)
 
         return None
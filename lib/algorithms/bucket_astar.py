@@ -0,0 +1,222 @@
+import heapq
+import typing
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.grid import Grid
+
+from . import Algorithm, Outcome
+
+
+class BucketAStar(Algorithm):
+    __slots__: tuple[str, ...] = (
+        "_distance",
+        "_heuristics",
+        "_mask",
+        "buckets",
+        "distance",
+        "heuristics",
+        "lowest",
+        "pop",
+        "push",
+        "size",
+    )
+
+    buckets: list[list[tuple[int | float, int]]]
+    distance: npt.NDArray[np.int32] | npt.NDArray[np.float64]
+    heuristics: npt.NDArray[np.int32] | npt.NDArray[np.float64]
+    lowest: int
+    pop: typing.Callable[[list[tuple[int | float, int]]], tuple[int | float, int]]
+    push: typing.Callable[
+        [list[tuple[int | float, int]], tuple[int | float, int]], None
+    ]
+    size: int
+    _distance: memoryview
+    _heuristics: memoryview
+    _mask: memoryview
+
+    def __init__(self, grid: Grid, origin: int, target: int):
+        super().__init__(grid, origin, target)
+
+        self.heuristics = grid.distances(self.target)
+        self.distance = np.full(grid.height * grid.width, -1, dtype=grid.cost_type)
+        self.distance[self.origin] = 0
+
+        # a bucket holds the scores from its index up to the next one, whole
+        # numbers without diagonal moves so any entry will do, otherwise the
+        # bucket is a heap to pop them in order
+        if grid.connectivity == 8:
+            self.pop, self.push = heapq.heappop, heapq.heappush
+        else:
+            self.pop, self.push = list.pop, list.append
+
+        score = self.heuristics[self.origin].item()
+        self.lowest = int(score)
+        self.buckets = [[] for _ in range(self.lowest)]
+        self.buckets.append([(score, self.origin)])
+
+        # entries across all buckets, stale ones of closed or relabelled cells
+        # included, the frontier itself is the ledger's
+        self.size = 1
+
+        self._distance = memoryview(self.distance)
+        self._heuristics = memoryview(self.heuristics)
+        self._mask = memoryview(grid.passable)
+
+    @typing.override
+    def run_to_completion(self) -> Outcome:
+        if self.opened is not None:
+            return super().run_to_completion()
+
+        moves = self.grid.moves
+        buckets = self.buckets
+        cells = memoryview(self.ledger.cells)
+        capacity = len(cells)
+        degree = len(self.grid.deltas)
+        distance = self._distance
+        heuristics = self._heuristics
+        mask = self._mask
+        parent = memoryview(self.parent)
+        position = memoryview(self.ledger.position)
+        target = self.target
+        lowest = self.lowest
+        pop = self.pop
+        push = self.push
+        size = self.size
+        closed = self.ledger.closed
+        count = self.ledger.count
+
+        solution_found = False
+        steps = 0
+        peak_frontier = count - closed
+
+        while True:
+            while lowest < len(buckets) and len(buckets[lowest]) == 0:
+                lowest += 1
+
+            if lowest == len(buckets):
+                break
+
+            _, cell = pop(buckets[lowest])
+            size -= 1
+            slot = position[cell]
+
+            # entries left behind when a cheaper route reached their cell
+            if slot < closed:
+                continue
+
+            # the ledger updates of close() and open() written out in place
+            other = cells[closed]
+            cells[slot] = other
+            position[other] = slot
+            cells[closed] = cell
+            position[cell] = closed
+            closed += 1
+
+            if cell == target:
+                solution_found = True
+                break
+
+            if count + degree > capacity:
+                self.ledger.count = count
+                cells = memoryview(self.ledger.reserve(degree))
+                capacity = len(cells)
+
+            base = distance[cell]
+
+            for delta, move in moves[mask[cell]]:
+                neighbour = cell + delta
+                cost = base + move
+
+                if -1 < distance[neighbour] <= cost:
+                    continue
+
+                distance[neighbour] = cost
+                parent[neighbour] = cell
+                score = cost + heuristics[neighbour]
+                index = int(score)
+
+                while len(buckets) <= index:
+                    buckets.append([])
+
+                push(buckets[index], (score, neighbour))
+                size += 1
+
+                slot = position[neighbour]
+
+                if slot < 0:
+                    cells[count] = neighbour
+                    position[neighbour] = count
+                    count += 1
+                elif slot < closed:
+                    closed -= 1
+                    other = cells[closed]
+                    cells[slot] = other
+                    position[other] = slot
+                    cells[closed] = neighbour
+                    position[neighbour] = closed
+
+            steps += 1
+
+            peak_frontier = max(peak_frontier, count - closed)
+
+        self.lowest = lowest
+        self.size = size
+        self.ledger.closed = closed
+        self.ledger.count = count
+
+        return Outcome(solution_found, steps, peak_frontier)
+
+    @typing.override
+    def step(self) -> bool | None:
+        buckets = self.buckets
+        distance = self._distance
+        heuristics = self._heuristics
+
+        while True:
+            while self.lowest < len(buckets) and len(buckets[self.lowest]) == 0:
+                self.lowest += 1
+
+            if self.lowest == len(buckets):
+                return False
+
+            _, cell = self.pop(buckets[self.lowest])
+            self.size -= 1
+
+            if self.ledger.position[cell] >= self.ledger.closed:
+                break
+
+        self.ledger.close(cell)
+
+        if self.closed is not None:
+            self.closed.append(cell)
+
+        if cell == self.target:
+            return True
+
+        base = distance[cell]
+
+        for delta, move in self.grid.moves[self._mask[cell]]:
+            neighbour = cell + delta
+            cost = base + move
+
+            if -1 < distance[neighbour] <= cost:
+                continue
+
+            distance[neighbour] = cost
+            self.parent[neighbour] = cell
+            score = cost + heuristics[neighbour]
+            index = int(score)
+
+            while len(buckets) <= index:
+                buckets.append([])
+
+            self.push(buckets[index], (score, neighbour))
+            self.size += 1
+            self.ledger.open(neighbour)
+
+            if self.opened is not None:
+                self.opened.append(neighbour)
+
+        return None
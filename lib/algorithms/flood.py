@@ -0,0 +1,188 @@
+import typing
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.grid import Cell, Grid
+
+from . import Algorithm
+
+
+def pack(mask: npt.NDArray[np.bool_]) -> npt.NDArray[np.uint8]:
+    return np.packbits(mask, axis=1, bitorder="little")
+
+
+def unpack(packed: npt.NDArray[np.uint8], width: int) -> npt.NDArray[np.bool_]:
+    return np.unpackbits(packed, axis=1, count=width, bitorder="little").view(np.bool_)
+
+
+def shift(packed: npt.NDArray[np.uint8], dx: int, dy: int) -> npt.NDArray[np.uint8]:
+    height, _ = packed.shape
+    shifted = np.zeros_like(packed)
+    shifted[max(dy, 0) : height + min(dy, 0)] = packed[
+        max(-dy, 0) : height + min(-dy, 0)
+    ]
+
+    if dx > 0:
+        shifted[:, 1:] = (shifted[:, 1:] << 1) | (shifted[:, :-1] >> 7)
+        shifted[:, 0] <<= 1
+    elif dx < 0:
+        shifted[:, :-1] = (shifted[:, :-1] >> 1) | (shifted[:, 1:] << 7)
+        shifted[:, -1] >>= 1
+
+    return shifted
+
+
+class Dilation:
+    __slots__: tuple[str, ...] = ("columns", "free", "front", "grid", "reached", "rows")
+
+    columns: tuple[int, int]
+    free: npt.NDArray[np.uint8]
+    front: npt.NDArray[np.uint8]
+    grid: Grid
+    reached: npt.NDArray[np.uint8]
+    rows: tuple[int, int]
+
+    def __init__(self, grid: Grid, origin: int):
+        self.free = pack(grid.cells != Cell.WALL)
+        self.front = np.zeros_like(self.free)
+        self.grid = grid
+
+        oy, ox = divmod(origin, grid.width)
+        self.front[oy, ox >> 3] = 1 << (ox & 7)
+        self.reached = self.front.copy()
+        self.columns = (ox >> 3, (ox >> 3) + 1)
+        self.rows = (oy, oy + 1)
+
+    def step(self) -> npt.NDArray[np.uint8] | None:
+        y0 = max(self.rows[0] - 1, 0)
+        y1 = min(self.rows[1] + 1, self.grid.height)
+        x0 = max(self.columns[0] - 1, 0)
+        x1 = min(self.columns[1] + 1, self.free.shape[1])
+
+        front = self.front[y0:y1, x0:x1]
+        moved = front << 1
+        moved |= front >> 1
+        moved[:, 1:] |= front[:, :-1] >> 7
+        moved[:, :-1] |= front[:, 1:] << 7
+        moved[1:] |= front[:-1]
+        moved[:-1] |= front[1:]
+
+        if self.grid.connectivity == 8:
+            free = self.free[y0:y1, x0:x1]
+
+            for dx, dy in self.grid.DIAGONAL_OFFSETS.tolist():
+                moved |= shift(front, dx, dy) & shift(free, dx, 0) & shift(free, 0, dy)
+
+        moved &= self.free[y0:y1, x0:x1] & ~self.reached[y0:y1, x0:x1]
+        rows = np.flatnonzero(moved.any(axis=1))
+
+        if len(rows) == 0:
+            return None
+
+        columns = np.flatnonzero(moved.any(axis=0))
+
+        self.reached[y0:y1, x0:x1] |= moved
+        self.front[y0:y1, x0:x1] = moved
+        self.rows = (y0 + int(rows[0]), y0 + int(rows[-1]) + 1)
+        self.columns = (x0 + int(columns[0]), x0 + int(columns[-1]) + 1)
+
+        return moved
+
+
+class Flood(Algorithm):
+    __slots__: tuple[str, ...] = ("dilation", "distance", "level")
+
+    # a whole wave is the frontier, it closes as the next one opens
+    CLOSES_IN_ORDER: bool = True
+
+    dilation: Dilation
+    distance: npt.NDArray[np.int32]
+    level: npt.NDArray[np.intp]
+
+    def __init__(self, grid: Grid, origin: int, target: int):
+        super().__init__(grid, origin, target)
+
+        self.dilation = Dilation(grid, self.origin)
+        self.distance = np.full(grid.height * grid.width, -1, dtype=np.int32)
+        self.distance[self.origin] = 0
+        self.level = np.array([self.origin], dtype=np.intp)
+
+    def dilate(self) -> bool:
+        y0 = max(self.dilation.rows[0] - 1, 0)
+        x0 = max(self.dilation.columns[0] - 1, 0)
+        moved = self.dilation.step()
+
+        if moved is None:
+            self.level = np.empty(0, dtype=np.intp)
+            self.ledger.close_frontier()
+            return False
+
+        stride = moved.shape[1]
+        offsets = np.flatnonzero(moved)
+        index, bits = np.nonzero(
+            np.unpackbits(moved.reshape(-1)[offsets, None], axis=1, bitorder="little")
+        )
+        offsets = offsets[index]
+        level = (offsets // stride + y0) * self.grid.width
+        level += (offsets % stride + x0) * 8
+        level += bits
+
+        wave = self.distance[self.level[0]]
+        self.distance[level] = wave + 1
+
+        masks = self.grid.passable[level]
+        orphan = np.full(len(level), True, dtype=np.bool_)
+
+        for bit, delta in enumerate(self.grid.deltas):
+            candidate = np.flatnonzero(orphan & ((masks & (1 << bit)) != 0))
+            candidate = candidate[self.distance[level[candidate] + delta] == wave]
+
+            self.parent[level[candidate]] = level[candidate] + delta
+            orphan[candidate] = False
+
+        if self.closed is not None and self.opened is not None:
+            self.closed.extend(self.level.tolist())
+            self.opened.extend(level.tolist())
+
+        self.level = level
+        self.ledger.close_frontier()
+        self.ledger.extend(level)
+
+        return True
+
+    def fill(self):
+        while self.dilate():
+            pass
+
+    @typing.override
+    def step(self) -> bool | None:
+        if self.distance[self.target] > -1:
+            return True
+
+        if not self.dilate():
+            return False
+
+        return None
+
+
+def distance_field(
+    grid: Grid, origin: int
+) -> tuple[npt.NDArray[np.int32], npt.NDArray[np.int32]]:
+    flood = Flood(grid, origin, origin)
+    flood.fill()
+
+    return flood.distance, flood.parent
+
+
+def reachable_packed(grid: Grid, origin: int) -> npt.NDArray[np.uint8]:
+    dilation = Dilation(grid, origin)
+
+    while dilation.step() is not None:
+        pass
+
+    return dilation.reached
+
+
+def reachable(grid: Grid, origin: int) -> npt.NDArray[np.bool_]:
+    return unpack(reachable_packed(grid, origin), grid.width)
@@ -0,0 +1,638 @@
+import heapq
+import math
+import typing
+import weakref
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.grid import Cell, Grid
+
+from . import Algorithm
+
+
+def cluster_distances(
+    free: npt.NDArray[np.unsignedinteger],
+    sources: npt.NDArray[np.intp],
+    owners: npt.NDArray[np.intp],
+    targets: npt.NDArray[np.intp],
+    size: int,
+    connectivity: int,
+) -> npt.NDArray[np.int16]:
+    # every cluster row is a bitset, so one BFS level of a whole batch of
+    # sources costs a handful of shifts over (sources, size) words
+    count = len(free)
+    word = free.dtype.type
+    sy, sx = np.divmod(sources, size)
+    ty, tx = np.divmod(targets, size)
+    rows = owners * size + ty
+    tx = tx.astype(word)
+
+    padded = np.zeros((count, size + 2), dtype=word)
+    padded[:, 1:-1] = free
+    front = np.zeros_like(padded)
+    front[np.arange(count), sy + 1] = word(1) << sx.astype(word)
+    reached = front.copy()
+
+    distance = np.where(targets == sources[owners], 0, -1).astype(np.int16)
+    pending = np.flatnonzero(distance == -1)
+    rows = rows[pending]
+    tx = tx[pending]
+
+    offsets = Grid.NEIGHBOUR_OFFSETS
+
+    if connectivity == 8:
+        offsets = np.concatenate((offsets, Grid.DIAGONAL_OFFSETS))
+
+    def shifted(rows: npt.NDArray[np.unsignedinteger], dx: int, dy: int):
+        rows = rows[:, 1 - dy : 1 - dy + size]
+
+        if dx == 1:
+            return rows << word(1)
+
+        if dx == -1:
+            return rows >> word(1)
+
+        return rows
+
+    level = 0
+
+    while len(pending) > 0:
+        level += 1
+        moved = np.zeros_like(padded)
+        inner = moved[:, 1:-1]
+
+        # a cell is reached from the one a move behind it, diagonal moves
+        # additionally need both cells they pass by
+        for dx, dy in offsets.tolist():
+            if dx != 0 and dy != 0:
+                inner |= (
+                    shifted(front, dx, dy)
+                    & shifted(padded, 0, dy)
+                    & shifted(padded, dx, 0)
+                )
+            else:
+                inner |= shifted(front, dx, dy)
+
+        inner &= free
+        inner &= ~reached[:, 1:-1]
+
+        if not inner.any():
+            break
+
+        reached |= moved
+        front = moved
+
+        hit = (front[:, 1:-1].reshape(-1)[rows] >> tx) & word(1) != 0
+        distance[pending[hit]] = level
+        pending = pending[~hit]
+        rows = rows[~hit]
+        tx = tx[~hit]
+
+    return distance
+
+
+def entrances(
+    pair: npt.NDArray[np.bool_], size: int
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]:
+    length = len(pair)
+    position = np.arange(length)
+
+    previous = np.zeros_like(pair)
+    previous[1:] = pair[:-1]
+    following = np.zeros_like(pair)
+    following[:-1] = pair[1:]
+
+    # runs of open pairs along a border are cut where the clusters end
+    starts = pair & (~previous | (position % size == 0)[:, None])
+    ends = pair & (~following | (position % size == size - 1)[:, None])
+
+    border, start = np.nonzero(starts.T)
+    _, end = np.nonzero(ends.T)
+
+    wide = end - start + 1 >= Abstraction.WIDE_ENTRANCE
+
+    return (
+        np.concatenate((np.where(wide, start, (start + end) // 2), end[wide])),
+        np.concatenate((border, border[wide])),
+    )
+
+
+class Abstraction:
+    __slots__: tuple[str, ...] = (
+        "bits",
+        "cells",
+        "columns",
+        "connectivity",
+        "distances",
+        "links",
+        "nodes",
+        "revision",
+        "rows",
+        "size",
+        "slots",
+        "width",
+    )
+
+    BATCH: int = 8192
+    MAX_SIZE: int = 64
+    WIDE_ENTRANCE: int = 6
+
+    bits: npt.NDArray[np.unsignedinteger]
+    cells: npt.NDArray[np.int8]
+    columns: int
+    connectivity: int
+    distances: list[npt.NDArray[np.int16]]
+    links: dict[int, list[int]]
+    nodes: list[npt.NDArray[np.intp]]
+    revision: int
+    rows: int
+    size: int
+    slots: dict[int, int]
+    width: int
+
+    def __init__(self, grid: Grid, size: int):
+        if not 1 < size <= self.MAX_SIZE:
+            raise ValueError(f"cluster size must be between 2 and {self.MAX_SIZE}")
+
+        self.cells = grid.cells.copy()
+        self.columns = -(-grid.width // size)
+        self.connectivity = grid.connectivity
+        self.revision = grid.revision
+        self.rows = -(-grid.height // size)
+        self.size = size
+        self.width = grid.width
+
+        self.distances = [np.empty((0, 0), dtype=np.int16)] * (self.rows * self.columns)
+        self.nodes = [np.empty(0, dtype=np.intp)] * (self.rows * self.columns)
+
+        self.build()
+
+    def cluster(self, cell: int) -> int:
+        y, x = divmod(cell, self.width)
+
+        return (y // self.size) * self.columns + x // self.size
+
+    def clusters(self, cells: npt.NDArray[np.intp]) -> npt.NDArray[np.intp]:
+        y, x = np.divmod(cells, self.width)
+
+        return (y // self.size) * self.columns + x // self.size
+
+    def local(self, cells: npt.NDArray[np.intp]) -> npt.NDArray[np.intp]:
+        y, x = np.divmod(cells, self.width)
+
+        return (y % self.size) * self.size + x % self.size
+
+    def cells_of(self, cluster: int) -> npt.NDArray[np.intp]:
+        size = self.size
+        ry, rx = divmod(cluster, self.columns)
+        y, x = np.divmod(np.arange(size * size), size)
+        y += ry * size
+        x += rx * size
+
+        inside = (y < self.cells.shape[0]) & (x < self.width)
+
+        return y[inside] * self.width + x[inside]
+
+    def pack(self, clusters: npt.NDArray[np.intp] | None = None):
+        size = self.size
+        height, width = self.cells.shape
+
+        if clusters is None:
+            free = np.zeros((self.rows * size, self.columns * size), dtype=np.bool_)
+            free[:height, :width] = self.cells != Cell.WALL
+            blocks = free.reshape(self.rows, size, self.columns, size).swapaxes(1, 2)
+        else:
+            ry, rx = np.divmod(clusters, self.columns)
+            ys = (ry * size)[:, None] + np.arange(size)
+            xs = (rx * size)[:, None] + np.arange(size)
+            blocks = (
+                self.cells[
+                    np.minimum(ys, height - 1)[:, :, None],
+                    np.minimum(xs, width - 1)[:, None, :],
+                ]
+                != Cell.WALL
+            )
+            blocks &= (ys < height)[:, :, None] & (xs < width)[:, None, :]
+
+        # a cluster row packs into the narrowest word that holds size bits
+        word = np.min_scalar_type((1 << size) - 1)
+        packed = np.packbits(blocks, axis=-1, bitorder="little")
+        words = np.zeros(packed.shape[:-1] + (word.itemsize,), dtype=np.uint8)
+        words[..., : packed.shape[-1]] = packed
+        bits = words.view(word.newbyteorder("<"))[..., 0].reshape(-1, size)
+
+        if clusters is None:
+            self.bits = bits
+        else:
+            self.bits[clusters] = bits
+
+    def measure(
+        self, sources: npt.NDArray[np.intp], targets: list[npt.NDArray[np.intp]]
+    ) -> npt.NDArray[np.int16]:
+        distances: list[npt.NDArray[np.int16]] = []
+
+        # distances from every source to its own targets, laid end to end
+        for start in range(0, len(sources), self.BATCH):
+            batch = sources[start : start + self.BATCH]
+            wanted = targets[start : start + self.BATCH]
+
+            distances.append(
+                cluster_distances(
+                    self.bits[self.clusters(batch)],
+                    self.local(batch),
+                    np.repeat(np.arange(len(batch)), [len(cells) for cells in wanted]),
+                    self.local(np.concatenate(wanted)),
+                    self.size,
+                    self.connectivity,
+                )
+            )
+
+        return np.concatenate(distances)
+
+    def build(self):
+        height, width = self.cells.shape
+        size = self.size
+        free = self.cells != Cell.WALL
+
+        self.pack()
+
+        xs = np.arange(size - 1, width - 1, size)
+        ys = np.arange(size - 1, height - 1, size)
+
+        position, border = entrances(free[:, xs] & free[:, xs + 1], size)
+        west = position * width + xs[border]
+        position, border = entrances((free[ys] & free[ys + 1]).T, size)
+        north = ys[border] * width + position
+
+        upper = np.concatenate((west, north))
+        lower = np.concatenate((west + 1, north + width))
+
+        self.links = {}
+
+        for a, b in zip(upper.tolist(), lower.tolist()):
+            self.links.setdefault(a, []).append(b)
+            self.links.setdefault(b, []).append(a)
+
+        cells = np.unique(np.concatenate((upper, lower)))
+        clusters = self.clusters(cells)
+        order = np.argsort(clusters, kind="stable")
+        cells = cells[order]
+        clusters = clusters[order]
+        bounds = np.searchsorted(clusters, np.arange(self.rows * self.columns + 1))
+
+        self.nodes = [cells[bounds[c] : bounds[c + 1]] for c in range(len(bounds) - 1)]
+        self.slots = dict(
+            zip(cells.tolist(), (np.arange(len(cells)) - bounds[clusters]).tolist())
+        )
+
+        self.connect(range(len(self.nodes)))
+
+    def update(self, dirty: set[int]):
+        height, width = self.cells.shape
+        flat_view = self.cells.reshape(-1)
+        size = self.size
+
+        self.pack(np.array(sorted(dirty), dtype=np.intp))
+
+        # an edit only moves the entrances on the borders of its cluster, a
+        # border is named by the cluster west or north of it
+        borders: set[tuple[int, bool]] = set()
+
+        for cluster in dirty:
+            cy, cx = divmod(cluster, self.columns)
+
+            if cx > 0:
+                borders.add((cluster - 1, True))
+
+            if (cx + 1) * size < width:
+                borders.add((cluster, True))
+
+            if cy > 0:
+                borders.add((cluster - self.columns, False))
+
+            if (cy + 1) * size < height:
+                borders.add((cluster, False))
+
+        around = set(dirty)
+
+        for cluster, vertical in sorted(borders):
+            cy, cx = divmod(cluster, self.columns)
+            around.add(cluster)
+
+            if vertical:
+                x = (cx + 1) * size - 1
+                lines = np.arange(cy * size, min((cy + 1) * size, height)) * width + x
+                step = 1
+                around.add(cluster + 1)
+            else:
+                y = (cy + 1) * size - 1
+                lines = y * width + np.arange(cx * size, min((cx + 1) * size, width))
+                step = width
+                around.add(cluster + self.columns)
+
+            for a in lines.tolist():
+                if step + a in self.links.get(a, ()):
+                    self.unlink(a, a + step)
+
+            pair = (flat_view[lines] != Cell.WALL) & (
+                flat_view[lines + step] != Cell.WALL
+            )
+            position, _ = entrances(pair[:, None], size)
+
+            for a in lines[position].tolist():
+                self.links.setdefault(a, []).append(a + step)
+                self.links.setdefault(a + step, []).append(a)
+
+        stale: list[int] = []
+
+        for cluster in sorted(around):
+            cells = self.cells_of(cluster)
+            nodes = np.array(
+                [cell for cell in cells.tolist() if cell in self.links], dtype=np.intp
+            )
+
+            if cluster in dirty or not np.array_equal(nodes, self.nodes[cluster]):
+                for cell in self.nodes[cluster].tolist():
+                    del self.slots[cell]
+
+                self.slots.update(zip(nodes.tolist(), range(len(nodes))))
+                self.nodes[cluster] = nodes
+                stale.append(cluster)
+
+        self.connect(stale)
+
+    def unlink(self, a: int, b: int):
+        for cell, other in ((a, b), (b, a)):
+            links = self.links[cell]
+            links.remove(other)
+
+            if len(links) == 0:
+                del self.links[cell]
+
+    def connect(self, stale: typing.Iterable[int]):
+        nodes = self.nodes
+
+        for cluster in stale:
+            if len(nodes[cluster]) == 0:
+                self.distances[cluster] = np.empty((0, 0), dtype=np.int16)
+
+        stale = [cluster for cluster in stale if len(nodes[cluster]) > 0]
+
+        if len(stale) == 0:
+            return
+
+        sources = np.concatenate([nodes[cluster] for cluster in stale])
+        distances = self.measure(
+            sources, [nodes[cluster] for cluster in stale for _ in nodes[cluster]]
+        )
+        start = 0
+
+        for cluster in stale:
+            count = len(nodes[cluster])
+            self.distances[cluster] = distances[start : start + count * count].reshape(
+                count, count
+            )
+            start += count * count
+
+    def refresh(self, grid: Grid):
+        if grid.revision == self.revision:
+            return
+
+        changed = grid.edited_since(self.revision)
+
+        if changed is None:
+            changed = np.flatnonzero(self.cells != grid.cells)
+
+        self.cells.reshape(-1)[changed] = grid.cells.reshape(-1)[changed]
+        self.revision = grid.revision
+
+        if len(changed) > 0:
+            self.update(set(self.clusters(changed).tolist()))
+
+    def entry(self, cell: int) -> dict[int, int]:
+        nodes = self.nodes[self.cluster(cell)]
+        distance = self.measure(np.array([cell], dtype=np.intp), [nodes])
+
+        return {
+            node: step
+            for node, step in zip(nodes.tolist(), distance.tolist())
+            if step > -1
+        }
+
+    def within(self, origin: int, target: int) -> int:
+        cells = np.array([origin, target], dtype=np.intp)
+
+        return int(self.measure(cells[:1], [cells[1:]])[0])
+
+    def edges(self, cell: int) -> typing.Iterator[tuple[int, int]]:
+        slot = self.slots.get(cell)
+
+        if slot is None:
+            return
+
+        cluster = self.cluster(cell)
+
+        for node, step in zip(
+            self.nodes[cluster].tolist(), self.distances[cluster][slot].tolist()
+        ):
+            if step > 0:
+                yield node, step
+
+        for node in self.links.get(cell, ()):
+            yield node, 1
+
+    def refine(self, grid: Grid, a: int, b: int) -> list[int]:
+        if a == b:
+            return []
+
+        if b in self.links.get(a, ()):
+            return [b]
+
+        cells = self.cells_of(self.cluster(b))
+        row = self.measure(np.array([b], dtype=np.intp), [cells])
+        distance = dict(zip(cells.tolist(), row.tolist()))
+
+        path: list[int] = []
+        cell = a
+
+        # walk down the distances to b, which never leaves the cluster
+        while cell != b:
+            step = distance[cell] - 1
+            cell = next(
+                cell + delta
+                for delta in grid.adjacency[grid.passable[cell]]
+                if distance.get(cell + delta) == step
+            )
+            path.append(cell)
+
+        return path
+
+
+_abstractions: weakref.WeakKeyDictionary[Grid, dict[int, Abstraction]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def abstraction(grid: Grid, size: int) -> Abstraction:
+    cached = _abstractions.setdefault(grid, {})
+
+    if size in cached:
+        cached[size].refresh(grid)
+    else:
+        cached[size] = Abstraction(grid, size)
+
+    return cached[size]
+
+
+class HPAStar(Algorithm):
+    __slots__: tuple[str, ...] = (
+        "abstraction",
+        "distance",
+        "done",
+        "goals",
+        "queue",
+        "refined",
+        "route",
+        "segment",
+        "starts",
+        "via",
+    )
+
+    CLUSTER_SIZE: int = 16
+
+    abstraction: Abstraction
+    distance: dict[int, int]
+    done: set[int]
+    goals: dict[int, int]
+    queue: list[tuple[int, int]]
+    refined: list[int]
+    route: list[int] | None
+    segment: int
+    starts: dict[int, int]
+    via: dict[int, int]
+
+    def __init__(self, grid: Grid, origin: int, target: int):
+        super().__init__(grid, origin, target)
+
+        self.abstraction = abstraction(grid, self.CLUSTER_SIZE)
+
+        # origin and target join the abstract graph for this query only
+        self.starts = self.abstraction.entry(self.origin)
+        self.goals = self.abstraction.entry(self.target)
+
+        if self.abstraction.cluster(self.origin) == self.abstraction.cluster(
+            self.target
+        ):
+            step = self.abstraction.within(self.origin, self.target)
+
+            if step > -1:
+                self.starts[self.target] = step
+
+        # the abstract graph weighs its edges in moves, breadth first within
+        # clusters, so its bound counts moves as well rather than pricing them
+        self.distance = {self.origin: 0}
+        self.done = set()
+        self.queue = [(self.grid.hops(self.origin, self.target), self.origin)]
+        self.refined = []
+        self.route = None
+        self.segment = 0
+        self.via = {}
+
+    def edges(self, cell: int) -> typing.Iterator[tuple[int, int]]:
+        if cell == self.origin:
+            yield from self.starts.items()
+
+        yield from self.abstraction.edges(cell)
+
+        if cell in self.goals:
+            yield self.target, self.goals[cell]
+
+    @typing.override
+    def frontier_size(self) -> int:
+        return len(self.queue)
+
+    @typing.override
+    def construct_path(self):
+        path = [self.origin]
+        seen = {self.origin: 0}
+
+        # refined segments may step back over cells, cut those detours out
+        for cell in self.refined:
+            if cell in seen:
+                del path[seen[cell] + 1 :]
+                seen = {cell: index for index, cell in enumerate(path)}
+            else:
+                seen[cell] = len(path)
+                path.append(cell)
+
+        self.path = np.array(path, dtype=np.intp)
+
+    def search(self) -> bool | None:
+        if len(self.queue) == 0:
+            return False
+
+        _, cell = heapq.heappop(self.queue)
+
+        if cell in self.done:
+            return None
+
+        self.done.add(cell)
+        self.ledger.close(cell)
+
+        if self.closed is not None:
+            self.closed.append(cell)
+
+        if cell == self.target:
+            self.route = [cell]
+
+            while self.route[-1] != self.origin:
+                self.route.append(self.via[self.route[-1]])
+
+            self.route.reverse()
+            return None
+
+        for neighbour, step in self.edges(cell):
+            distance = self.distance[cell] + step
+
+            if distance >= self.distance.get(neighbour, math.inf):
+                continue
+
+            self.distance[neighbour] = distance
+            self.via[neighbour] = cell
+            heapq.heappush(
+                self.queue,
+                (distance + self.grid.hops(neighbour, self.target), neighbour),
+            )
+            self.ledger.open(neighbour)
+
+            if self.opened is not None:
+                self.opened.append(neighbour)
+
+        return None
+
+    @typing.override
+    def step(self) -> bool | None:
+        if self.route is None:
+            return self.search()
+
+        if self.segment == len(self.route) - 1:
+            return True
+
+        # the abstract route is refined one segment per step
+        cells = self.abstraction.refine(
+            self.grid, self.route[self.segment], self.route[self.segment + 1]
+        )
+        self.refined.extend(cells)
+        self.segment += 1
+
+        for cell in cells:
+            self.ledger.close(cell)
+
+        if self.closed is not None:
+            self.closed.extend(cells)
+
+        if self.segment == len(self.route) - 1:
+            return True
+
+        return None
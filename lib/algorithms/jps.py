@@ -0,0 +1,177 @@
+import heapq
+import typing
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.grid import Grid
+
+from . import Algorithm
+
+
+class JPS(Algorithm):
+    __slots__: tuple[str, ...] = ("_closed", "_mask", "bits", "distance", "queue")
+
+    bits: dict[tuple[int, int], int]
+    distance: npt.NDArray[np.float64]
+    queue: list[tuple[float, int]]
+    _closed: npt.NDArray[np.bool_]
+    _mask: memoryview
+
+    def __init__(self, grid: Grid, origin: int, target: int):
+        super().__init__(grid, origin, target)
+
+        self.bits = {
+            (dx, dy): bit for bit, (dx, dy) in enumerate(grid.offsets.tolist())
+        }
+        self.distance = np.full(grid.height * grid.width, np.inf, dtype=np.float64)
+        self.distance[self.origin] = 0
+        self.queue = [(grid.distance(self.origin, self.target), self.origin)]
+        self._closed = np.full(grid.height * grid.width, False, dtype=np.bool_)
+        self._mask = memoryview(grid.passable)
+
+    @typing.override
+    def construct_path(self):
+        super().construct_path()
+        assert self.path is not None
+
+        path = [int(self.path[0])]
+
+        for jump_point in self.path[1:].tolist():
+            y, x = divmod(path[-1], self.grid.width)
+            ty, tx = divmod(jump_point, self.grid.width)
+            delta = (ty > y) - (ty < y)
+            delta = delta * self.grid.width + (tx > x) - (tx < x)
+
+            while path[-1] != jump_point:
+                path.append(path[-1] + delta)
+
+        self.path = np.array(path, dtype=np.intp)
+
+    def directions(self, cell: int) -> list[int]:
+        parent = int(self.parent[cell])
+
+        if parent == -1:
+            candidates = self.bits.keys()
+        else:
+            y, x = divmod(cell, self.grid.width)
+            py, px = divmod(parent, self.grid.width)
+            dx = (x > px) - (x < px)
+            dy = (y > py) - (y < py)
+
+            if dx != 0 and dy != 0:
+                candidates = [(dx, 0), (0, dy), (dx, dy)]
+            elif dx != 0:
+                candidates = [(dx, 0), (0, -1), (0, 1), (dx, -1), (dx, 1)]
+            else:
+                candidates = [(0, dy), (-1, 0), (1, 0), (-1, dy), (1, dy)]
+
+        mask = self._mask[cell]
+
+        return [
+            self.bits[direction]
+            for direction in candidates
+            if direction in self.bits and mask >> self.bits[direction] & 1
+        ]
+
+    def jump(self, cell: int, bit: int) -> int:
+        dx, dy = self.grid.offsets[bit].tolist()
+
+        if dx != 0 and dy != 0:
+            return self.jump_diagonal(cell, bit, self.bits[dx, 0], self.bits[0, dy])
+
+        return self.jump_straight(cell, bit)
+
+    def jump_diagonal(self, cell: int, bit: int, horizontal: int, vertical: int) -> int:
+        delta = self.grid.deltas[bit]
+
+        while self._mask[cell] >> bit & 1:
+            cell += delta
+
+            if cell == self.target:
+                return cell
+
+            if (
+                self.jump_straight(cell, horizontal) != -1
+                or self.jump_straight(cell, vertical) != -1
+            ):
+                return cell
+
+        return -1
+
+    def jump_straight(self, cell: int, bit: int) -> int:
+        mask = self._mask
+        delta = self.grid.deltas[bit]
+        dx, dy = self.grid.offsets[bit].tolist()
+
+        back = self.bits[-dx, -dy]
+        side_a = self.bits[dy, dx]
+        side_b = self.bits[-dy, -dx]
+        delta_a = self.grid.deltas[side_a]
+        delta_b = self.grid.deltas[side_b]
+
+        branch = self.grid.connectivity == 4 and dy != 0
+
+        while mask[cell] >> bit & 1:
+            cell += delta
+
+            if cell == self.target:
+                return cell
+
+            sides = mask[cell]
+
+            if (sides >> side_a & 1 and not mask[cell + delta_a] >> back & 1) or (
+                sides >> side_b & 1 and not mask[cell + delta_b] >> back & 1
+            ):
+                return cell
+
+            if branch and (
+                self.jump_straight(cell, side_a) != -1
+                or self.jump_straight(cell, side_b) != -1
+            ):
+                return cell
+
+        return -1
+
+    @typing.override
+    def step(self) -> bool | None:
+        while True:
+            if len(self.queue) == 0:
+                return False
+
+            _, cell = heapq.heappop(self.queue)
+
+            if not self._closed[cell]:
+                break
+
+        self._closed[cell] = True
+        self.ledger.close(cell)
+
+        if self.closed is not None:
+            self.closed.append(cell)
+
+        if cell == self.target:
+            return True
+
+        for bit in self.directions(cell):
+            jump_point = self.jump(cell, bit)
+
+            if jump_point == -1 or self._closed[jump_point]:
+                continue
+
+            distance = self.distance[cell] + self.grid.distance(cell, jump_point)
+
+            if distance >= self.distance[jump_point]:
+                continue
+
+            self.distance[jump_point] = distance
+            self.parent[jump_point] = cell
+            score = float(distance) + self.grid.distance(jump_point, self.target)
+
+            heapq.heappush(self.queue, (score, jump_point))
+            self.ledger.open(jump_point)
+
+            if self.opened is not None:
+                self.opened.append(jump_point)
+
+        return None
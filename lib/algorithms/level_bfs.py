@@ -0,0 +1,68 @@
+import typing
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.grid import Grid
+
+from . import Algorithm
+
+
+class LevelBFS(Algorithm):
+    __slots__: tuple[str, ...] = ("_visited", "level")
+
+    # a whole level is the frontier, it closes as the next one opens
+    CLOSES_IN_ORDER: bool = True
+
+    level: npt.NDArray[np.intp]
+    _visited: npt.NDArray[np.uint8]
+
+    def __init__(self, grid: Grid, origin: int, target: int):
+        super().__init__(grid, origin, target)
+
+        self.level = np.array([self.origin], dtype=np.intp)
+        self._visited = np.zeros((grid.height * grid.width + 7) >> 3, dtype=np.uint8)
+        self._visited[self.origin >> 3] = 1 << (self.origin & 7)
+
+    @typing.override
+    def step(self) -> bool | None:
+        if len(self.level) == 0:
+            return False
+
+        if self._visited[self.target >> 3] >> (self.target & 7) & 1:
+            return True
+
+        masks = self.grid.passable[self.level]
+        neighbours: list[npt.NDArray[np.intp]] = []
+        parents: list[npt.NDArray[np.intp]] = []
+
+        for bit, delta in enumerate(self.grid.deltas):
+            cells = self.level[(masks & (1 << bit)) != 0]
+
+            neighbours.append(cells + delta)
+            parents.append(cells)
+
+        neighbour = np.concatenate(neighbours)
+        parent = np.concatenate(parents)
+
+        unvisited = (self._visited[neighbour >> 3] >> (neighbour & 7) & 1) == 0
+        neighbour = neighbour[unvisited]
+        parent = parent[unvisited]
+
+        self.parent[neighbour] = parent
+        unique = self.parent[neighbour] == parent
+
+        if self.closed is not None and self.opened is not None:
+            self.closed.extend(self.level.tolist())
+            self.opened.extend(neighbour[unique].tolist())
+
+        self.level = neighbour[unique]
+        self.ledger.close_frontier()
+        self.ledger.extend(self.level)
+        np.bitwise_or.at(
+            self._visited,
+            self.level >> 3,
+            (1 << (self.level & 7)).astype(np.uint8),
+        )
+
+        return None
@@ -0,0 +1,179 @@
+import heapq
+import typing
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.grid import Cell, Grid
+
+from . import Algorithm
+
+
+class LPAStar(Algorithm):
+    __slots__: tuple[str, ...] = (
+        "_cells",
+        "_distance",
+        "_lookahead",
+        "_mask",
+        "distance",
+        "lookahead",
+        "queue",
+    )
+
+    distance: npt.NDArray[np.int32] | npt.NDArray[np.float64]
+    lookahead: npt.NDArray[np.int32] | npt.NDArray[np.float64]
+    queue: list[tuple[int | float, int | float, int]]
+    _cells: memoryview
+    _distance: memoryview
+    _lookahead: memoryview
+    _mask: memoryview
+
+    def __init__(self, grid: Grid, origin: int, target: int):
+        super().__init__(grid, origin, target)
+
+        # distance is g and lookahead is rhs in the LPA* papers, a cell whose
+        # two values differ is inconsistent and waits in the queue
+        self.distance = np.full(
+            grid.height * grid.width, self.INFINITY, dtype=grid.cost_type
+        )
+        self.lookahead = self.distance.copy()
+        self.lookahead[self.origin] = 0
+
+        self._cells = memoryview(grid.cells.reshape(-1))
+        self._distance = memoryview(self.distance)
+        self._lookahead = memoryview(self.lookahead)
+        self._mask = memoryview(grid.passable)
+
+        self.queue = [(*self.key(self.origin), self.origin)]
+
+    def key(self, cell: int) -> tuple[int | float, int | float]:
+        best = min(self._distance[cell], self._lookahead[cell])
+
+        return best + self.grid.distance(cell, self.target), best
+
+    def update(self, cell: int):
+        distance = self._distance
+
+        if cell != self.origin:
+            if self._cells[cell] == Cell.WALL:
+                self._lookahead[cell] = self.INFINITY
+            else:
+                self._lookahead[cell] = min(
+                    min(
+                        (
+                            distance[cell + delta] + move
+                            for delta, move in self.grid.moves[self._mask[cell]]
+                        ),
+                        default=self.INFINITY,
+                    ),
+                    self.INFINITY,
+                )
+
+        if distance[cell] != self._lookahead[cell]:
+            heapq.heappush(self.queue, (*self.key(cell), cell))
+
+            if self.opened is not None:
+                self.opened.append(cell)
+
+        self.classify(cell)
+
+    def classify(self, cell: int):
+        # inconsistent cells are the frontier and consistent ones with a
+        # distance are closed, repairs can move a cell back either way
+        if self._distance[cell] != self._lookahead[cell]:
+            self.ledger.open(cell)
+        elif self._distance[cell] < self.INFINITY:
+            self.ledger.close(cell)
+        else:
+            self.ledger.discard(cell)
+
+    @typing.override
+    def repair(self, cells: npt.NDArray[np.intp]) -> bool:
+        height, width = self.grid.height, self.grid.width
+        touched: set[int] = set()
+
+        # a changed cell also decides the diagonal moves around it, so every
+        # cell of its 3x3 block may have lost or gained a predecessor
+        for cell in cells.tolist():
+            y, x = divmod(cell, width)
+
+            touched.update(
+                ny * width + nx
+                for ny in range(max(y - 1, 0), min(y + 2, height))
+                for nx in range(max(x - 1, 0), min(x + 2, width))
+            )
+
+        for cell in sorted(touched):
+            self.update(cell)
+
+        self.path = None
+
+        return True
+
+    @typing.override
+    def construct_path(self):
+        distance = self._distance
+        path = [self.target]
+        cell = self.target
+
+        # the predecessor that prices the cell is the one a move away
+        # with the cheapest distance plus that move
+        while cell != self.origin:
+            cell = min(
+                (
+                    (distance[cell + delta] + move, cell + delta)
+                    for delta, move in self.grid.moves[self._mask[cell]]
+                )
+            )[1]
+            path.append(cell)
+
+        path.reverse()
+
+        self.path = np.array(path, dtype=np.intp)
+
+    @typing.override
+    def frontier_size(self) -> int:
+        return len(self.queue)
+
+    @typing.override
+    def step(self) -> bool | None:
+        distance = self._distance
+        lookahead = self._lookahead
+        queue = self.queue
+
+        # entries are never removed in place, one is current only while its
+        # cell is inconsistent and its key still matches
+        while len(queue) > 0:
+            primary, secondary, cell = queue[0]
+
+            if distance[cell] != lookahead[cell] and (
+                primary,
+                secondary,
+            ) == self.key(cell):
+                break
+
+            heapq.heappop(queue)
+
+        target = self.target
+
+        if len(queue) == 0 or (
+            queue[0][:2] >= self.key(target) and distance[target] == lookahead[target]
+        ):
+            return distance[target] < self.INFINITY
+
+        _, _, cell = heapq.heappop(queue)
+
+        if self.closed is not None:
+            self.closed.append(cell)
+
+        if distance[cell] > lookahead[cell]:
+            distance[cell] = lookahead[cell]
+            self.classify(cell)
+        else:
+            distance[cell] = self.INFINITY
+            self.update(cell)
+
+        for delta in self.grid.adjacency[self._mask[cell]]:
+            self.update(cell + delta)
+
+        return None
@@ -0,0 +1,282 @@
+import heapq
+import typing
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.grid import Grid
+
+from . import Algorithm, Outcome
+
+
+class NBAStar(Algorithm):
+    __slots__: tuple[str, ...] = (
+        "_distances",
+        "_heuristics",
+        "_mask",
+        "_parents",
+        "_settled",
+        "distances",
+        "heuristics",
+        "length",
+        "meeting",
+        "queues",
+        "settled",
+        "successor",
+    )
+
+    distances: tuple[
+        npt.NDArray[np.int32] | npt.NDArray[np.float64],
+        npt.NDArray[np.int32] | npt.NDArray[np.float64],
+    ]
+    heuristics: tuple[
+        npt.NDArray[np.int32] | npt.NDArray[np.float64],
+        npt.NDArray[np.int32] | npt.NDArray[np.float64],
+    ]
+    length: int | float
+    meeting: int
+    queues: tuple[
+        list[tuple[int | float, int | float, int]],
+        list[tuple[int | float, int | float, int]],
+    ]
+    settled: npt.NDArray[np.bool_]
+    successor: npt.NDArray[np.int32]
+    _distances: tuple[memoryview, memoryview]
+    _heuristics: tuple[memoryview, memoryview]
+    _mask: memoryview
+    _parents: tuple[memoryview, memoryview]
+    _settled: memoryview
+
+    def __init__(self, grid: Grid, origin: int, target: int):
+        super().__init__(grid, origin, target)
+
+        length = grid.height * grid.width
+
+        # the forward search runs from the origin towards the target and the
+        # backward one the other way round, each side is indexed 0 and 1
+        self.heuristics = (grid.distances(self.target), grid.distances(self.origin))
+        self.distances = (
+            np.full(length, self.INFINITY, dtype=grid.cost_type),
+            np.full(length, self.INFINITY, dtype=grid.cost_type),
+        )
+        self.distances[0][self.origin] = 0
+        self.distances[1][self.target] = 0
+        self.successor = np.full(length, -1, dtype=np.int32)
+
+        # a cell settled by either side is never expanded or relabelled again,
+        # that is the set M of the NBA* paper
+        self.settled = np.zeros(length, dtype=np.bool_)
+
+        self.ledger.open(self.target)
+        self.length = 0 if self.origin == self.target else self.INFINITY
+        self.meeting = self.origin
+        self.queues = (
+            [(self.heuristics[0][self.origin].item(), 0, self.origin)],
+            [(self.heuristics[1][self.target].item(), 0, self.target)],
+        )
+
+        self._distances = (memoryview(self.distances[0]), memoryview(self.distances[1]))
+        self._heuristics = (
+            memoryview(self.heuristics[0]),
+            memoryview(self.heuristics[1]),
+        )
+        self._mask = memoryview(grid.passable)
+        self._parents = (memoryview(self.parent), memoryview(self.successor))
+        self._settled = memoryview(self.settled)
+
+    def splice(self):
+        parent = self._parents[0]
+        successor = self._parents[1]
+        current = self.meeting
+        following = successor[current]
+
+        # the backward tree points towards the target, reversing the stretch
+        # after the meeting cell leaves a single chain that ends at the origin
+        while following > -1:
+            parent[following] = current
+            current = following
+            following = successor[current]
+
+    @typing.override
+    def run_to_completion(self) -> Outcome:
+        if self.opened is not None:
+            return super().run_to_completion()
+
+        moves = self.grid.moves
+        cells = memoryview(self.ledger.cells)
+        capacity = len(cells)
+        degree = len(self.grid.deltas)
+        distances = self._distances
+        heuristics = self._heuristics
+        mask = self._mask
+        parents = self._parents
+        position = memoryview(self.ledger.position)
+        settled = self._settled
+        forward, backward = self.queues
+        queues = self.queues
+        length = self.length
+        meeting = self.meeting
+        closed = self.ledger.closed
+        count = self.ledger.count
+        pop = heapq.heappop
+        push = heapq.heappush
+
+        steps = 0
+        peak_frontier = count - closed
+
+        while (
+            len(forward) > 0
+            and len(backward) > 0
+            and forward[0][0] < length
+            and backward[0][0] < length
+        ):
+            side = 0 if len(forward) <= len(backward) else 1
+            queue = queues[side]
+            _, _, cell = pop(queue)
+            steps += 1
+
+            if not settled[cell]:
+                settled[cell] = True
+
+                # the ledger updates of close() and open() written out in place
+                slot = position[cell]
+                other = cells[closed]
+                cells[slot] = other
+                position[other] = slot
+                cells[closed] = cell
+                position[cell] = closed
+                closed += 1
+
+                distance = distances[side]
+                heuristic = heuristics[side]
+                cost = distance[cell]
+
+                if (
+                    cost + heuristic[cell] < length
+                    and cost + queues[1 - side][0][0] - heuristics[1 - side][cell]
+                    < length
+                ):
+                    if count + degree > capacity:
+                        self.ledger.count = count
+                        cells = memoryview(self.ledger.reserve(degree))
+                        capacity = len(cells)
+
+                    other_distance = distances[1 - side]
+                    parent = parents[side]
+                    base = cost
+
+                    for delta, move in moves[mask[cell]]:
+                        neighbour = cell + delta
+                        cost = base + move
+
+                        if settled[neighbour] or distance[neighbour] <= cost:
+                            continue
+
+                        distance[neighbour] = cost
+                        parent[neighbour] = cell
+                        push(queue, (cost + heuristic[neighbour], -cost, neighbour))
+
+                        if position[neighbour] < 0:
+                            cells[count] = neighbour
+                            position[neighbour] = count
+                            count += 1
+
+                        total = cost + other_distance[neighbour]
+
+                        if total < length:
+                            length = total
+                            meeting = neighbour
+
+            peak_frontier = max(peak_frontier, count - closed)
+
+        self.length = length
+        self.meeting = meeting
+        self.ledger.closed = closed
+        self.ledger.count = count
+
+        if length == self.INFINITY:
+            return Outcome(False, steps, peak_frontier)
+
+        self.splice()
+
+        return Outcome(True, steps, peak_frontier)
+
+    @typing.override
+    def step(self) -> bool | None:
+        queues = self.queues
+        settled = self._settled
+
+        # the lowest key of a side bounds every path it has yet to find, once
+        # either bound reaches the best meeting no shorter path is left
+        if (
+            len(queues[0]) == 0
+            or len(queues[1]) == 0
+            or queues[0][0][0] >= self.length
+            or queues[1][0][0] >= self.length
+        ):
+            if self.length == self.INFINITY:
+                return False
+
+            self.splice()
+
+            return True
+
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        queue = queues[side]
+
+        # stale entries stay in the heap until they surface
+        _, _, cell = heapq.heappop(queue)
+
+        if settled[cell]:
+            return None
+
+        settled[cell] = True
+        self.ledger.close(cell)
+
+        if self.closed is not None:
+            self.closed.append(cell)
+
+        distance = self._distances[side]
+        heuristic = self._heuristics[side]
+        other_distance = self._distances[1 - side]
+        other_heuristic = self._heuristics[1 - side]
+        other_queue = queues[1 - side]
+        parent = self._parents[side]
+
+        cost = distance[cell]
+
+        # a cell is rejected when every path through it is already known to
+        # be no shorter than the best meeting, judged against either side
+        if (
+            cost + heuristic[cell] >= self.length
+            or cost + other_queue[0][0] - other_heuristic[cell] >= self.length
+        ):
+            return None
+
+        base = cost
+
+        for delta, move in self.grid.moves[self._mask[cell]]:
+            neighbour = cell + delta
+            cost = base + move
+
+            if settled[neighbour] or distance[neighbour] <= cost:
+                continue
+
+            distance[neighbour] = cost
+            parent[neighbour] = cell
+
+            # among equal keys the deeper cell goes first, it is the closer to
+            # meeting the other side
+            heapq.heappush(queue, (cost + heuristic[neighbour], -cost, neighbour))
+            self.ledger.open(neighbour)
+
+            if self.opened is not None:
+                self.opened.append(neighbour)
+
+            total = cost + other_distance[neighbour]
+
+            if total < self.length:
+                self.length = total
+                self.meeting = neighbour
+
+        return None
@@ -0,0 +1,345 @@
+import concurrent.futures
+import contextlib
+import dataclasses
+import itertools
+import resource
+import sys
+import time
+import tracemalloc
+import typing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from lib.algorithms import Algorithm, UnreachableError
+from lib.distance_cache import DistanceCache
+from lib.grid import Generator, Grid
+
+
+@dataclasses.dataclass(slots=True)
+class Statistics:
+    solved: bool
+    path_length: int | None
+    path_cost: float | None
+    expanded: int
+    peak_frontier: int
+    seconds: float
+    peak_memory: int
+    traced_memory: int | None
+
+
+def peak_rss() -> int:
+    # the high-water mark of the whole process so far, cheap enough to take
+    # for every query, ru_maxrss counts kilobytes except on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return peak if sys.platform == "darwin" else peak << 10
+
+
+def solve(
+    algorithm_type: type[Algorithm],
+    grid: Grid,
+    origin: int,
+    target: int,
+    trace_memory: bool = False,
+) -> Statistics:
+    if trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+
+    path = None
+    expanded = 0
+    peak_frontier = 0
+
+    try:
+        algorithm = algorithm_type(grid, origin, target)
+    except UnreachableError:
+        solution_found = False
+    else:
+        outcome = algorithm.run_to_completion()
+        solution_found = outcome.solution_found
+        peak_frontier = outcome.peak_frontier
+
+        # steps also count stale pops and other bookkeeping, the ledger knows
+        # how many cells were actually closed
+        expanded = algorithm.ledger.closed
+
+        if solution_found:
+            algorithm.construct_path()
+            path = algorithm.path
+
+    seconds = time.perf_counter() - start
+
+    traced_memory = None
+
+    if trace_memory:
+        _, traced_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return Statistics(
+        solved=solution_found,
+        path_length=None if path is None else len(path) - 1,
+        path_cost=None if path is None else grid.path_cost(path),
+        expanded=expanded,
+        peak_frontier=peak_frontier,
+        seconds=seconds,
+        peak_memory=peak_rss(),
+        traced_memory=traced_memory,
+    )
+
+
+def solve_cached(
+    cache: DistanceCache,
+    grid: Grid,
+    origin: int,
+    target: int,
+    trace_memory: bool = False,
+) -> Statistics:
+    if trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    path = cache.path(grid, origin, target)
+    seconds = time.perf_counter() - start
+
+    traced_memory = None
+
+    if trace_memory:
+        _, traced_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return Statistics(
+        solved=path is not None,
+        path_length=None if path is None else len(path) - 1,
+        path_cost=None if path is None else grid.path_cost(path),
+        expanded=0,
+        peak_frontier=0,
+        seconds=seconds,
+        peak_memory=peak_rss(),
+        traced_memory=traced_memory,
+    )
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class Query:
+    # queries without an algorithm are answered from cached distance fields
+    algorithm: type[Algorithm] | None
+    kernel: str | None
+    origin: int
+    target: int
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class Layout:
+    names: tuple[str, ...]
+    height: int
+    width: int
+    connectivity: int
+
+
+class SharedGrid:
+    __slots__: tuple[str, ...] = ("blocks", "layout")
+
+    blocks: list[shared_memory.SharedMemory]
+    layout: Layout
+
+    def __init__(self, grid: Grid):
+        self.blocks = []
+
+        for array in (grid.cells, grid.passable, grid.components):
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, array.dtype, block.buf)[...] = array
+            self.blocks.append(block)
+
+        self.layout = Layout(
+            tuple(block.name for block in self.blocks),
+            grid.height,
+            grid.width,
+            grid.connectivity,
+        )
+
+    def __enter__(self) -> typing.Self:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+
+        self.blocks.clear()
+
+
+def attach(layout: Layout) -> tuple[Grid, list[shared_memory.SharedMemory]]:
+    # the creating process owns the blocks, workers must not unlink them on exit
+    blocks = [shared_memory.SharedMemory(name, track=False) for name in layout.names]
+    length = layout.height * layout.width
+
+    grid = Grid(
+        np.ndarray((layout.height, layout.width), np.int8, blocks[0].buf),
+        layout.connectivity,
+        np.ndarray(length, np.uint8, blocks[1].buf),
+        np.ndarray(length, np.int32, blocks[2].buf),
+    )
+
+    return grid, blocks
+
+
+class Solver:
+    __slots__: tuple[str, ...] = (
+        "blocks",
+        "cache",
+        "connectivity",
+        "generated",
+        "generator",
+        "grid",
+        "height",
+        "kernel",
+        "trace_memory",
+        "width",
+    )
+
+    blocks: list[shared_memory.SharedMemory]
+    cache: DistanceCache
+    connectivity: int
+    generated: Grid | None
+    generator: Generator
+    grid: Grid | None
+    height: int
+    kernel: tuple[str, int, int] | None
+    trace_memory: bool
+    width: int
+
+    def __init__(
+        self,
+        grid: Grid | None,
+        height: int,
+        width: int,
+        connectivity: int,
+        generator: Generator,
+        trace_memory: bool,
+        cache_budget: int = DistanceCache.DEFAULT_BUDGET,
+    ):
+        self.blocks = []
+        self.cache = DistanceCache(cache_budget)
+        self.connectivity = connectivity
+        self.generated = None
+        self.generator = generator
+        self.grid = grid
+        self.height = height
+        self.kernel = None
+        self.trace_memory = trace_memory
+        self.width = width
+
+    def grid_for(self, query: Query) -> Grid:
+        if query.kernel is None:
+            assert self.grid is not None
+            return self.grid
+
+        # consecutive queries usually share a kernel, keep its maze warm
+        key = (query.kernel, query.origin, query.target)
+
+        if self.generated is None or self.kernel != key:
+            self.generated = Grid.generate(
+                self.height,
+                self.width,
+                query.origin,
+                query.target,
+                Grid.kernel_rng(query.kernel),
+                connectivity=self.connectivity,
+                generator=self.generator,
+            )
+            self.kernel = key
+
+        return self.generated
+
+    def solve(self, query: Query) -> Statistics:
+        grid = self.grid_for(query)
+
+        if query.algorithm is None:
+            return solve_cached(
+                self.cache, grid, query.origin, query.target, self.trace_memory
+            )
+
+        return solve(
+            query.algorithm, grid, query.origin, query.target, self.trace_memory
+        )
+
+
+_solver: Solver | None = None
+
+
+def initialize(
+    layout: Layout | None,
+    height: int,
+    width: int,
+    connectivity: int,
+    generator: Generator,
+    trace_memory: bool,
+    cache_budget: int,
+):
+    global _solver
+
+    _solver = Solver(
+        None, height, width, connectivity, generator, trace_memory, cache_budget
+    )
+
+    if layout is not None:
+        _solver.grid, _solver.blocks = attach(layout)
+
+
+def solve_chunk(queries: tuple[Query, ...]) -> list[Statistics]:
+    assert _solver is not None
+
+    return [_solver.solve(query) for query in queries]
+
+
+def solve_all(
+    queries: typing.Iterable[Query],
+    grid: Grid | None,
+    height: int,
+    width: int,
+    connectivity: int,
+    generator: Generator,
+    trace_memory: bool = False,
+    jobs: int = 1,
+    chunk_size: int = 16,
+    cache_budget: int = DistanceCache.DEFAULT_BUDGET,
+) -> typing.Iterator[Statistics]:
+    if jobs == 1:
+        solver = Solver(
+            grid, height, width, connectivity, generator, trace_memory, cache_budget
+        )
+        yield from map(solver.solve, queries)
+        return
+
+    with contextlib.ExitStack() as stack:
+        layout = None
+
+        if grid is not None:
+            layout = stack.enter_context(SharedGrid(grid)).layout
+
+        executor = stack.enter_context(
+            concurrent.futures.ProcessPoolExecutor(
+                jobs,
+                initializer=initialize,
+                initargs=(
+                    layout,
+                    height,
+                    width,
+                    connectivity,
+                    generator,
+                    trace_memory,
+                    cache_budget,
+                ),
+            )
+        )
+
+        # map keeps the submission order, results stream back one chunk at a time
+        for statistics in executor.map(
+            solve_chunk, itertools.batched(queries, chunk_size)
+        ):
+            yield from statistics
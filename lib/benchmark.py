@@ -0,0 +1,287 @@
+import argparse
+import json
+import sys
+import time
+import typing
+
+import numpy as np
+
+from lib.algorithm_manager import AlgorithmManager
+from lib.algorithms import Algorithm
+from lib.grid import Grid
+
+PHASES: tuple[str, ...] = (
+    "generate",
+    "search",
+    "construct_path",
+    "explored",
+    "frontier",
+    "run",
+)
+
+
+def measure(
+    algorithm_type: type[Algorithm],
+    size: int,
+    density: float,
+    kernel: str,
+    connectivity: int,
+    snapshot_interval: int,
+) -> dict[str, typing.Any]:
+    origin = 0
+    target = size * size - 1
+
+    start = time.perf_counter()
+    grid = Grid.generate(
+        size, size, origin, target, Grid.kernel_rng(kernel), density, connectivity
+    )
+    generate = time.perf_counter() - start
+
+    if not grid.connected(origin, target):
+        component = grid.components == grid.components[origin]
+        target = int(np.flatnonzero(component)[-1])
+
+    explored = 0.0
+    frontier = 0.0
+    snapshots = 0
+    solution_found = None
+
+    start = time.perf_counter()
+    algorithm = algorithm_type(grid, origin, target)
+    search = time.perf_counter() - start
+
+    while solution_found is None:
+        start = time.perf_counter()
+
+        for _ in range(snapshot_interval):
+            solution_found = algorithm.step()
+
+            if solution_found is not None:
+                break
+
+        search += time.perf_counter() - start
+
+        start = time.perf_counter()
+        algorithm.explored()
+        explored += time.perf_counter() - start
+
+        start = time.perf_counter()
+        algorithm.frontier()
+        frontier += time.perf_counter() - start
+
+        snapshots += 1
+
+    construct_path = 0.0
+
+    # counted as batch counts them, steps also include stale pops and other
+    # bookkeeping
+    expanded = algorithm.ledger.closed
+
+    if solution_found:
+        start = time.perf_counter()
+        algorithm.construct_path()
+        construct_path = time.perf_counter() - start
+
+    # the same search again in one call, as headless solves run it, on a
+    # fresh grid so that caches built by the first search are not reused
+    grid = Grid.generate(
+        size, size, 0, size * size - 1, Grid.kernel_rng(kernel), density, connectivity
+    )
+
+    start = time.perf_counter()
+    algorithm = algorithm_type(grid, origin, target)
+    outcome = algorithm.run_to_completion()
+    run = time.perf_counter() - start
+
+    if outcome.solution_found != solution_found:
+        raise RuntimeError("run_to_completion disagrees with step")
+
+    return {
+        "solved": solution_found,
+        "expanded": expanded,
+        "generate": generate,
+        "search": search,
+        "construct_path": construct_path,
+        "explored": explored / snapshots,
+        "frontier": frontier / snapshots,
+        "run": run,
+    }
+
+
+def key(result: dict[str, typing.Any]) -> str:
+    # a baseline only holds for the maze and the moves it was measured on
+    return (
+        f"{result['algorithm']}/{result['size']}/{result['density']}/"
+        f"{result['kernel']}/{result['connectivity']}"
+    )
+
+
+def run(arguments: argparse.Namespace) -> typing.Iterator[dict[str, typing.Any]]:
+    for size in arguments.sizes:
+        for density in arguments.densities:
+            for algorithm in arguments.algorithm:
+                best: dict[str, typing.Any] | None = None
+
+                for _ in range(arguments.repeat):
+                    result = measure(
+                        algorithm,
+                        size,
+                        density,
+                        arguments.kernel,
+                        arguments.connectivity,
+                        arguments.snapshot_interval,
+                    )
+
+                    if best is None:
+                        best = result
+                    else:
+                        for phase in PHASES:
+                            best[phase] = min(best[phase], result[phase])
+
+                assert best is not None
+
+                yield {
+                    "algorithm": algorithm.__name__,
+                    "size": size,
+                    "density": density,
+                    "kernel": arguments.kernel,
+                    "connectivity": arguments.connectivity,
+                    **best,
+                }
+
+
+def compare(
+    results: list[dict[str, typing.Any]],
+    baseline: dict[str, dict[str, typing.Any]],
+    tolerance: float,
+) -> list[str]:
+    regressions: list[str] = []
+
+    for result in results:
+        previous = baseline.get(key(result))
+
+        if previous is None:
+            continue
+
+        for phase in PHASES:
+            # baselines saved before a phase existed have nothing to compare
+            if phase not in previous:
+                continue
+
+            if result[phase] > previous[phase] * (1 + tolerance):
+                regressions.append(
+                    f"{key(result)} {phase}: "
+                    f"{previous[phase] * 1e3:.3f} ms -> {result[phase] * 1e3:.3f} ms"
+                )
+
+    return regressions
+
+
+def parse_arguments(argv: list[str] | None) -> argparse.Namespace:
+    algorithms = {
+        algorithm.__name__: algorithm for algorithm in AlgorithmManager.ALGORITHMS
+    }
+
+    parser = argparse.ArgumentParser(
+        prog="python -m lib.benchmark",
+        description="Time grid generation, search and snapshots of every algorithm",
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithm",
+        action="append",
+        choices=algorithms,
+        help="algorithm to run, may be repeated (default: all)",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[32 << shift for shift in range(8)],
+        help="side lengths of the square grids (default: 32 to 4096)",
+    )
+    parser.add_argument(
+        "--densities",
+        type=float,
+        nargs="+",
+        default=[0.25, Grid.WALL_DENSITY, 0.35],
+    )
+    parser.add_argument("--kernel", default="20")
+    parser.add_argument("--connectivity", type=int, choices=(4, 8), default=4)
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="keep the fastest of this many runs per phase",
+    )
+    parser.add_argument(
+        "--snapshot-interval",
+        type=int,
+        default=1000,
+        metavar="STEPS",
+        help="steps between explored() and frontier() snapshots",
+    )
+    parser.add_argument(
+        "--save",
+        metavar="BASELINE",
+        help="write the results to a baseline file",
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="BASELINE",
+        help="fail if a phase got slower than in the baseline file",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="allowed relative slowdown before a phase counts as regressed",
+    )
+
+    arguments = parser.parse_args(argv)
+    arguments.algorithm = [
+        algorithms[name] for name in arguments.algorithm or algorithms
+    ]
+
+    return arguments
+
+
+def main(argv: list[str] | None = None) -> int:
+    arguments = parse_arguments(argv)
+    results: list[dict[str, typing.Any]] = []
+
+    print(
+        f"{'algorithm':<10} {'size':>5} {'density':>7} {'solved':>6} {'expanded':>9}",
+        *(f"{phase:>14}" for phase in PHASES),
+        f"{'speedup':>8}",
+    )
+
+    for result in run(arguments):
+        results.append(result)
+
+        print(
+            f"{result['algorithm']:<10} {result['size']:>5} "
+            f"{result['density']:>7} {result['solved']!s:>6} {result['expanded']:>9}",
+            *(f"{result[phase] * 1e3:>11.3f} ms" for phase in PHASES),
+            f"{result['search'] / result['run']:>7.2f}x",
+            flush=True,
+        )
+
+    regressions: list[str] = []
+
+    if arguments.compare is not None:
+        with open(arguments.compare) as file:
+            regressions = compare(results, json.load(file), arguments.tolerance)
+
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+
+    if arguments.save is not None:
+        with open(arguments.save, "w") as file:
+            json.dump({key(result): result for result in results}, file, indent=4)
+
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
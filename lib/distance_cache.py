@@ -0,0 +1,96 @@
+import collections
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.algorithms.flood import distance_field
+from lib.grid import Grid
+
+
+class DistanceField:
+    __slots__: tuple[str, ...] = ("distance", "parent", "target")
+
+    distance: npt.NDArray[np.int32]
+    parent: npt.NDArray[np.int32]
+    target: int
+
+    def __init__(self, grid: Grid, target: int):
+        # grids are undirected, so the field grown from the target leads back to it
+        self.distance, self.parent = distance_field(grid, target)
+        self.target = target
+
+    @property
+    def nbytes(self) -> int:
+        return self.distance.nbytes + self.parent.nbytes
+
+    def path(self, origin: int) -> npt.NDArray[np.intp] | None:
+        length = int(self.distance[origin])
+
+        if length == -1:
+            return None
+
+        path = np.empty(length + 1, dtype=np.intp)
+        node = origin
+
+        for index in range(length + 1):
+            path[index] = node
+            node = int(self.parent[node])
+
+        return path
+
+
+class DistanceCache:
+    __slots__: tuple[str, ...] = ("budget", "entries", "hits", "misses", "size")
+
+    DEFAULT_BUDGET: int = 256 << 20
+
+    budget: int
+    entries: collections.OrderedDict[tuple[bytes, int], DistanceField]
+    hits: int
+    misses: int
+    size: int
+
+    def __init__(self, budget: int = DEFAULT_BUDGET):
+        self.budget = budget
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def field(self, grid: Grid, target: int) -> DistanceField:
+        # an edited grid hashes differently, its stale fields age out unused
+        key = (grid.content_hash(), target)
+        field = self.entries.get(key)
+
+        if field is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return field
+
+        self.misses += 1
+        field = DistanceField(grid, target)
+
+        if field.nbytes > self.budget:
+            return field
+
+        while self.size + field.nbytes > self.budget:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= evicted.nbytes
+
+        self.entries[key] = field
+        self.size += field.nbytes
+
+        return field
+
+    def path(self, grid: Grid, origin: int, target: int) -> npt.NDArray[np.intp] | None:
+        if not grid.connected(origin, target):
+            return None
+
+        return self.field(grid, target).path(origin)
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
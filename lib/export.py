@@ -0,0 +1,474 @@
+import abc
+import argparse
+import itertools
+import shutil
+import subprocess
+import sys
+import time
+import typing
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.algorithm_manager import AlgorithmManager
+from lib.algorithms import Algorithm, UnreachableError
+from lib.grid import Grid
+from lib.palette import CELL_PAINT, PALETTE, Paint
+from lib.solve import add_grid_arguments, check_grid_arguments
+
+
+def lzw(pixels: bytes, min_code_size: int) -> bytes:
+    clear = 1 << min_code_size
+    end = clear + 1
+    size = min_code_size + 1
+    next_code = end + 1
+    table: dict[int, int] = {}
+
+    output = bytearray()
+    buffer = clear
+    bits = size
+
+    code = pixels[0]
+
+    for pixel in pixels[1:]:
+        key = code << 8 | pixel
+        extended = table.get(key)
+
+        if extended is not None:
+            code = extended
+            continue
+
+        buffer |= code << bits
+        bits += size
+
+        if next_code == 4096:
+            buffer |= clear << bits
+            bits += size
+            table.clear()
+            next_code = end + 1
+            size = min_code_size + 1
+        else:
+            if next_code == 1 << size:
+                size += 1
+
+            table[key] = next_code
+            next_code += 1
+
+        while bits >= 8:
+            output.append(buffer & 0xFF)
+            buffer >>= 8
+            bits -= 8
+
+        code = pixel
+
+    buffer |= code << bits
+    bits += size
+
+    if next_code == 1 << size and size < 12:
+        size += 1
+
+    buffer |= end << bits
+    bits += size
+
+    while bits > 0:
+        output.append(buffer & 0xFF)
+        buffer >>= 8
+        bits -= 8
+
+    return bytes(output)
+
+
+def quantise(colors: int) -> tuple[npt.NDArray[np.uint8], npt.NDArray[np.uint8]]:
+    lookup = np.arange(len(PALETTE), dtype=np.uint8)
+    kept = list(range(len(PALETTE)))
+
+    # merge the two closest colours until few enough are left, like the
+    # downsampled views the higher paint keeps its colour
+    while len(kept) > colors:
+        _, low, high = min(
+            (int(np.sum((PALETTE[a, :3].astype(np.int32) - PALETTE[b, :3]) ** 2)), a, b)
+            for a, b in itertools.combinations(kept, 2)
+        )
+        lookup[lookup == low] = high
+        kept.remove(low)
+
+    # number the remaining colours from 0 so GIF codes stay small
+    return np.searchsorted(kept, lookup).astype(np.uint8), PALETTE[kept, :3]
+
+
+def sub_blocks(data: bytes) -> bytes:
+    blocks = bytearray()
+
+    for start in range(0, len(data), 255):
+        chunk = data[start : start + 255]
+        blocks.append(len(chunk))
+        blocks += chunk
+
+    blocks.append(0)
+
+    return bytes(blocks)
+
+
+class Encoder(abc.ABC):
+    __slots__: tuple[str, ...] = ("colors", "fps", "height", "lookup", "scale", "width")
+
+    colors: npt.NDArray[np.uint8]
+    fps: int
+    height: int
+    lookup: npt.NDArray[np.uint8]
+    scale: int
+    width: int
+
+    def __init__(
+        self, height: int, width: int, scale: int, fps: int, colors: int = len(PALETTE)
+    ):
+        self.fps = fps
+        self.height = height
+        self.scale = scale
+        self.width = width
+
+        # frames hold paints, lookup turns them into indices of colors
+        self.lookup, self.colors = quantise(colors)
+
+    def upscale(self, frame: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+        if self.scale == 1:
+            return frame
+
+        return frame.repeat(self.scale, axis=0).repeat(self.scale, axis=1)
+
+    def __enter__(self) -> typing.Self:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    @abc.abstractmethod
+    def write(self, frame: npt.NDArray[np.uint8], duration: int = 1): ...
+
+    @abc.abstractmethod
+    def close(self): ...
+
+
+class GifEncoder(Encoder):
+    __slots__: tuple[str, ...] = ("code_size", "file", "previous", "transparent")
+
+    code_size: int
+    file: typing.BinaryIO
+    previous: npt.NDArray[np.uint8] | None
+    transparent: int
+
+    def __init__(
+        self,
+        file: typing.BinaryIO,
+        height: int,
+        width: int,
+        scale: int,
+        fps: int,
+        colors: int = len(PALETTE),
+    ):
+        super().__init__(height, width, scale, fps, colors)
+
+        if max(height, width) * scale > 0xFFFF:
+            raise ValueError("GIF frames are limited to 65535 pixels per side")
+
+        self.file = file
+        self.previous = None
+
+        # the index after the last colour marks unchanged pixels, GIF codes
+        # are at least 2 bits wide
+        self.transparent = len(self.colors)
+        self.code_size = max(self.transparent.bit_length(), 2)
+
+        table = np.zeros((1 << self.code_size, 3), dtype=np.uint8)
+        table[: len(self.colors)] = self.colors
+
+        self.file.write(b"GIF89a")
+        self.file.write(
+            np.array([width * scale, height * scale], dtype="<u2").tobytes()
+        )
+        self.file.write(bytes([0xF0 | (self.code_size - 1), 0, 0]))
+        self.file.write(table.tobytes())
+        self.file.write(b"!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+    @typing.override
+    def write(self, frame: npt.NDArray[np.uint8], duration: int = 1):
+        frame = self.lookup[frame]
+
+        if self.previous is None:
+            y0, y1, x0, x1 = 0, self.height, 0, self.width
+            image = frame
+            transparent = 0
+        else:
+            changed = frame != self.previous
+            rows = np.flatnonzero(changed.any(axis=1))
+            columns = np.flatnonzero(changed.any(axis=0))
+
+            if len(rows) == 0:
+                y0, y1, x0, x1 = 0, 1, 0, 1
+            else:
+                y0, y1 = int(rows[0]), int(rows[-1]) + 1
+                x0, x1 = int(columns[0]), int(columns[-1]) + 1
+
+            image = np.where(
+                changed[y0:y1, x0:x1], frame[y0:y1, x0:x1], self.transparent
+            ).astype(np.uint8)
+            transparent = 1
+
+        if self.previous is None:
+            self.previous = frame
+        else:
+            self.previous[y0:y1, x0:x1] = frame[y0:y1, x0:x1]
+
+        delay = round(100 * duration / self.fps)
+        s = self.scale
+
+        self.file.write(b"!\xf9\x04")
+        self.file.write(bytes([1 << 2 | transparent]))
+        self.file.write(np.array([delay], dtype="<u2").tobytes())
+        self.file.write(bytes([self.transparent, 0]))
+
+        self.file.write(b",")
+        self.file.write(
+            np.array(
+                [x0 * s, y0 * s, (x1 - x0) * s, (y1 - y0) * s], dtype="<u2"
+            ).tobytes()
+        )
+        self.file.write(b"\x00")
+        self.file.write(bytes([self.code_size]))
+        self.file.write(sub_blocks(lzw(self.upscale(image).tobytes(), self.code_size)))
+
+    @typing.override
+    def close(self):
+        self.file.write(b";")
+        self.file.close()
+
+
+class FFmpegEncoder(Encoder):
+    __slots__: tuple[str, ...] = ("process",)
+
+    process: subprocess.Popen[bytes]
+
+    def __init__(
+        self,
+        path: str,
+        height: int,
+        width: int,
+        scale: int,
+        fps: int,
+        colors: int = len(PALETTE),
+    ):
+        super().__init__(height, width, scale, fps, colors)
+
+        executable = shutil.which("ffmpeg")
+
+        if executable is None:
+            raise RuntimeError("ffmpeg is required to export videos")
+
+        # the scaled size is rounded up to even dimensions for yuv420p
+        self.process = subprocess.Popen(
+            [
+                executable,
+                "-loglevel",
+                "error",
+                "-y",
+                "-f",
+                "rawvideo",
+                "-pix_fmt",
+                "rgb24",
+                "-s",
+                f"{width * scale}x{height * scale}",
+                "-r",
+                str(fps),
+                "-i",
+                "-",
+                "-vf",
+                "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+                "-pix_fmt",
+                "yuv420p",
+                path,
+            ],
+            stdin=subprocess.PIPE,
+        )
+
+    @typing.override
+    def write(self, frame: npt.NDArray[np.uint8], duration: int = 1):
+        assert self.process.stdin is not None
+
+        pixels = self.colors[self.lookup[self.upscale(frame)]].tobytes()
+
+        for _ in range(duration):
+            self.process.stdin.write(pixels)
+
+    @typing.override
+    def close(self):
+        assert self.process.stdin is not None
+
+        self.process.stdin.close()
+
+        if self.process.wait() != 0:
+            raise RuntimeError("ffmpeg exited with an error")
+
+
+def open_encoder(
+    path: str,
+    height: int,
+    width: int,
+    scale: int,
+    fps: int,
+    colors: int = len(PALETTE),
+) -> Encoder:
+    if path.lower().endswith(".gif"):
+        return GifEncoder(open(path, "wb"), height, width, scale, fps, colors)
+
+    return FFmpegEncoder(path, height, width, scale, fps, colors)
+
+
+def export(
+    algorithm: Algorithm, encoder: Encoder, steps_per_frame: int = 1, hold: int = 1
+) -> int:
+    grid = algorithm.grid
+    paint = CELL_PAINT[grid.cells]
+    flat_view = paint.reshape(-1)
+
+    flat_view[algorithm.explored()] = Paint.EXPLORED
+    flat_view[algorithm.frontier()] = Paint.FRONTIER
+
+    algorithm.track_changes()
+    count = 0
+
+    while True:
+        encoder.write(paint)
+        count += 1
+
+        for _ in range(steps_per_frame):
+            if (solution_found := algorithm.step()) is not None:
+                break
+
+        opened, closed = algorithm.take_changes()
+        flat_view[opened] = Paint.FRONTIER
+        flat_view[closed] = Paint.EXPLORED
+
+        if solution_found is not None:
+            break
+
+    if solution_found:
+        algorithm.construct_path()
+        assert algorithm.path is not None
+
+        flat_view[algorithm.path] = Paint.PATH
+
+    encoder.write(paint, hold)
+
+    return count + 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    algorithms = {
+        algorithm.__name__: algorithm for algorithm in AlgorithmManager.ALGORITHMS
+    }
+
+    parser = argparse.ArgumentParser(
+        prog="python -m lib.export",
+        description="Render the exploration of an algorithm to a GIF or video",
+    )
+    parser.add_argument(
+        "output",
+        metavar="OUTPUT",
+        help="a .gif is encoded natively, anything else is handed to ffmpeg",
+    )
+    parser.add_argument("kernel", metavar="KERNEL")
+    parser.add_argument(
+        "-a",
+        "--algorithm",
+        choices=algorithms,
+        default=AlgorithmManager.ALGORITHMS[0].__name__,
+    )
+    add_grid_arguments(parser)
+    parser.add_argument(
+        "--steps-per-frame",
+        type=int,
+        default=1,
+        metavar="STEPS",
+        help="algorithm steps between two frames",
+    )
+    parser.add_argument(
+        "--scale", type=int, default=1, help="integer upscaling factor of a cell"
+    )
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument(
+        "--colors",
+        type=int,
+        choices=range(2, len(PALETTE) + 1),
+        default=len(PALETTE),
+        metavar="N",
+        help="quantise the palette to N colours by merging the closest ones, "
+        "3 or fewer shrink GIFs by encoding them with 2 bit codes",
+    )
+    parser.add_argument(
+        "--hold",
+        type=float,
+        default=2.0,
+        metavar="SECONDS",
+        help="how long the final frame is shown",
+    )
+
+    arguments = parser.parse_args(argv)
+
+    check_grid_arguments(parser, arguments)
+
+    for name in ("steps_per_frame", "scale", "fps"):
+        if getattr(arguments, name) < 1:
+            parser.error(f"{name.replace('_', '-')} must be positive")
+
+    ox, oy = arguments.origin
+    tx, ty = arguments.target
+    origin = oy * arguments.width + ox
+    target = ty * arguments.width + tx
+
+    grid = Grid.generate(
+        arguments.height,
+        arguments.width,
+        origin,
+        target,
+        Grid.kernel_rng(arguments.kernel),
+        connectivity=arguments.connectivity,
+        generator=arguments.generator,
+        threads=arguments.threads,
+    )
+
+    try:
+        algorithm = algorithms[arguments.algorithm](grid, origin, target)
+    except UnreachableError as error:
+        parser.error(str(error))
+
+    try:
+        encoder = open_encoder(
+            arguments.output,
+            grid.height,
+            grid.width,
+            arguments.scale,
+            arguments.fps,
+            arguments.colors,
+        )
+    except (OSError, RuntimeError, ValueError) as error:
+        parser.error(str(error))
+
+    start = time.perf_counter()
+
+    with encoder:
+        count = export(
+            algorithm,
+            encoder,
+            arguments.steps_per_frame,
+            max(round(arguments.hold * arguments.fps), 1),
+        )
+
+    seconds = time.perf_counter() - start
+
+    print(f"wrote {count} frames to {arguments.output} in {seconds:.2f}s")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,384 @@
+import abc
+import typing
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.grid import Cell, Generator, Noise, label_components, merge, run_chunks
+
+
+def spanning_tree(
+    height: int, width: int, rng: np.random.Generator
+) -> tuple[npt.NDArray[np.bool_], npt.NDArray[np.bool_]]:
+    nodes = np.arange(height * width, dtype=np.int32).reshape(height, width)
+    upper = np.concatenate((nodes[:, :-1].reshape(-1), nodes[:-1].reshape(-1)))
+    lower = np.concatenate((nodes[:, 1:].reshape(-1), nodes[1:].reshape(-1)))
+
+    # distinct random weights have a single minimum spanning tree, the one
+    # randomised Prim grows, so Boruvka may build it a whole round at a time
+    weight = rng.permutation(len(upper)).astype(np.int32)
+    tree = np.zeros(len(upper), dtype=np.bool_)
+    label = nodes.reshape(-1)
+    edges = np.arange(len(upper), dtype=np.int32)
+
+    while True:
+        upper_label = label[upper[edges]]
+        lower_label = label[lower[edges]]
+        crossing = upper_label != lower_label
+
+        if not crossing.any():
+            break
+
+        edges = edges[crossing]
+        upper_label = upper_label[crossing]
+        lower_label = lower_label[crossing]
+
+        lightest = np.full(height * width, len(upper), dtype=np.int32)
+        np.minimum.at(lightest, upper_label, weight[edges])
+        np.minimum.at(lightest, lower_label, weight[edges])
+
+        chosen = (weight[edges] == lightest[upper_label]) | (
+            weight[edges] == lightest[lower_label]
+        )
+        tree[edges[chosen]] = True
+
+        parent = merge(
+            np.arange(height * width, dtype=np.int32),
+            upper_label[chosen],
+            lower_label[chosen],
+        )
+        label = parent[label]
+
+    horizontal = height * (width - 1)
+
+    return (
+        tree[:horizontal].reshape(height, width - 1),
+        tree[horizontal:].reshape(height - 1, width),
+    )
+
+
+def backtracker_tree(
+    height: int, width: int, rng: np.random.Generator
+) -> tuple[npt.NDArray[np.bool_], npt.NDArray[np.bool_]]:
+    length = height * width
+    visited = bytearray(length)
+    right = bytearray(length)
+    down = bytearray(length)
+
+    # 12 is divisible by every possible number of choices
+    draws = rng.integers(0, 12, length, dtype=np.uint8).tolist()
+    draw = 0
+
+    stack = [0]
+    visited[0] = 1
+
+    while stack:
+        cell = stack[-1]
+        y, x = divmod(cell, width)
+        options: list[int] = []
+
+        if y > 0 and not visited[cell - width]:
+            options.append(cell - width)
+        if x > 0 and not visited[cell - 1]:
+            options.append(cell - 1)
+        if y < height - 1 and not visited[cell + width]:
+            options.append(cell + width)
+        if x < width - 1 and not visited[cell + 1]:
+            options.append(cell + 1)
+
+        if len(options) == 0:
+            stack.pop()
+            continue
+
+        neighbour = options[draws[draw] % len(options)]
+        draw += 1
+
+        if abs(neighbour - cell) == 1:
+            right[min(cell, neighbour)] = 1
+        else:
+            down[min(cell, neighbour)] = 1
+
+        visited[neighbour] = 1
+        stack.append(neighbour)
+
+    right_view = np.frombuffer(right, dtype=np.bool_).reshape(height, width)
+    down_view = np.frombuffer(down, dtype=np.bool_).reshape(height, width)
+
+    return right_view[:, :-1], down_view[:-1]
+
+
+def corridor(
+    cells: npt.NDArray[np.int8],
+    a: tuple[int, int],
+    b: tuple[int, int],
+    horizontal_first: bool,
+):
+    (ay, ax), (by, bx) = a, b
+    y = ay if horizontal_first else by
+    x = bx if horizontal_first else ax
+
+    cells[y, min(ax, bx) : max(ax, bx) + 1] = Cell.FREE
+    cells[min(ay, by) : max(ay, by) + 1, x] = Cell.FREE
+
+
+def tiles(
+    height: int, width: int, size: int
+) -> list[tuple[int, int, int, int, int, int]]:
+    return [
+        (ty, tx, y0, min(y0 + size, height), x0, min(x0 + size, width))
+        for ty, y0 in enumerate(range(0, height, size))
+        for tx, x0 in enumerate(range(0, width, size))
+    ]
+
+
+class Carver(Generator):
+    __slots__: tuple[str, ...] = ()
+
+    @typing.override
+    def attach(self, cells: npt.NDArray[np.int8], y: int, x: int):
+        height, width = cells.shape
+        radius = 1
+
+        while True:
+            y0, y1 = max(y - radius, 0), min(y + radius + 1, height)
+            x0, x1 = max(x - radius, 0), min(x + radius + 1, width)
+            ys, xs = np.nonzero(cells[y0:y1, x0:x1] == Cell.FREE)
+
+            if len(ys) > 0:
+                nearest = np.argmin(np.abs(ys + y0 - y) + np.abs(xs + x0 - x))
+                corridor(
+                    cells,
+                    (y, x),
+                    (int(ys[nearest]) + y0, int(xs[nearest]) + x0),
+                    True,
+                )
+                return
+
+            if (y1 - y0, x1 - x0) == (height, width):
+                cells[y, x] = Cell.FREE
+                return
+
+            radius *= 2
+
+
+class Maze(Carver):
+    __slots__: tuple[str, ...] = ()
+
+    TILE: int = 256
+
+    @abc.abstractmethod
+    def tree(
+        self, height: int, width: int, rng: np.random.Generator
+    ) -> tuple[npt.NDArray[np.bool_], npt.NDArray[np.bool_]]: ...
+
+    @typing.override
+    def generate(
+        self, height: int, width: int, rng: np.random.Generator, threads: int = 1
+    ) -> npt.NDArray[np.int8]:
+        # rooms sit on even coordinates, the odd cells between two rooms are doors
+        rows, columns = (height + 1) // 2, (width + 1) // 2
+        cells = np.full((height, width), Cell.WALL, dtype=np.int8)
+
+        blocks = tiles(rows, columns, self.TILE)
+        rngs = rng.spawn(len(blocks) + 1)
+
+        def carve(index: int):
+            _, _, y0, y1, x0, x1 = blocks[index]
+            right, down = self.tree(y1 - y0, x1 - x0, rngs[index])
+            view = cells[2 * y0 : 2 * y1 - 1, 2 * x0 : 2 * x1 - 1]
+
+            view[::2, ::2] = Cell.FREE
+            view[::2, 1::2][right] = Cell.FREE
+            view[1::2, ::2][down] = Cell.FREE
+
+        run_chunks(carve, range(len(blocks)), threads)
+
+        # the tiles are perfect mazes, one door along every edge of a spanning
+        # tree over the tiles keeps the whole grid a perfect maze
+        tile_rows = -(-rows // self.TILE)
+        tile_columns = -(-columns // self.TILE)
+        right, down = spanning_tree(tile_rows, tile_columns, rngs[-1])
+        doors = rngs[-1].integers(0, self.TILE, (2, tile_rows, tile_columns))
+
+        for ty, tx in np.argwhere(right).tolist():
+            _, _, y0, y1, _, x1 = blocks[ty * tile_columns + tx]
+            y = y0 + int(doors[0, ty, tx]) % (y1 - y0)
+            cells[2 * y, 2 * x1 - 1] = Cell.FREE
+
+        for ty, tx in np.argwhere(down).tolist():
+            _, _, _, y1, x0, x1 = blocks[ty * tile_columns + tx]
+            x = x0 + int(doors[1, ty, tx]) % (x1 - x0)
+            cells[2 * y1 - 1, 2 * x] = Cell.FREE
+
+        # an even side leaves a wall along the far edge, widen the last corridor
+        if height % 2 == 0:
+            cells[-1] = cells[-2]
+
+        if width % 2 == 0:
+            cells[:, -1] = cells[:, -2]
+
+        return cells
+
+
+class Backtracker(Maze):
+    __slots__: tuple[str, ...] = ()
+
+    @typing.override
+    def tree(
+        self, height: int, width: int, rng: np.random.Generator
+    ) -> tuple[npt.NDArray[np.bool_], npt.NDArray[np.bool_]]:
+        return backtracker_tree(height, width, rng)
+
+
+class Prim(Maze):
+    __slots__: tuple[str, ...] = ()
+
+    @typing.override
+    def tree(
+        self, height: int, width: int, rng: np.random.Generator
+    ) -> tuple[npt.NDArray[np.bool_], npt.NDArray[np.bool_]]:
+        return spanning_tree(height, width, rng)
+
+
+class Caves(Carver):
+    __slots__: tuple[str, ...] = ("density", "iterations")
+
+    BAND: int = 512
+
+    density: float
+    iterations: int
+
+    def __init__(self, density: float = 0.45, iterations: int = 4):
+        self.density = density
+        self.iterations = iterations
+
+    @typing.override
+    def generate(
+        self, height: int, width: int, rng: np.random.Generator, threads: int = 1
+    ) -> npt.NDArray[np.int8]:
+        # cells beyond the border count as walls
+        source = np.ones((height + 2, width + 2), dtype=np.uint8)
+        target = np.ones_like(source)
+
+        bands = range(0, height, self.BAND)
+        rngs = rng.spawn(len(bands))
+        threshold = round(self.density * 256)
+
+        def fill(index: int):
+            y0 = bands[index]
+            y1 = min(y0 + self.BAND, height)
+            source[1 + y0 : 1 + y1, 1:-1] = (
+                rngs[index].integers(0, 256, (y1 - y0, width), dtype=np.uint8)
+                < threshold
+            )
+
+        run_chunks(fill, range(len(bands)), threads)
+
+        # a cell turns into a wall when five of the nine cells around it are
+        def smooth(y0: int):
+            y1 = min(y0 + self.BAND, height)
+            count = source[y0:y1, :width].copy()
+
+            for dy in range(3):
+                for dx in range(3):
+                    if dy or dx:
+                        count += source[y0 + dy : y1 + dy, dx : dx + width]
+
+            target[1 + y0 : 1 + y1, 1:-1] = count >= 5
+
+        for _ in range(self.iterations):
+            run_chunks(smooth, bands, threads)
+            source, target = target, source
+
+        cells = source[1:-1, 1:-1].view(np.int8)
+
+        # keep the largest cave, so whatever gets attached to it is connected
+        labels = label_components(cells == Cell.FREE)
+        sizes = np.bincount(labels.reshape(-1))
+
+        if len(sizes) > 1:
+            cells[labels != np.argmax(sizes[1:]) + 1] = Cell.WALL
+
+        return np.ascontiguousarray(cells)
+
+
+class Rooms(Carver):
+    __slots__: tuple[str, ...] = ()
+
+    TILE: int = 96
+    ROOMS: int = 6
+    MIN_SIZE: int = 4
+    MAX_SIZE: int = 16
+
+    @typing.override
+    def generate(
+        self, height: int, width: int, rng: np.random.Generator, threads: int = 1
+    ) -> npt.NDArray[np.int8]:
+        cells = np.full((height, width), Cell.WALL, dtype=np.int8)
+        blocks = tiles(height, width, self.TILE)
+        rngs = rng.spawn(len(blocks) + 1)
+        centres: list[tuple[int, int]] = [(0, 0)] * len(blocks)
+
+        def carve(index: int):
+            _, _, y0, y1, x0, x1 = blocks[index]
+            tile_rng = rngs[index]
+
+            sizes = tile_rng.integers(
+                self.MIN_SIZE, self.MAX_SIZE + 1, (self.ROOMS, 2), dtype=np.int32
+            )
+            sizes = np.minimum(sizes, [y1 - y0, x1 - x0])
+            starts = tile_rng.integers(0, [y1 - y0, x1 - x0] - sizes + 1)
+            turns = tile_rng.integers(0, 2, self.ROOMS, dtype=np.uint8)
+            previous = None
+
+            for (h, w), (y, x), turn in zip(
+                sizes.tolist(), starts.tolist(), turns.tolist()
+            ):
+                cells[y0 + y : y0 + y + h, x0 + x : x0 + x + w] = Cell.FREE
+                centre = (y0 + y + h // 2, x0 + x + w // 2)
+
+                if previous is None:
+                    centres[index] = centre
+                else:
+                    corridor(cells, previous, centre, bool(turn))
+
+                previous = centre
+
+        run_chunks(carve, range(len(blocks)), threads)
+
+        # neighbouring tiles overlap along their corridors, join them afterwards
+        tile_columns = -(-width // self.TILE)
+        turns = rngs[-1].integers(0, 2, (len(blocks), 2), dtype=np.uint8).tolist()
+
+        for index, (ty, tx, *_) in enumerate(blocks):
+            if tx + 1 < tile_columns:
+                corridor(
+                    cells, centres[index], centres[index + 1], bool(turns[index][0])
+                )
+
+            if index + tile_columns < len(blocks):
+                corridor(
+                    cells,
+                    centres[index],
+                    centres[index + tile_columns],
+                    bool(turns[index][1]),
+                )
+
+        return cells
+
+
+GENERATORS: tuple[type[Generator], ...] = (
+    Noise,
+    Backtracker,
+    Prim,
+    Caves,
+    Rooms,
+)
+
+LABELS: tuple[str, ...] = (
+    "Noise",
+    "Recursive Backtracker",
+    "Prim",
+    "Cellular Caves",
+    "Rooms and Corridors",
+)
@@ -1,5 +1,10 @@
-from collections import abc
+import abc
+import collections
+import collections.abc
+import concurrent.futures
 import enum
+import hashlib
+import math
 import typing
 
 import numpy as np
@@ -11,8 +16,141 @@ class Cell(enum.IntEnum):
     WALL = 1
 
 
+def merge(
+    parent: npt.NDArray[np.int32],
+    upper: npt.NDArray[np.int32],
+    lower: npt.NDArray[np.int32],
+) -> npt.NDArray[np.int32]:
+    while True:
+        upper_root = parent[upper]
+        lower_root = parent[lower]
+        merging = upper_root != lower_root
+
+        if not merging.any():
+            return parent
+
+        upper = upper[merging]
+        lower = lower[merging]
+        upper_root = upper_root[merging]
+        lower_root = lower_root[merging]
+
+        parent[np.maximum(upper_root, lower_root)] = np.minimum(upper_root, lower_root)
+
+        while not np.array_equal(grandparent := parent[parent], parent):
+            parent = grandparent
+
+
+def label_components(free: npt.NDArray[np.bool_]) -> npt.NDArray[np.int32]:
+    height, width = free.shape
+
+    starts = free.copy()
+    starts[:, 1:] &= ~free[:, :-1]
+    runs = np.cumsum(starts, dtype=np.int32).reshape(height, width)
+
+    vertical = free[:-1] & free[1:]
+    vertical[:, 1:] &= ~vertical[:, :-1]
+    upper = runs[:-1][vertical]
+    lower = runs[1:][vertical]
+
+    parent = merge(np.arange(int(runs[-1, -1]) + 1, dtype=np.int32), upper, lower)
+    roots = np.cumsum(parent == np.arange(len(parent)), dtype=np.int32) - 1
+
+    return np.where(free, roots[parent[runs]], 0)
+
+
+def run_chunks[T](
+    task: collections.abc.Callable[[T], typing.Any],
+    chunks: collections.abc.Iterable[T],
+    threads: int,
+):
+    if threads == 1:
+        for chunk in chunks:
+            task(chunk)
+
+        return
+
+    with concurrent.futures.ThreadPoolExecutor(threads) as executor:
+        for _ in executor.map(task, chunks):
+            pass
+
+
+class Generator(abc.ABC):
+    __slots__: tuple[str, ...] = ()
+
+    @abc.abstractmethod
+    def generate(
+        self, height: int, width: int, rng: np.random.Generator, threads: int = 1
+    ) -> npt.NDArray[np.int8]: ...
+
+    def attach(self, cells: npt.NDArray[np.int8], y: int, x: int):
+        cells[y, x] = Cell.FREE
+
+
+class Noise(Generator):
+    __slots__: tuple[str, ...] = ("density",)
+
+    BAND: int = 1 << 20
+
+    density: float
+
+    def __init__(self, density: float = 0.3):
+        self.density = density
+
+    @typing.override
+    def generate(
+        self, height: int, width: int, rng: np.random.Generator, threads: int = 1
+    ) -> npt.NDArray[np.int8]:
+        length = height * width
+        cells = np.empty((height, width), dtype=np.int8)
+        flat_view = cells.reshape(-1)
+
+        if not isinstance(rng.bit_generator, np.random.PCG64):
+            for start in range(0, length, self.BAND):
+                stop = min(start + self.BAND, length)
+                flat_view[start:stop] = rng.random(stop - start) < self.density
+
+            return cells
+
+        # rng.random keeps the top 53 bits of every raw draw, so comparing those
+        # against the scaled density matches the float64 threshold bit for bit,
+        # and advancing a copy of the state lets every band draw on its own
+        state = rng.bit_generator.state
+        threshold = math.ceil(self.density * (1 << 53))
+
+        def band(start: int):
+            bit_generator = np.random.PCG64()
+            bit_generator.state = state
+            bit_generator.advance(start)
+
+            raw = bit_generator.random_raw(min(self.BAND, length - start))
+            raw >>= 11
+            flat_view[start : start + len(raw)] = raw < threshold
+
+        run_chunks(band, range(0, length, self.BAND), threads)
+        rng.bit_generator.advance(length)
+
+        return cells
+
+
 class Grid:
-    __slots__: tuple[str, ...] = ("cells", "height", "width")
+    __slots__: tuple[str, ...] = (
+        "__weakref__",
+        "adjacency",
+        "cells",
+        "components",
+        "connectivity",
+        "cost_type",
+        "deltas",
+        "digest",
+        "edits",
+        "height",
+        "label",
+        "moves",
+        "offsets",
+        "passable",
+        "revision",
+        "width",
+    )
 
     NEIGHBOUR_OFFSETS: npt.NDArray[np.intp] = np.array(
         [
@@ -24,17 +162,106 @@ class Grid:
         dtype=np.intp,
     )
 
+    DIAGONAL_OFFSETS: npt.NDArray[np.intp] = np.array(
+        [
+            (-1, -1),
+            (1, -1),
+            (1, 1),
+            (-1, 1),
+        ],
+        dtype=np.intp,
+    )
+
+    # the cost of a diagonal move, an axis move costs 1, it is √2 cut to 20
+    # binary places so sums of moves stay exact and equal routes tie exactly
+    DIAGONAL_COST: float = round(math.sqrt(2) * (1 << 20)) / (1 << 20)
+
+    WALL_DENSITY: float = 0.3
+
+    EDIT_LOG: int = 1024
+
+    MAGIC: bytes = b"WEGSUCHE"
+    VERSION: int = 1
+    HEADER_SIZE: int = 64
+
+    adjacency: tuple[tuple[int, ...], ...]
     cells: npt.NDArray[np.int8]
+    components: npt.NDArray[np.int32]
+    connectivity: int
+    cost_type: type[np.int32 | np.float64]
+    deltas: tuple[int, ...]
+    digest: bytes | None
+    edits: collections.deque[npt.NDArray[np.intp]]
     height: int
+    label: int
+    moves: tuple[tuple[tuple[int, int | float], ...], ...]
+    offsets: npt.NDArray[np.intp]
+    passable: npt.NDArray[np.uint8]
+    revision: int
     width: int
 
-    def __init__(self, cells: npt.NDArray[np.int8]):
+    def __init__(
+        self,
+        cells: npt.NDArray[np.int8],
+        connectivity: int = 4,
+        passable: npt.NDArray[np.uint8] | None = None,
+        components: npt.NDArray[np.int32] | None = None,
+    ):
         if cells.ndim != 2:
             raise ValueError("cells must be a 2D array")
 
+        if connectivity not in (4, 8):
+            raise ValueError("connectivity must be 4 or 8")
+
         self.cells = cells
+        self.connectivity = connectivity
+        self.digest = None
         self.height, self.width = cells.shape
 
+        # the cells of the latest edits, caches built from the grid catch up
+        # on what changed since the revision they saw
+        self.edits = collections.deque(maxlen=self.EDIT_LOG)
+        self.revision = 0
+
+        self.offsets = self.NEIGHBOUR_OFFSETS
+
+        if connectivity == 8:
+            self.offsets = np.concatenate((self.offsets, self.DIAGONAL_OFFSETS))
+
+        self.deltas = tuple(dy * self.width + dx for dx, dy in self.offsets.tolist())
+        self.adjacency = tuple(
+            tuple(delta for bit, delta in enumerate(self.deltas) if mask >> bit & 1)
+            for mask in range(1 << len(self.deltas))
+        )
+
+        # every weighted search prices its moves from here, so they all agree
+        # on which path is the cheapest
+        costs = [1] * 4 + [self.DIAGONAL_COST] * (len(self.deltas) - 4)
+        self.moves = tuple(
+            tuple(
+                (delta, cost)
+                for bit, (delta, cost) in enumerate(zip(self.deltas, costs))
+                if mask >> bit & 1
+            )
+            for mask in range(1 << len(self.deltas))
+        )
+        self.cost_type = np.float64 if connectivity == 8 else np.int32
+
+        if passable is None:
+            self.passable = np.zeros(self.height * self.width, dtype=np.uint8)
+            self.build_index()
+        else:
+            self.passable = passable
+
+        if components is None:
+            # diagonal moves never cut corners, so 4-connected components hold for both
+            self.components = label_components(cells != Cell.WALL).reshape(-1)
+        else:
+            self.components = components
+
+        # the highest label handed out, edits take new ones above it
+        self.label = int(self.components.max(initial=0))
+
     @classmethod
     def generate(
         cls,
@@ -43,39 +270,373 @@ class Grid:
         origin: int,
         target: int,
         rng: np.random.Generator,
+        density: float = WALL_DENSITY,
+        connectivity: int = 4,
+        generator: Generator | None = None,
+        threads: int = 1,
     ) -> typing.Self:
         length = height * width
 
         if origin >= length or target >= length:
             raise IndexError("origin or target index out of range")
 
-        cells = rng.random((height, width)) < 0.3
-        cells = cells.astype(np.int8) * Cell.WALL
+        if generator is None:
+            generator = Noise(density)
+
+        cells = generator.generate(height, width, rng, threads)
 
         oy, ox = divmod(origin, width)
         ty, tx = divmod(target, width)
 
-        cells[oy, ox] = Cell.FREE
-        cells[ty, tx] = Cell.FREE
+        generator.attach(cells, oy, ox)
+        generator.attach(cells, ty, tx)
+
+        return cls(cells, connectivity)
+
+    @classmethod
+    def sections(cls, height: int, width: int) -> tuple[int, int, int]:
+        length = height * width
+        components = -(-(cls.HEADER_SIZE + 2 * length) // 8) * 8
+
+        return cls.HEADER_SIZE, cls.HEADER_SIZE + length, components
+
+    @classmethod
+    def load(cls, path: str, mode: typing.Literal["r", "r+", "c"] = "c") -> typing.Self:
+        with open(path, "rb") as file:
+            header = file.read(cls.HEADER_SIZE)
+
+        if len(header) < cls.HEADER_SIZE or not header.startswith(cls.MAGIC):
+            raise ValueError(f"{path} is not a grid file")
+
+        version, height, width, connectivity = np.frombuffer(
+            header, dtype="<u4", count=4, offset=len(cls.MAGIC)
+        ).tolist()
+
+        if version != cls.VERSION:
+            raise ValueError(f"unsupported grid file version {version}")
+
+        cells, passable, components = cls.sections(height, width)
+        length = height * width
 
-        return cls(cells)
+        return cls(
+            np.memmap(path, np.int8, mode, cells, (height, width)),
+            connectivity,
+            np.memmap(path, np.uint8, mode, passable, (length,)),
+            np.memmap(path, "<i4", mode, components, (length,)),
+        )
 
-    def neighbours(self, cell: int) -> abc.Iterator[int]:
+    def save(self, path: str):
+        header = (
+            self.MAGIC
+            + np.array(
+                [self.VERSION, self.height, self.width, self.connectivity], dtype="<u4"
+            ).tobytes()
+        )
+        _, _, components = self.sections(self.height, self.width)
+
+        with open(path, "wb") as file:
+            file.write(header.ljust(self.HEADER_SIZE, b"\0"))
+            np.ascontiguousarray(self.cells, dtype=np.int8).tofile(file)
+            np.ascontiguousarray(self.passable, dtype=np.uint8).tofile(file)
+            file.write(bytes(components - file.tell()))
+            np.ascontiguousarray(self.components, dtype="<i4").tofile(file)
+
+    @staticmethod
+    def kernel_rng(kernel: str) -> np.random.Generator:
+        return np.random.default_rng(
+            np.random.SeedSequence(list(kernel.encode("utf-8")))
+        )
+
+    def build_index(self):
+        self.update_index(0, self.height, 0, self.width)
+
+    def update_index(self, y0: int, y1: int, x0: int, x1: int):
+        sy0 = max(y0 - 1, 0)
+        sy1 = min(y1 + 1, self.height)
+        sx0 = max(x0 - 1, 0)
+        sx1 = min(x1 + 1, self.width)
+
+        free = np.zeros((y1 - y0 + 2, x1 - x0 + 2), dtype=np.uint8)
+        free[sy0 - y0 + 1 : sy1 - y0 + 1, sx0 - x0 + 1 : sx1 - x0 + 1] = (
+            self.cells[sy0:sy1, sx0:sx1] != Cell.WALL
+        )
+
+        def free_at(dx: int, dy: int) -> npt.NDArray[np.uint8]:
+            return free[1 + dy : 1 + dy + y1 - y0, 1 + dx : 1 + dx + x1 - x0]
+
+        passable = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+
+        for bit, (dx, dy) in enumerate(self.offsets.tolist()):
+            passable |= (
+                free_at(dx, dy) & free_at(dx, 0) & free_at(0, dy)
+                if dx != 0 and dy != 0
+                else free_at(dx, dy)
+            ) << bit
+
+        self.passable.reshape(self.height, self.width)[y0:y1, x0:x1] = passable
+
+    def content_hash(self) -> bytes:
+        if self.digest is None:
+            content = hashlib.blake2b(digest_size=16)
+            content.update(
+                np.array(
+                    [self.height, self.width, self.connectivity], dtype="<u4"
+                ).tobytes()
+            )
+            content.update(np.ascontiguousarray(self.cells))
+            self.digest = content.digest()
+
+        return self.digest
+
+    # the cheapest cost between cells with no walls in the way, the octile
+    # distance when moving diagonally, the heuristic every weighted search shares
+    def distance(self, a: int, b: int) -> int | float:
+        ay, ax = divmod(a, self.width)
+        by, bx = divmod(b, self.width)
+        dx = abs(ax - bx)
+        dy = abs(ay - by)
+
+        if self.connectivity == 8:
+            return max(dx, dy) + (self.DIAGONAL_COST - 1) * min(dx, dy)
+
+        return dx + dy
+
+    def distances(self, cell: int) -> npt.NDArray[np.int32] | npt.NDArray[np.float64]:
+        ys, xs = np.divmod(
+            np.arange(self.height * self.width, dtype=np.int32), self.width
+        )
         y, x = divmod(cell, self.width)
+        dx = np.abs(xs - x)
+        dy = np.abs(ys - y)
+
+        if self.connectivity == 8:
+            return np.maximum(dx, dy) + (self.DIAGONAL_COST - 1) * np.minimum(dx, dy)
+
+        return dx + dy
+
+    # what a path costs under the same prices, whichever search found it
+    def path_cost(self, path: npt.NDArray[np.intp]) -> float:
+        ys, xs = np.divmod(path, self.width)
+        diagonal = int(np.count_nonzero((np.diff(ys) != 0) & (np.diff(xs) != 0)))
+
+        return len(path) - 1 - diagonal + diagonal * self.DIAGONAL_COST
+
+    # the fewest moves between cells with no walls in the way, for searches
+    # that count moves rather than price them
+    def hops(self, a: int, b: int) -> int:
+        ay, ax = divmod(a, self.width)
+        by, bx = divmod(b, self.width)
+
+        if self.connectivity == 8:
+            return max(abs(ax - bx), abs(ay - by))
+
+        return abs(ax - bx) + abs(ay - by)
+
+    def connected(self, a: int, b: int) -> bool:
+        label = self.components[a]
+
+        return label != 0 and label == self.components[b]
+
+    def set_cell(self, cell: int, value: Cell):
+        self.set_cells(np.array([cell], dtype=np.intp), value)
+
+    def set_cells(self, cells: npt.NDArray[np.intp], value: Cell):
+        flat_view = self.cells.reshape(-1)
+        cells = np.unique(cells)
+        cells = cells[flat_view[cells] != value]
+
+        if len(cells) == 0:
+            return
+
+        flat_view[cells] = value
+        self.digest = None
+        self.edits.append(cells)
+        self.revision += 1
+
+        # a brush stroke updates the index once over the block it covers
+        ys, xs = np.divmod(cells, self.width)
+
+        self.update_index(
+            max(int(ys.min()) - 1, 0),
+            min(int(ys.max()) + 2, self.height),
+            max(int(xs.min()) - 1, 0),
+            min(int(xs.max()) + 2, self.width),
+        )
+
+        if value == Cell.WALL:
+            self.split_components(cells.tolist())
+        else:
+            self.merge_components(cells.tolist())
+
+    def edited_since(self, revision: int) -> npt.NDArray[np.intp] | None:
+        # None once the log has dropped some of the edits after the revision
+        missing = self.revision - revision
+
+        if missing > len(self.edits):
+            return None
+
+        return np.unique(
+            np.concatenate(
+                [
+                    np.empty(0, dtype=np.intp),
+                    *list(self.edits)[len(self.edits) - missing :],
+                ]
+            )
+        )
+
+    def flood(self, starts: list[int]) -> tuple[list[list[int]], bool]:
+        # floods every start at once, one cell each in turn and only over
+        # cells sharing its label, joins the floods that meet and stops as
+        # soon as at most one is still growing, so an edit costs the pieces
+        # it cuts off rather than the whole component, the floods that ran
+        # dry are whole components and the one left growing may not be
+        adjacency = self.adjacency
+        components = self.components
+        passable = self.passable
+
+        starts = list(dict.fromkeys(starts))
+        owner = {start: index for index, start in enumerate(starts)}
+        group = list(range(len(starts)))
+        labels = [int(components[start]) for start in starts]
+        members = [[start] for start in starts]
+        queues = [collections.deque((start,)) for start in starts]
+        growing = set(range(len(starts)))
+
+        def find(index: int) -> int:
+            while group[index] != index:
+                group[index] = group[group[index]]
+                index = group[index]
+
+            return index
+
+        while len(growing) > 1:
+            for index in list(growing):
+                if index not in growing:
+                    continue
+
+                cell = queues[index].popleft()
+
+                # the low four bits are the moves along the axes
+                for delta in adjacency[passable[cell] & 0b1111]:
+                    neighbour = cell + delta
+                    other = owner.get(neighbour)
+
+                    if other is None:
+                        if components[neighbour] == labels[index]:
+                            owner[neighbour] = index
+                            members[index].append(neighbour)
+                            queues[index].append(neighbour)
+
+                        continue
+
+                    other = find(other)
+
+                    if other == index:
+                        continue
+
+                    if len(members[index]) < len(members[other]):
+                        index, other = other, index
+
+                    group[other] = index
+                    members[index] += members[other]
+                    queues[index] += queues[other]
+                    members[other] = []
+                    queues[other].clear()
+                    growing.discard(other)
+                    growing.add(index)
+
+                if len(queues[index]) == 0:
+                    growing.discard(index)
+
+        pieces = [
+            members[index]
+            for index in range(len(starts))
+            if group[index] == index and len(queues[index]) == 0
+        ]
+
+        return pieces, len(growing) > 0
+
+    def relabel(self, cells: list[int]) -> int:
+        self.label += 1
+        self.components[cells] = self.label
+
+        return self.label
+
+    def split_components(self, cells: collections.abc.Iterable[int]):
+        components = self.components
+        starts: dict[int, list[int]] = {}
+
+        for cell in cells:
+            components[cell] = 0
+
+            for delta in self.adjacency[self.passable[cell] & 0b1111]:
+                neighbour = cell + delta
+                label = int(components[neighbour])
+
+                if label != 0:
+                    starts.setdefault(label, []).append(neighbour)
+
+        # a wall only cuts its own component, whatever piece keeps growing
+        # keeps the label and every piece cut off gets a new one
+        for label, cells_around in starts.items():
+            if len(cells_around) < 2:
+                continue
+
+            pieces, growing = self.flood(cells_around)
+
+            if not growing:
+                pieces.remove(max(pieces, key=len))
+
+            for piece in pieces:
+                self.relabel(piece)
+
+    def merge_components(self, cells: collections.abc.Iterable[int]):
+        adjacency = self.adjacency
+        components = self.components
+        passable = self.passable
+
+        for cell in cells:
+            if components[cell] != 0:
+                continue
+
+            # freed cells next to each other join the same components
+            opened = [cell]
+            components[cell] = -1
+            starts: dict[int, int] = {}
+
+            for current in opened:
+                for delta in adjacency[passable[current] & 0b1111]:
+                    neighbour = current + delta
+                    cell_label = int(components[neighbour])
+
+                    if cell_label == 0:
+                        components[neighbour] = -1
+                        opened.append(neighbour)
+                    elif cell_label > 0:
+                        starts.setdefault(cell_label, neighbour)
+
+            if len(starts) == 0:
+                self.relabel(opened)
+                continue
+
+            label = next(iter(starts))
 
-        offsets = self.NEIGHBOUR_OFFSETS
-        xs = x + offsets[:, 0]
-        ys = y + offsets[:, 1]
+            if len(starts) > 1:
+                # every component but the largest is relabelled, the floods
+                # find which one that is by running the others dry
+                pieces, growing = self.flood(list(starts.values()))
 
-        in_bounds = (0 <= xs) & (xs < self.width) & (0 <= ys) & (ys < self.height)
+                if not growing:
+                    pieces.remove(max(pieces, key=len))
 
-        xs = xs[in_bounds]
-        ys = ys[in_bounds]
+                joined = {int(components[piece[0]]) for piece in pieces}
+                label = next(label for label in starts if label not in joined)
 
-        not_wall = self.cells[ys, xs] != Cell.WALL
+                for piece in pieces:
+                    components[piece] = label
 
-        xs = xs[not_wall]
-        ys = ys[not_wall]
+            components[opened] = label
 
-        for nx, ny in zip(xs, ys):
-            yield int(ny) * self.width + int(nx)
+    def neighbours(self, cell: int) -> collections.abc.Iterator[int]:
+        for delta in self.adjacency[self.passable[cell]]:
+            yield cell + delta
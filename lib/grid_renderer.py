@@ -0,0 +1,224 @@
+import ctypes
+
+import numpy as np
+import numpy.typing as npt
+from OpenGL import GL
+from slimgui import imgui
+
+VERTEX_SHADER: str = """
+#version 330 core
+
+uniform vec4 rect;
+uniform vec2 display;
+
+out vec2 uv;
+
+void main() {
+    vec2 corner = vec2(gl_VertexID & 1, gl_VertexID >> 1);
+    vec2 position = mix(rect.xy, rect.zw, corner) / display;
+
+    uv = corner;
+    gl_Position = vec4(position.x * 2.0 - 1.0, 1.0 - position.y * 2.0, 0.0, 1.0);
+}
+"""
+
+FRAGMENT_SHADER: str = """
+#version 330 core
+
+uniform usampler2D cells;
+uniform sampler2D palette;
+
+in vec2 uv;
+out vec4 color;
+
+void main() {
+    ivec2 size = textureSize(cells, 0);
+    uint paint = texelFetch(cells, min(ivec2(uv * vec2(size)), size - 1), 0).r;
+
+    color = texelFetch(palette, ivec2(int(paint), 0), 0);
+}
+"""
+
+
+def compile_program(vertex: str, fragment: str) -> int:
+    program = GL.glCreateProgram()
+    shaders = []
+
+    for kind, source in (
+        (GL.GL_VERTEX_SHADER, vertex),
+        (GL.GL_FRAGMENT_SHADER, fragment),
+    ):
+        shader = GL.glCreateShader(kind)
+        GL.glShaderSource(shader, source)
+        GL.glCompileShader(shader)
+
+        if not GL.glGetShaderiv(shader, GL.GL_COMPILE_STATUS):
+            raise RuntimeError(GL.glGetShaderInfoLog(shader).decode())
+
+        GL.glAttachShader(program, shader)
+        shaders.append(shader)
+
+    GL.glLinkProgram(program)
+
+    for shader in shaders:
+        GL.glDeleteShader(shader)
+
+    if not GL.glGetProgramiv(program, GL.GL_LINK_STATUS):
+        raise RuntimeError(GL.glGetProgramInfoLog(program).decode())
+
+    return program
+
+
+def create_texture() -> int:
+    texture = GL.glGenTextures(1)
+    GL.glBindTexture(GL.GL_TEXTURE_2D, texture)
+
+    # integer textures cannot be filtered, and the palette must not blend
+    GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_NEAREST)
+    GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_NEAREST)
+    GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S, GL.GL_CLAMP_TO_EDGE)
+    GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, GL.GL_CLAMP_TO_EDGE)
+
+    return texture
+
+
+class GridRenderer:
+    __slots__: tuple[str, ...] = (
+        "buffers",
+        "current",
+        "height",
+        "palette",
+        "program",
+        "rect",
+        "texture",
+        "uniforms",
+        "vertex_array",
+        "width",
+    )
+
+    buffers: tuple[int, int]
+    current: int
+    height: int
+    palette: int
+    program: int
+    rect: tuple[float, float, float, float]
+    texture: int
+    uniforms: dict[str, int]
+    vertex_array: int
+    width: int
+
+    def __init__(self, colors: npt.NDArray[np.uint8]):
+        self.program = compile_program(VERTEX_SHADER, FRAGMENT_SHADER)
+        self.uniforms = {
+            name: GL.glGetUniformLocation(self.program, name)
+            for name in ("cells", "display", "palette", "rect")
+        }
+
+        # the quad is generated from gl_VertexID, core profiles still need a
+        # vertex array bound to draw it
+        self.vertex_array = GL.glGenVertexArrays(1)
+
+        self.palette = create_texture()
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
+        GL.glPixelStorei(GL.GL_UNPACK_ROW_LENGTH, 0)
+        GL.glTexImage2D(
+            GL.GL_TEXTURE_2D,
+            0,
+            GL.GL_RGBA8,
+            len(colors),
+            1,
+            0,
+            GL.GL_RGBA,
+            GL.GL_UNSIGNED_BYTE,
+            np.ascontiguousarray(colors, dtype=np.uint8),
+        )
+
+        self.texture = create_texture()
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+
+        buffers = GL.glGenBuffers(2)
+        self.buffers = (int(buffers[0]), int(buffers[1]))
+        self.current = 0
+        self.height = 0
+        self.rect = (0.0, 0.0, 0.0, 0.0)
+        self.width = 0
+
+    def upload(self, paint: npt.NDArray[np.uint8]):
+        height, width = paint.shape
+        pixels = np.ascontiguousarray(paint, dtype=np.uint8)
+
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self.texture)
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
+        GL.glPixelStorei(GL.GL_UNPACK_ROW_LENGTH, 0)
+
+        if (height, width) != (self.height, self.width):
+            self.height = height
+            self.width = width
+
+            GL.glTexImage2D(
+                GL.GL_TEXTURE_2D,
+                0,
+                GL.GL_R8UI,
+                width,
+                height,
+                0,
+                GL.GL_RED_INTEGER,
+                GL.GL_UNSIGNED_BYTE,
+                None,
+            )
+
+        # the two buffers take turns, and orphaning the storage first lets the
+        # driver hand out fresh memory instead of waiting on an upload in flight
+        self.current ^= 1
+        GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, self.buffers[self.current])
+        GL.glBufferData(
+            GL.GL_PIXEL_UNPACK_BUFFER, pixels.nbytes, None, GL.GL_STREAM_DRAW
+        )
+        GL.glBufferSubData(GL.GL_PIXEL_UNPACK_BUFFER, 0, pixels.nbytes, pixels)
+
+        GL.glTexSubImage2D(
+            GL.GL_TEXTURE_2D,
+            0,
+            0,
+            0,
+            width,
+            height,
+            GL.GL_RED_INTEGER,
+            GL.GL_UNSIGNED_BYTE,
+            ctypes.c_void_p(0),
+        )
+
+        GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, 0)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+
+    def place(self, top_left: tuple[float, float], bottom_right: tuple[float, float]):
+        self.rect = (*top_left, *bottom_right)
+
+    def draw(self, _draw_list: imgui.DrawList, command: imgui.DrawCmd, _userdata: int):
+        io = imgui.get_io()
+        display_w, display_h = io.display_size
+        x0, y0, x1, y1 = command.clip_rect
+
+        # clip rectangles are already scaled to the framebuffer
+        fb_h = display_h * io.display_framebuffer_scale[1]
+        GL.glScissor(int(x0), int(fb_h - y1), int(x1 - x0), int(y1 - y0))
+
+        GL.glUseProgram(self.program)
+        GL.glUniform4f(self.uniforms["rect"], *self.rect)
+        GL.glUniform2f(self.uniforms["display"], display_w, display_h)
+        GL.glUniform1i(self.uniforms["cells"], 0)
+        GL.glUniform1i(self.uniforms["palette"], 1)
+
+        GL.glActiveTexture(GL.GL_TEXTURE1)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self.palette)
+        GL.glActiveTexture(GL.GL_TEXTURE0)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self.texture)
+
+        GL.glBindVertexArray(self.vertex_array)
+        GL.glDrawArrays(GL.GL_TRIANGLE_STRIP, 0, 4)
+
+    def delete(self):
+        GL.glDeleteBuffers(2, self.buffers)
+        GL.glDeleteTextures([self.palette, self.texture])
+        GL.glDeleteVertexArrays(1, [self.vertex_array])
+        GL.glDeleteProgram(self.program)
@@ -0,0 +1,320 @@
+import argparse
+import collections.abc
+import contextlib
+import dataclasses
+import json
+import sys
+import time
+import typing
+
+import numpy as np
+import numpy.typing as npt
+from slimgui import imgui
+
+from lib.algorithm_manager import AlgorithmManager
+from lib.algorithms import Algorithm, UnreachableError
+from lib.grid import Grid
+from lib.solve import add_grid_arguments, check_grid_arguments
+
+POPCOUNT: npt.NDArray[np.uint8] = np.unpackbits(
+    np.arange(256, dtype=np.uint8)[:, None], axis=1
+).sum(axis=1, dtype=np.uint8)
+
+
+@dataclasses.dataclass(slots=True)
+class Timer:
+    calls: int = 0
+    seconds: float = 0.0
+    longest: float = 0.0
+
+
+class Probe:
+    __slots__: tuple[str, ...] = (
+        "algorithm",
+        "closed",
+        "counters",
+        "epoch",
+        "events",
+        "owns_changes",
+        "record_events",
+        "timers",
+    )
+
+    COUNTERS: tuple[str, ...] = (
+        "steps",
+        "pops",
+        "expanded",
+        "pushes",
+        "neighbours",
+        "reopened",
+        "peak_frontier",
+    )
+
+    # the GUI renders from its own thread while the solver records, so every
+    # timer exists up front and neither thread ever changes the dict's keys
+    TIMERS: tuple[str, ...] = (
+        "step",
+        "search",
+        "explored",
+        "frontier",
+        "construct_path",
+        "update_grid_texture",
+    )
+
+    algorithm: Algorithm
+    closed: npt.NDArray[np.bool_]
+    counters: dict[str, int]
+    epoch: int
+    events: list[dict[str, typing.Any]]
+    owns_changes: bool
+    record_events: bool
+    timers: dict[str, Timer]
+
+    def __init__(self, algorithm: Algorithm, record_events: bool = True):
+        # the counters are read off the tracked changes, so the algorithms carry
+        # no bookkeeping of their own and pay nothing while nobody is probing
+        self.owns_changes = algorithm.opened is None
+
+        if self.owns_changes:
+            algorithm.track_changes()
+
+        self.algorithm = algorithm
+        self.closed = np.zeros(algorithm.grid.height * algorithm.grid.width, np.bool_)
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.epoch = time.perf_counter_ns()
+        self.events = []
+        self.record_events = record_events
+        self.timers = {name: Timer() for name in self.TIMERS}
+
+    def record(self, name: str, start: int, stop: int, event: bool = True):
+        seconds = (stop - start) / 1e9
+        timer = self.timers[name]
+        timer.calls += 1
+        timer.seconds += seconds
+        timer.longest = max(timer.longest, seconds)
+
+        if event and self.record_events:
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self.epoch) / 1e3,
+                    "dur": (stop - start) / 1e3,
+                    "pid": 0,
+                    "tid": 0,
+                }
+            )
+
+    @contextlib.contextmanager
+    def measure(self, name: str) -> collections.abc.Iterator[None]:
+        start = time.perf_counter_ns()
+
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter_ns())
+
+    def sample(self):
+        if self.record_events:
+            self.events.append(
+                {
+                    "name": "counters",
+                    "ph": "C",
+                    "ts": (time.perf_counter_ns() - self.epoch) / 1e3,
+                    "pid": 0,
+                    "args": dict(self.counters),
+                }
+            )
+
+    def step(self) -> bool | None:
+        opened = self.algorithm.opened
+        closed = self.algorithm.closed
+        assert opened is not None and closed is not None
+
+        opened_before = len(opened)
+        closed_before = len(closed)
+        frontier_before = self.algorithm.frontier_size()
+
+        start = time.perf_counter_ns()
+        solution_found = self.algorithm.step()
+        self.record("step", start, time.perf_counter_ns(), False)
+
+        new_opened = opened[opened_before:]
+        new_closed = closed[closed_before:]
+        counters = self.counters
+
+        frontier_after = self.algorithm.frontier_size()
+
+        # every push is reported as opened and frontier_size() is the length
+        # of the queue, stale entries included, so whatever else left the
+        # queue was popped
+        counters["steps"] += 1
+        counters["pops"] += len(new_opened) - (frontier_after - frontier_before)
+        counters["pushes"] += len(new_opened)
+        counters["expanded"] += len(new_closed)
+
+        if len(new_opened) > 0:
+            counters["reopened"] += int(np.count_nonzero(self.closed[new_opened]))
+
+        # the passable neighbours of the expanded cells, the ones their
+        # searches look at
+        if len(new_closed) > 0:
+            self.closed[new_closed] = True
+            counters["neighbours"] += int(
+                POPCOUNT[self.algorithm.grid.passable[new_closed]].sum()
+            )
+
+        counters["peak_frontier"] = max(counters["peak_frontier"], frontier_after)
+
+        if self.owns_changes:
+            opened.clear()
+            closed.clear()
+
+        return solution_found
+
+    def explored(self) -> npt.NDArray[np.int32]:
+        with self.measure("explored"):
+            return self.algorithm.explored()
+
+    def frontier(self) -> npt.NDArray[np.int32]:
+        with self.measure("frontier"):
+            return self.algorithm.frontier()
+
+    def construct_path(self):
+        with self.measure("construct_path"):
+            self.algorithm.construct_path()
+
+    def metrics(self) -> dict[str, typing.Any]:
+        return {
+            "algorithm": type(self.algorithm).__name__,
+            "counters": dict(self.counters),
+            "timers": {
+                name: dataclasses.asdict(timer)
+                for name, timer in self.timers.items()
+                if timer.calls > 0
+            },
+        }
+
+    def chrome_trace(self) -> dict[str, typing.Any]:
+        return {
+            "traceEvents": [
+                {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": 0,
+                    "args": {"name": type(self.algorithm).__name__},
+                },
+                *self.events,
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def render(self):
+        for name in self.COUNTERS:
+            imgui.text(f"{name.replace('_', ' ')}: {self.counters[name]}")
+
+        imgui.separator()
+
+        for name, timer in self.timers.items():
+            if timer.calls == 0:
+                continue
+
+            mean = timer.seconds / timer.calls * 1e6
+            imgui.text(
+                f"{name}: {timer.calls} calls, {mean:.1f} us mean, "
+                f"{timer.longest * 1e3:.2f} ms max"
+            )
+
+
+def main(argv: list[str] | None = None) -> int:
+    algorithms = {
+        algorithm.__name__: algorithm for algorithm in AlgorithmManager.ALGORITHMS
+    }
+
+    parser = argparse.ArgumentParser(
+        prog="python -m lib.instrument",
+        description="Count and time the work of an algorithm without a window",
+    )
+    parser.add_argument("output", metavar="OUTPUT")
+    parser.add_argument("kernel", metavar="KERNEL")
+    parser.add_argument(
+        "-a",
+        "--algorithm",
+        choices=algorithms,
+        default=AlgorithmManager.ALGORITHMS[0].__name__,
+    )
+    add_grid_arguments(parser)
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=("json", "chrome"),
+        default="json",
+        help="chrome writes trace events for chrome://tracing or Perfetto",
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=1000,
+        metavar="STEPS",
+        help="steps per search span, followed by an explored() and frontier() call",
+    )
+
+    arguments = parser.parse_args(argv)
+
+    check_grid_arguments(parser, arguments)
+
+    if arguments.interval < 1:
+        parser.error("interval must be positive")
+
+    ox, oy = arguments.origin
+    tx, ty = arguments.target
+    origin = oy * arguments.width + ox
+    target = ty * arguments.width + tx
+
+    grid = Grid.generate(
+        arguments.height,
+        arguments.width,
+        origin,
+        target,
+        Grid.kernel_rng(arguments.kernel),
+        connectivity=arguments.connectivity,
+        generator=arguments.generator,
+        threads=arguments.threads,
+    )
+
+    try:
+        probe = Probe(algorithms[arguments.algorithm](grid, origin, target))
+    except UnreachableError as error:
+        parser.error(str(error))
+
+    solution_found = None
+
+    while solution_found is None:
+        with probe.measure("search"):
+            for _ in range(arguments.interval):
+                if (solution_found := probe.step()) is not None:
+                    break
+
+        probe.explored()
+        probe.frontier()
+        probe.sample()
+
+    if solution_found:
+        probe.construct_path()
+
+    with open(arguments.output, "w") as file:
+        if arguments.format == "chrome":
+            json.dump(probe.chrome_trace(), file)
+        else:
+            json.dump(probe.metrics(), file, indent=4)
+
+    print(
+        f"probed {probe.counters['steps']} steps "
+        f"({probe.counters['expanded']} expanded) to {arguments.output}"
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
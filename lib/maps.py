@@ -0,0 +1,85 @@
+import dataclasses
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.grid import Cell, Grid
+
+MOVINGAI_TERRAIN: npt.NDArray[np.int8] = np.full(256, Cell.WALL, dtype=np.int8)
+MOVINGAI_TERRAIN[list(b".GS")] = Cell.FREE
+
+
+@dataclasses.dataclass(slots=True)
+class Scenario:
+    bucket: int
+    map: str
+    height: int
+    width: int
+    origin: tuple[int, int]
+    target: tuple[int, int]
+    optimal_length: float
+
+
+def load_movingai_map(path: str) -> Grid:
+    with open(path, "rb") as file:
+        header: dict[str, str] = {}
+
+        while (line := file.readline()) and line.strip() != b"map":
+            name, _, value = line.decode("ascii").strip().partition(" ")
+            header[name] = value.strip()
+
+        try:
+            height = int(header.get("height", ""))
+            width = int(header.get("width", ""))
+        except ValueError:
+            raise ValueError(f"{path} has no valid MovingAI header")
+
+        data = np.frombuffer(file.read(), dtype=np.uint8)
+
+    # rows may end in \n or \r\n, so strip every line break before reshaping
+    data = data[(data != ord("\n")) & (data != ord("\r"))]
+
+    if len(data) < height * width:
+        raise ValueError(f"{path} holds fewer than {height}x{width} cells")
+
+    cells = MOVINGAI_TERRAIN[data[: height * width]].reshape(height, width)
+    connectivity = 8 if header.get("type") == "octile" else 4
+
+    return Grid(cells, connectivity)
+
+
+def load_scenarios(path: str) -> list[Scenario]:
+    scenarios: list[Scenario] = []
+
+    with open(path) as file:
+        for line in file:
+            fields = line.split()
+
+            if len(fields) == 0 or fields[0] == "version":
+                continue
+
+            if len(fields) != 9:
+                raise ValueError(f"malformed scenario line {line!r} in {path}")
+
+            bucket, map_name, width, height, ox, oy, tx, ty = fields[:8]
+
+            scenarios.append(
+                Scenario(
+                    bucket=int(bucket),
+                    map=map_name,
+                    height=int(height),
+                    width=int(width),
+                    origin=(int(ox), int(oy)),
+                    target=(int(tx), int(ty)),
+                    optimal_length=float(fields[8]),
+                )
+            )
+
+    return scenarios
+
+
+def load_map(path: str) -> Grid:
+    if path.lower().endswith(".map"):
+        return load_movingai_map(path)
+
+    return Grid.load(path)
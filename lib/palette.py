@@ -0,0 +1,34 @@
+import enum
+
+import numpy as np
+
+EXPLORED_COLOR: tuple[int, int, int, int] = (93, 187, 99, 255)
+FRONTIER_COLOR: tuple[int, int, int, int] = (61, 237, 151, 255)
+PATH_COLOR: tuple[int, int, int, int] = (176, 252, 56, 255)
+
+FREE_COLOR: tuple[int, int, int, int] = (255, 255, 255, 255)
+WALL_COLOR: tuple[int, int, int, int] = (62, 61, 83, 255)
+
+
+# ordered by priority, downsampled views keep the highest paint of a block
+class Paint(enum.IntEnum):
+    FREE = 0
+    WALL = 1
+    EXPLORED = 2
+    FRONTIER = 3
+    PATH = 4
+
+
+PALETTE = np.array(
+    [
+        FREE_COLOR,
+        WALL_COLOR,
+        EXPLORED_COLOR,
+        FRONTIER_COLOR,
+        PATH_COLOR,
+    ],
+    dtype=np.uint8,
+)
+
+CELL_PAINT = np.array([Paint.FREE, Paint.WALL], dtype=np.uint8)
+MARK_PAINT = np.array([Paint.FREE, Paint.FRONTIER, Paint.EXPLORED], dtype=np.uint8)
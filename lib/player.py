@@ -0,0 +1,74 @@
+import numpy as np
+import numpy.typing as npt
+from slimgui import imgui
+
+from lib.trace import Trace
+
+
+class Player:
+    __slots__: tuple[str, ...] = ("marks", "playing", "speed", "step", "trace")
+
+    marks: npt.NDArray[np.uint8]
+    playing: bool
+    speed: int
+    step: int
+    trace: Trace
+
+    def __init__(self, trace: Trace):
+        self.marks = trace.marks_at(0)
+        self.playing = True
+        self.speed = 1
+        self.step = 0
+        self.trace = trace
+
+    @property
+    def finished(self) -> bool:
+        return self.step == self.trace.steps
+
+    def advance(self) -> npt.NDArray[np.intp]:
+        if not self.playing or self.finished:
+            return np.empty(0, dtype=np.intp)
+
+        stop = min(self.step + self.speed, self.trace.steps)
+        self.trace.apply(self.marks, self.step, stop)
+        changed = self.trace.changes(self.step, stop)
+        self.step = stop
+
+        if self.finished:
+            self.playing = False
+
+        return changed
+
+    def seek(self, step: int):
+        self.marks = self.trace.marks_at(step)
+        self.step = min(max(step, 0), self.trace.steps)
+
+    def render(self) -> bool:
+        label = "Pause" if self.playing else "Play"
+
+        if imgui.button(label, (64.0, 0.0)):
+            self.playing = not self.playing
+
+            if self.playing and self.finished:
+                self.seek(0)
+                return True
+
+        imgui.same_line()
+        imgui.push_item_width(-1)
+        seeked, new_step = imgui.slider_int(
+            "##step", self.step, 0, self.trace.steps, "step %d"
+        )
+        _, self.speed = imgui.slider_int(
+            "##speed",
+            self.speed,
+            1,
+            max(self.trace.steps, 1),
+            "%d steps per frame",
+            imgui.SliderFlags.LOGARITHMIC,
+        )
+        imgui.pop_item_width()
+
+        if seeked:
+            self.seek(new_step)
+
+        return seeked
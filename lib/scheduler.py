@@ -0,0 +1,111 @@
+import collections.abc
+import enum
+import time
+
+from slimgui import imgui
+
+from lib.algorithms import Algorithm
+from lib.instrument import Probe
+
+
+class Schedule(enum.IntEnum):
+    BUDGET = 0
+    FIXED = 1
+    UNLIMITED = 2
+
+
+class Scheduler:
+    __slots__: tuple[str, ...] = ("frame_budget", "schedule", "steps_per_frame")
+
+    LABELS: tuple[str, ...] = (
+        "Time budget",
+        "Fixed steps",
+        "As fast as possible",
+    )
+
+    SLICE: float = 16.0
+
+    # a slice can run up to 100k steps, a pause or cancel is checked for this
+    # often so it does not wait for the whole slice
+    INTERRUPT_INTERVAL: int = 1024
+
+    frame_budget: float
+    schedule: Schedule
+    steps_per_frame: int
+
+    def __init__(self) -> None:
+        self.frame_budget = 8.0
+        self.schedule = Schedule.BUDGET
+        self.steps_per_frame = 1
+
+    def paced(self) -> bool:
+        return self.schedule != Schedule.UNLIMITED
+
+    def run(
+        self,
+        algorithm: Algorithm | Probe,
+        interrupted: collections.abc.Callable[[], bool] = lambda: False,
+    ) -> bool | None:
+        interval = type(self).INTERRUPT_INTERVAL
+        solution_found = None
+        steps = 0
+
+        match self.schedule:
+            case Schedule.BUDGET | Schedule.UNLIMITED:
+                # unpaced searches still stop every slice to publish progress
+                budget = (
+                    self.frame_budget
+                    if self.schedule == Schedule.BUDGET
+                    else type(self).SLICE
+                )
+                deadline = time.perf_counter() + budget / 1000
+
+                while (solution_found := algorithm.step()) is None:
+                    steps += 1
+
+                    if time.perf_counter() >= deadline or (
+                        steps % interval == 0 and interrupted()
+                    ):
+                        break
+            case Schedule.FIXED:
+                while steps < self.steps_per_frame:
+                    if (solution_found := algorithm.step()) is not None:
+                        break
+
+                    steps += 1
+
+                    if steps % interval == 0 and interrupted():
+                        break
+
+        return solution_found
+
+    def render(self):
+        imgui.push_item_width(-1)
+        changed, new_schedule = imgui.combo(
+            "##schedule", self.schedule, type(self).LABELS
+        )
+
+        if changed:
+            self.schedule = Schedule(new_schedule)
+
+        match self.schedule:
+            case Schedule.BUDGET:
+                _, self.frame_budget = imgui.slider_float(
+                    "##frame_budget",
+                    self.frame_budget,
+                    0.1,
+                    100.0,
+                    "%.1f ms per frame",
+                    imgui.SliderFlags.LOGARITHMIC,
+                )
+            case Schedule.FIXED:
+                _, self.steps_per_frame = imgui.slider_int(
+                    "##steps_per_frame",
+                    self.steps_per_frame,
+                    1,
+                    100_000,
+                    "%d steps per frame",
+                    imgui.SliderFlags.LOGARITHMIC,
+                )
+
+        imgui.pop_item_width()
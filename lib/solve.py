@@ -0,0 +1,336 @@
+import argparse
+import csv
+import dataclasses
+import json
+import math
+import os
+import sys
+import typing
+
+from lib.algorithm_manager import AlgorithmManager
+from lib.algorithms import Algorithm
+from lib.batch import Query, solve_all
+from lib.generators import GENERATORS
+from lib.maps import load_map, load_scenarios
+
+# MovingAI prints its optimal lengths to a few decimals and prices diagonal
+# moves at √2 itself, a path cost this close to one is optimal
+OPTIMAL_TOLERANCE: float = 1e-6
+
+
+def parse_position(value: str) -> tuple[int, int]:
+    try:
+        x, y = map(int, value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected x,y but got {value!r}")
+
+    return x, y
+
+
+def add_grid_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--height", type=int, default=32)
+    parser.add_argument("--width", type=int, default=32)
+    parser.add_argument("--connectivity", type=int, choices=(4, 8), default=4)
+    parser.add_argument(
+        "--generator",
+        choices=[generator.__name__ for generator in GENERATORS],
+        default=GENERATORS[0].__name__,
+        help="kind of maze a kernel generates",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=1,
+        help="threads generating a maze, the maze does not depend on it",
+    )
+    parser.add_argument(
+        "--origin",
+        type=parse_position,
+        default=(0, 0),
+        metavar="X,Y",
+    )
+    parser.add_argument(
+        "--target",
+        type=parse_position,
+        default=None,
+        metavar="X,Y",
+        help="(default: the bottom right corner)",
+    )
+
+
+def check_grid_arguments(
+    parser: argparse.ArgumentParser, arguments: argparse.Namespace
+):
+    if arguments.target is None:
+        arguments.target = (arguments.width - 1, arguments.height - 1)
+
+    if arguments.threads < 1:
+        parser.error("threads must be positive")
+
+    generators = {generator.__name__: generator for generator in GENERATORS}
+    arguments.generator = generators[arguments.generator]()
+
+    for name in ("origin", "target"):
+        x, y = getattr(arguments, name)
+
+        if not (0 <= x < arguments.width and 0 <= y < arguments.height):
+            parser.error(f"{name} lies outside of the grid")
+
+
+def parse_arguments(argv: list[str] | None) -> argparse.Namespace:
+    algorithms = {
+        algorithm.__name__: algorithm for algorithm in AlgorithmManager.ALGORITHMS
+    }
+
+    parser = argparse.ArgumentParser(
+        prog="python -m lib.solve",
+        description="Run path finding algorithms to completion without a window",
+    )
+    parser.add_argument(
+        "kernels",
+        nargs="*",
+        metavar="KERNEL",
+        help="seed used to generate a maze, as typed into the GUI",
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithm",
+        action="append",
+        choices=algorithms,
+        help="algorithm to run, may be repeated (default: all)",
+    )
+    add_grid_arguments(parser)
+    parser.add_argument(
+        "--seeds",
+        type=int,
+        default=0,
+        metavar="N",
+        help="additionally solve the kernels 0 to N-1",
+    )
+    parser.add_argument(
+        "--map",
+        metavar="PATH",
+        help="solve on a MovingAI .map or a saved grid instead of generated mazes, "
+        "the map decides the size and connectivity",
+    )
+    parser.add_argument(
+        "--scen",
+        metavar="PATH",
+        help="MovingAI scenario file whose queries replace --origin and --target",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=("json", "csv"),
+        default="json",
+        help="json writes one object per line",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=argparse.FileType("w"),
+        default=sys.stdout,
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="also report the peak traced allocation size of every search, slows "
+        "it down",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="worker processes, 0 uses every available core",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=16,
+        metavar="QUERIES",
+        help="queries a worker solves per round trip",
+    )
+    parser.add_argument(
+        "--distance-cache",
+        type=int,
+        default=None,
+        metavar="MEGABYTES",
+        help="additionally answer every query by following a cached reverse BFS "
+        "field of its target, kept under this budget per worker",
+    )
+
+    arguments = parser.parse_args(argv)
+    arguments.algorithm = [
+        algorithms[name] for name in arguments.algorithm or algorithms
+    ]
+    arguments.kernels += map(str, range(arguments.seeds))
+
+    if arguments.jobs == 0:
+        arguments.jobs = os.process_cpu_count() or 1
+
+    if arguments.jobs < 0 or arguments.chunk_size < 1:
+        parser.error("jobs and chunk-size must be positive")
+
+    if arguments.distance_cache is not None and arguments.distance_cache < 0:
+        parser.error("distance-cache must not be negative")
+
+    arguments.grid = None
+    arguments.scenarios = None
+
+    if arguments.map is not None:
+        if len(arguments.kernels) != 0:
+            parser.error("kernels cannot be combined with --map")
+
+        try:
+            arguments.grid = load_map(arguments.map)
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+
+        arguments.height = arguments.grid.height
+        arguments.width = arguments.grid.width
+        arguments.connectivity = arguments.grid.connectivity
+    elif arguments.scen is not None:
+        parser.error("--scen requires --map")
+    elif len(arguments.kernels) == 0:
+        parser.error("no kernels given, pass KERNEL, --seeds or --map")
+
+    check_grid_arguments(parser, arguments)
+
+    if arguments.scen is not None:
+        try:
+            arguments.scenarios = load_scenarios(arguments.scen)
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+
+        for scenario in arguments.scenarios:
+            if (scenario.height, scenario.width) != (arguments.height, arguments.width):
+                parser.error(f"{arguments.scen} was made for a different map size")
+
+    return arguments
+
+
+def queries(
+    arguments: argparse.Namespace,
+) -> typing.Iterator[tuple[dict[str, typing.Any], Query]]:
+    algorithms: list[type[Algorithm] | None] = list(arguments.algorithm)
+
+    if arguments.distance_cache is not None:
+        algorithms.append(None)
+
+    if arguments.grid is None:
+        ox, oy = arguments.origin
+        tx, ty = arguments.target
+        origin = oy * arguments.width + ox
+        target = ty * arguments.width + tx
+
+        for kernel in arguments.kernels:
+            for algorithm in algorithms:
+                record = {
+                    "algorithm": "DistanceCache"
+                    if algorithm is None
+                    else algorithm.__name__,
+                    "kernel": kernel,
+                    "height": arguments.height,
+                    "width": arguments.width,
+                    "origin": origin,
+                    "target": target,
+                }
+
+                yield record, Query(algorithm, kernel, origin, target)
+
+        return
+
+    if arguments.scenarios is None:
+        scenarios = [(None, arguments.origin, arguments.target, None)]
+    else:
+        scenarios = [
+            (
+                scenario.bucket,
+                scenario.origin,
+                scenario.target,
+                scenario.optimal_length,
+            )
+            for scenario in arguments.scenarios
+        ]
+
+    for bucket, (ox, oy), (tx, ty), optimal_length in scenarios:
+        origin = oy * arguments.width + ox
+        target = ty * arguments.width + tx
+
+        for algorithm in algorithms:
+            record = {
+                "algorithm": "DistanceCache"
+                if algorithm is None
+                else algorithm.__name__,
+                "map": arguments.map,
+                "bucket": bucket,
+                "height": arguments.height,
+                "width": arguments.width,
+                "origin": origin,
+                "target": target,
+                "optimal_length": optimal_length,
+            }
+
+            yield record, Query(algorithm, None, origin, target)
+
+
+def optimal(path_cost: float | None, optimal_length: float | None) -> bool | None:
+    if optimal_length is None:
+        return None
+
+    return path_cost is not None and math.isclose(
+        path_cost,
+        optimal_length,
+        rel_tol=OPTIMAL_TOLERANCE,
+        abs_tol=OPTIMAL_TOLERANCE,
+    )
+
+
+def records(arguments: argparse.Namespace) -> typing.Iterator[dict[str, typing.Any]]:
+    rows = list(queries(arguments))
+    results = solve_all(
+        (query for _, query in rows),
+        arguments.grid,
+        arguments.height,
+        arguments.width,
+        arguments.connectivity,
+        arguments.generator,
+        arguments.trace_memory,
+        arguments.jobs,
+        arguments.chunk_size,
+        (arguments.distance_cache or 0) << 20,
+    )
+
+    for (record, _), statistics in zip(rows, results):
+        row = {**record, **dataclasses.asdict(statistics)}
+
+        if "optimal_length" in record:
+            row["optimal"] = optimal(statistics.path_cost, record["optimal_length"])
+
+        yield row
+
+
+def main(argv: list[str] | None = None) -> int:
+    arguments = parse_arguments(argv)
+
+    if arguments.format == "csv":
+        writer = None
+
+        for record in records(arguments):
+            if writer is None:
+                writer = csv.DictWriter(arguments.output, list(record))
+                writer.writeheader()
+
+            writer.writerow(record)
+    else:
+        for record in records(arguments):
+            json.dump(record, arguments.output)
+            arguments.output.write("\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+import argparse
+import enum
+import sys
+import typing
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.algorithm_manager import AlgorithmManager
+from lib.algorithms import Algorithm, UnreachableError
+from lib.grid import Cell, Grid
+from lib.solve import add_grid_arguments, check_grid_arguments
+
+
+def offsets(counts: npt.NDArray[np.int32]) -> npt.NDArray[np.intp]:
+    return np.concatenate(([0], np.cumsum(counts, dtype=np.intp)))
+
+
+class Mark(enum.IntEnum):
+    UNSEEN = 0
+    FRONTIER = 1
+    EXPLORED = 2
+
+
+class Trace:
+    __slots__: tuple[str, ...] = (
+        "cells",
+        "closed",
+        "closed_offsets",
+        "keyframe_explored",
+        "keyframe_frontier",
+        "keyframe_interval",
+        "opened",
+        "opened_offsets",
+        "path",
+    )
+
+    cells: npt.NDArray[np.int8]
+    closed: npt.NDArray[np.intp]
+    closed_offsets: npt.NDArray[np.intp]
+    keyframe_explored: npt.NDArray[np.uint8]
+    keyframe_frontier: npt.NDArray[np.uint8]
+    keyframe_interval: int
+    opened: npt.NDArray[np.intp]
+    opened_offsets: npt.NDArray[np.intp]
+    path: npt.NDArray[np.intp]
+
+    def __init__(
+        self,
+        cells: npt.NDArray[np.int8],
+        opened: npt.NDArray[np.intp],
+        opened_offsets: npt.NDArray[np.intp],
+        closed: npt.NDArray[np.intp],
+        closed_offsets: npt.NDArray[np.intp],
+        keyframe_interval: int,
+        keyframe_explored: npt.NDArray[np.uint8],
+        keyframe_frontier: npt.NDArray[np.uint8],
+        path: npt.NDArray[np.intp],
+    ):
+        if len(opened_offsets) != len(closed_offsets):
+            raise ValueError("opened and closed events cover different steps")
+
+        self.cells = cells
+        self.closed = closed
+        self.closed_offsets = closed_offsets
+        self.keyframe_explored = keyframe_explored
+        self.keyframe_frontier = keyframe_frontier
+        self.keyframe_interval = keyframe_interval
+        self.opened = opened
+        self.opened_offsets = opened_offsets
+        self.path = path
+
+    @classmethod
+    def record(cls, algorithm: Algorithm, keyframe_interval: int = 1024) -> typing.Self:
+        marks = np.zeros(algorithm.grid.height * algorithm.grid.width, dtype=np.uint8)
+        marks[algorithm.explored()] = Mark.EXPLORED
+        marks[algorithm.frontier()] = Mark.FRONTIER
+
+        opened: list[npt.NDArray[np.intp]] = []
+        closed: list[npt.NDArray[np.intp]] = []
+        opened_counts = [0]
+        closed_counts = [0]
+        keyframe_explored = [np.packbits(marks == Mark.EXPLORED)]
+        keyframe_frontier = [np.packbits(marks == Mark.FRONTIER)]
+
+        algorithm.track_changes()
+
+        while True:
+            solution_found = algorithm.step()
+            step_opened, step_closed = algorithm.take_changes()
+
+            marks[step_closed] = Mark.EXPLORED
+            marks[step_opened] = Mark.FRONTIER
+
+            opened.append(step_opened)
+            closed.append(step_closed)
+            opened_counts.append(len(step_opened))
+            closed_counts.append(len(step_closed))
+
+            if (len(opened_counts) - 1) % keyframe_interval == 0:
+                keyframe_explored.append(np.packbits(marks == Mark.EXPLORED))
+                keyframe_frontier.append(np.packbits(marks == Mark.FRONTIER))
+
+            if solution_found is not None:
+                break
+
+        if solution_found:
+            algorithm.construct_path()
+
+        return cls(
+            algorithm.grid.cells.copy(),
+            np.concatenate(opened),
+            np.cumsum(opened_counts, dtype=np.intp),
+            np.concatenate(closed),
+            np.cumsum(closed_counts, dtype=np.intp),
+            keyframe_interval,
+            np.stack(keyframe_explored),
+            np.stack(keyframe_frontier),
+            np.empty(0, dtype=np.intp) if algorithm.path is None else algorithm.path,
+        )
+
+    @classmethod
+    def load(cls, file: typing.Any) -> typing.Self:
+        with np.load(file) as archive:
+            height, width, keyframe_interval = archive["shape"].tolist()
+
+            walls = np.unpackbits(archive["walls"], count=height * width)
+            opened = np.cumsum(archive["opened"], dtype=np.intp)
+            closed = np.cumsum(archive["closed"], dtype=np.intp)
+
+            return cls(
+                (walls.astype(np.int8) * Cell.WALL).reshape(height, width),
+                opened,
+                offsets(archive["opened_counts"]),
+                closed,
+                offsets(archive["closed_counts"]),
+                keyframe_interval,
+                archive["keyframe_explored"],
+                archive["keyframe_frontier"],
+                archive["path"].astype(np.intp),
+            )
+
+    def save(self, file: typing.Any):
+        np.savez_compressed(
+            file,
+            shape=np.array([*self.cells.shape, self.keyframe_interval], dtype=np.int64),
+            walls=np.packbits(self.cells.reshape(-1) == Cell.WALL),
+            opened=np.diff(self.opened, prepend=0).astype(np.int32),
+            opened_counts=np.diff(self.opened_offsets).astype(np.int32),
+            closed=np.diff(self.closed, prepend=0).astype(np.int32),
+            closed_counts=np.diff(self.closed_offsets).astype(np.int32),
+            keyframe_explored=self.keyframe_explored,
+            keyframe_frontier=self.keyframe_frontier,
+            path=self.path.astype(np.int32),
+        )
+
+    @property
+    def steps(self) -> int:
+        return len(self.opened_offsets) - 1
+
+    def apply(self, marks: npt.NDArray[np.uint8], start: int, stop: int):
+        opened = self.opened[self.opened_offsets[start] : self.opened_offsets[stop]]
+        closed = self.closed[self.closed_offsets[start] : self.closed_offsets[stop]]
+
+        # a search closes cells before it opens others within a step, and a
+        # cell can change more than once over a range, as LPA* reopens closed
+        # ones, so the last change of every cell decides its mark
+        steps = np.arange(start, stop, dtype=np.intp) << 1
+        order = np.concatenate(
+            (
+                np.repeat(steps, np.diff(self.closed_offsets[start : stop + 1])),
+                np.repeat(steps | 1, np.diff(self.opened_offsets[start : stop + 1])),
+            )
+        )
+        ordered = np.argsort(order, kind="stable")
+        cells = np.concatenate((closed, opened))[ordered]
+        values = np.concatenate(
+            (
+                np.full(len(closed), Mark.EXPLORED, dtype=np.uint8),
+                np.full(len(opened), Mark.FRONTIER, dtype=np.uint8),
+            )
+        )[ordered]
+
+        _, last = np.unique(cells[::-1], return_index=True)
+        last = len(cells) - 1 - last
+
+        marks[cells[last]] = values[last]
+
+    def changes(self, start: int, stop: int) -> npt.NDArray[np.intp]:
+        return np.concatenate(
+            (
+                self.opened[self.opened_offsets[start] : self.opened_offsets[stop]],
+                self.closed[self.closed_offsets[start] : self.closed_offsets[stop]],
+            )
+        )
+
+    def marks_at(self, step: int) -> npt.NDArray[np.uint8]:
+        step = min(max(step, 0), self.steps)
+        keyframe = step // self.keyframe_interval
+        length = self.cells.size
+
+        marks = np.zeros(length, dtype=np.uint8)
+        marks[np.unpackbits(self.keyframe_frontier[keyframe], count=length) != 0] = (
+            Mark.FRONTIER
+        )
+        marks[np.unpackbits(self.keyframe_explored[keyframe], count=length) != 0] = (
+            Mark.EXPLORED
+        )
+
+        self.apply(marks, keyframe * self.keyframe_interval, step)
+
+        return marks
+
+
+def main(argv: list[str] | None = None) -> int:
+    algorithms = {
+        algorithm.__name__: algorithm for algorithm in AlgorithmManager.ALGORITHMS
+    }
+
+    parser = argparse.ArgumentParser(
+        prog="python -m lib.trace",
+        description="Record the exploration of an algorithm for replay",
+    )
+    parser.add_argument("output", metavar="TRACE", help="path of the .npz file")
+    parser.add_argument("kernel", metavar="KERNEL")
+    parser.add_argument(
+        "-a",
+        "--algorithm",
+        choices=algorithms,
+        default=AlgorithmManager.ALGORITHMS[0].__name__,
+    )
+    add_grid_arguments(parser)
+    parser.add_argument(
+        "--keyframe-interval",
+        type=int,
+        default=1024,
+        metavar="STEPS",
+        help="steps between full snapshots, bounds the cost of seeking",
+    )
+
+    arguments = parser.parse_args(argv)
+
+    check_grid_arguments(parser, arguments)
+
+    if arguments.keyframe_interval < 1:
+        parser.error("the keyframe interval must be positive")
+
+    ox, oy = arguments.origin
+    tx, ty = arguments.target
+    origin = oy * arguments.width + ox
+    target = ty * arguments.width + tx
+
+    grid = Grid.generate(
+        arguments.height,
+        arguments.width,
+        origin,
+        target,
+        Grid.kernel_rng(arguments.kernel),
+        connectivity=arguments.connectivity,
+        generator=arguments.generator,
+        threads=arguments.threads,
+    )
+
+    try:
+        algorithm = algorithms[arguments.algorithm](grid, origin, target)
+    except UnreachableError as error:
+        parser.error(str(error))
+
+    trace = Trace.record(algorithm, arguments.keyframe_interval)
+    trace.save(arguments.output)
+
+    print(f"recorded {trace.steps} steps to {arguments.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
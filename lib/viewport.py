@@ -0,0 +1,114 @@
+import math
+
+import numpy as np
+import numpy.typing as npt
+
+
+def downsample(level: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+    height, width = level.shape
+
+    rows = level[0::2].copy()
+    np.maximum(rows[: height // 2], level[1::2], out=rows[: height // 2])
+
+    blocks = rows[:, 0::2].copy()
+    np.maximum(blocks[:, : width // 2], rows[:, 1::2], out=blocks[:, : width // 2])
+
+    return blocks
+
+
+class Pyramid:
+    __slots__: tuple[str, ...] = ("levels",)
+
+    levels: list[npt.NDArray[np.uint8]]
+
+    def __init__(self, paint: npt.NDArray[np.uint8]):
+        self.levels = [paint]
+
+        while max(self.levels[-1].shape) > 1:
+            self.levels.append(downsample(self.levels[-1]))
+
+    def update(self, cells: npt.NDArray[np.intp]):
+        if len(cells) == 0:
+            return
+
+        ys, xs = np.divmod(cells, self.levels[0].shape[1])
+
+        for child, level in zip(self.levels, self.levels[1:]):
+            width = level.shape[1]
+            blocks = np.unique((ys >> 1) * width + (xs >> 1))
+            ys, xs = np.divmod(blocks, width)
+
+            y0 = ys << 1
+            x0 = xs << 1
+            y1 = np.minimum(y0 + 1, child.shape[0] - 1)
+            x1 = np.minimum(x0 + 1, child.shape[1] - 1)
+
+            level[ys, xs] = np.maximum(
+                np.maximum(child[y0, x0], child[y0, x1]),
+                np.maximum(child[y1, x0], child[y1, x1]),
+            )
+
+
+class Viewport:
+    __slots__: tuple[str, ...] = ("height", "scale", "width", "x", "y")
+
+    MAX_SCALE: float = 64.0
+
+    height: int
+    scale: float
+    width: int
+    x: float
+    y: float
+
+    def __init__(self, height: int, width: int):
+        self.height = height
+        self.scale = 1.0
+        self.width = width
+        self.x = 0.0
+        self.y = 0.0
+
+    def fit_scale(self, fb_h: int, fb_w: int) -> float:
+        return min(fb_w / self.width, fb_h / self.height)
+
+    def fit(self, fb_h: int, fb_w: int):
+        self.scale = self.fit_scale(fb_h, fb_w)
+        self.x = (self.width - fb_w / self.scale) / 2
+        self.y = (self.height - fb_h / self.scale) / 2
+
+    def zoom(self, factor: float, px: float, py: float, fb_h: int, fb_w: int):
+        cx = self.x + px / self.scale
+        cy = self.y + py / self.scale
+
+        self.scale = min(
+            max(self.scale * factor, self.fit_scale(fb_h, fb_w) / 2), self.MAX_SCALE
+        )
+        self.x = cx - px / self.scale
+        self.y = cy - py / self.scale
+
+    def pan(self, dx: float, dy: float):
+        self.x -= dx / self.scale
+        self.y -= dy / self.scale
+
+    def level(self) -> int:
+        return max(math.floor(-math.log2(self.scale)), 0)
+
+    def region(self, fb_h: int, fb_w: int) -> tuple[int, int, int, int, int]:
+        level = self.level()
+        size = 1 << level
+
+        y0 = max(math.floor(self.y) >> level, 0)
+        x0 = max(math.floor(self.x) >> level, 0)
+        y1 = min(
+            math.ceil(self.y + fb_h / self.scale) // size + 1, -(-self.height // size)
+        )
+        x1 = min(
+            math.ceil(self.x + fb_w / self.scale) // size + 1, -(-self.width // size)
+        )
+
+        return level, y0, max(y1, y0), x0, max(x1, x0)
+
+    def to_screen(self, cx: float, cy: float) -> tuple[float, float]:
+        return (cx - self.x) * self.scale, (cy - self.y) * self.scale
+
+    def to_grid(self, px: float, py: float) -> tuple[float, float]:
+        return self.x + px / self.scale, self.y + py / self.scale
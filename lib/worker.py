@@ -0,0 +1,139 @@
+import dataclasses
+import threading
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.algorithms import Algorithm
+from lib.instrument import Probe
+from lib.scheduler import Scheduler
+
+
+@dataclasses.dataclass(slots=True)
+class Frame:
+    opened: list[npt.NDArray[np.intp]] = dataclasses.field(default_factory=list)
+    closed: list[npt.NDArray[np.intp]] = dataclasses.field(default_factory=list)
+    solution_found: bool | None = None
+
+    def clear(self):
+        self.opened.clear()
+        self.closed.clear()
+        self.solution_found = None
+
+    def changes(self) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]:
+        empty = np.empty(0, dtype=np.intp)
+
+        return np.concatenate([empty, *self.opened]), np.concatenate(
+            [empty, *self.closed]
+        )
+
+
+class Worker:
+    __slots__: tuple[str, ...] = (
+        "algorithm",
+        "back",
+        "cancelled",
+        "condition",
+        "front",
+        "granted",
+        "paused",
+        "probe",
+        "scheduler",
+        "thread",
+    )
+
+    algorithm: Algorithm
+    back: Frame
+    cancelled: bool
+    condition: threading.Condition
+    front: Frame
+    granted: bool
+    paused: bool
+    probe: Probe | None
+    scheduler: Scheduler
+    thread: threading.Thread
+
+    def __init__(
+        self, algorithm: Algorithm, scheduler: Scheduler, probe: Probe | None = None
+    ):
+        if algorithm.opened is None:
+            algorithm.track_changes()
+
+        self.algorithm = algorithm
+        self.back = Frame()
+        self.cancelled = False
+        self.condition = threading.Condition()
+        self.front = Frame()
+        self.granted = True
+        self.paused = False
+        self.probe = probe
+        self.scheduler = scheduler
+        self.thread = threading.Thread(target=self.work, name="solver", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def runnable(self) -> bool:
+        return self.cancelled or (
+            not self.paused and (self.granted or not self.scheduler.paced())
+        )
+
+    def interrupted(self) -> bool:
+        # read without the lock, a stale answer only delays the stop until the
+        # next check
+        return self.cancelled or self.paused
+
+    def work(self):
+        stepper = self.probe or self.algorithm
+
+        while True:
+            with self.condition:
+                self.condition.wait_for(self.runnable)
+
+                if self.cancelled:
+                    return
+
+                self.granted = False
+
+            solution_found = self.scheduler.run(stepper, self.interrupted)
+
+            if solution_found:
+                stepper.construct_path()
+
+            opened, closed = self.algorithm.take_changes()
+
+            # the search only ever writes the back frame, the render thread
+            # swaps it to the front at a frame boundary
+            with self.condition:
+                self.back.opened.append(opened)
+                self.back.closed.append(closed)
+                self.back.solution_found = solution_found
+
+            if solution_found is not None:
+                return
+
+    def take(self) -> Frame:
+        with self.condition:
+            self.front, self.back = self.back, self.front
+            self.back.clear()
+            self.granted = True
+            self.condition.notify()
+
+        return self.front
+
+    def pause(self):
+        with self.condition:
+            self.paused = True
+
+    def resume(self):
+        with self.condition:
+            self.paused = False
+            self.condition.notify()
+
+    def cancel(self):
+        with self.condition:
+            self.cancelled = True
+            self.condition.notify()
+
+        if self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join()
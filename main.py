@@ -1,51 +1,56 @@
+import contextlib
 import dataclasses
+import os
+import time
 import typing
 
 import glfw
 import numpy as np
+import numpy.typing as npt
 from slimgui import imgui
 import slimgui.integrations.glfw as imgui_glfw
 from OpenGL import GL
 
 from lib.algorithm_manager import AlgorithmManager
-from lib.grid import Grid
+from lib.algorithms import UnreachableError
+from lib.generators import GENERATORS, LABELS as GENERATOR_LABELS
+from lib.grid import Cell, Grid
+from lib.grid_renderer import GridRenderer
+from lib.instrument import Probe
+from lib.palette import CELL_PAINT, MARK_PAINT, PALETTE, Paint
+from lib.player import Player
+from lib.scheduler import Scheduler
+from lib.trace import Trace
+from lib.viewport import Pyramid, Viewport
+from lib.worker import Frame, Worker
 
 TITLE_FONT_SIZE: float = 32.0
 HEADER_FONT_SIZE: float = 24.0
 NORMAL_FONT_SIZE: float = 18.0
 HINT_FONT_SIZE: float = 12.0
 
-MAX_GRID_HEIGHT: int = 512
+MAX_GRID_HEIGHT: int = 16384
 MIN_GRID_HEIGHT: int = 32
 
-MAX_GRID_WIDTH: int = 512
+MAX_GRID_WIDTH: int = 16384
 MIN_GRID_WIDTH: int = 32
 
-EXPLORED_COLOR: tuple[int, int, int, int] = (93, 187, 99, 255)
-FRONTIER_COLOR: tuple[int, int, int, int] = (61, 237, 151, 255)
-PATH_COLOR: tuple[int, int, int, int] = (176, 252, 56, 255)
-
-FREE_COLOR: tuple[int, int, int, int] = (255, 255, 255, 255)
-WALL_COLOR: tuple[int, int, int, int] = (62, 61, 83, 255)
-
-COLOR_LUT = np.array(
-    [
-        FREE_COLOR,
-        WALL_COLOR,
-    ],
-    dtype=np.uint8,
-)
+CONNECTIVITIES: tuple[int, ...] = (4, 8)
+CONNECTIVITY_LABELS: tuple[str, ...] = ("4-connected", "8-connected")
 
 
 @dataclasses.dataclass(slots=True)
 class State:
     grid_height: int = MIN_GRID_HEIGHT
     grid_width: int = MIN_GRID_WIDTH
-    texture_height: int = MIN_GRID_HEIGHT
-    texture_width: int = MIN_GRID_WIDTH
+    connectivity: int = 4
+    generator: int = 0
     kernel: str | None = None
     origin: tuple[int, int] | None = None
     target: tuple[int, int] | None = None
+    trace_path: str = ""
+    trace_error: str | None = None
+    instrumented: bool = False
 
     menu_visible: bool = True
     started: bool = False
@@ -55,16 +60,46 @@ class App:
     __slots__: tuple[str, ...] = (
         "algorithm_manager",
         "context",
-        "grid_texture",
+        "edit_expansions",
+        "edit_repaired",
+        "edit_seconds",
+        "endpoints",
+        "grid",
+        "grid_dirty",
+        "grid_paint",
+        "grid_region",
+        "grid_renderer",
+        "player",
+        "probe",
+        "pyramid",
         "renderer",
+        "scheduler",
         "state",
+        "stroke",
+        "viewport",
+        "worker",
     )
 
     algorithm_manager: AlgorithmManager
     context: imgui.WrappedContext
-    grid_texture: int | None
+    edit_expansions: int | None
+    edit_repaired: bool
+    edit_seconds: float
+    endpoints: tuple[int, int]
+    grid: Grid | None
+    grid_dirty: bool
+    grid_paint: npt.NDArray[np.uint8] | None
+    grid_region: tuple[int, int, int, int, int] | None
+    grid_renderer: GridRenderer
+    player: Player | None
+    probe: Probe | None
+    pyramid: Pyramid | None
     renderer: imgui_glfw.GlfwRenderer
+    scheduler: Scheduler
     state: State
+    stroke: tuple[Cell, int, int] | None
+    viewport: Viewport | None
+    worker: Worker | None
 
     def __init__(self):
         if not glfw.init():
@@ -86,37 +121,53 @@ class App:
             window, prev_key_callback=self.prev_key_callback
         )
 
-        self.grid_texture = None
+        self.edit_expansions = None
+        self.edit_repaired = False
+        self.edit_seconds = 0.0
+        self.endpoints = (0, 0)
+        self.grid = None
+        self.grid_dirty = False
+        self.grid_paint = None
+        self.grid_region = None
+        self.grid_renderer = GridRenderer(PALETTE)
+        self.player = None
+        self.probe = None
+        self.pyramid = None
+        self.stroke = None
+        self.viewport = None
+        self.worker = None
 
         self.algorithm_manager = AlgorithmManager()
+        self.scheduler = Scheduler()
         self.state = State()
 
     def prev_key_callback(self, _window, key: int, _scan, action: int, _mods):
-        if action == glfw.PRESS and key == glfw.KEY_ESCAPE:
+        if action != glfw.PRESS:
+            return
+
+        if key == glfw.KEY_ESCAPE:
+            self.stop()
             self.state.menu_visible = True
-            self.state.started = False
+            self.player = None
+            self.stroke = None
+        elif (
+            key == glfw.KEY_SPACE
+            and self.worker is not None
+            and not self.state.menu_visible
+        ):
+            if self.worker.paused:
+                self.worker.resume()
+            else:
+                self.worker.pause()
 
     def render_grid(self, fb_h: int, fb_w: int):
-        assert self.grid_texture is not None
-
-        fb_aspect = fb_w / fb_h
-        grid_aspect = self.state.grid_width / self.state.grid_height
-
-        if grid_aspect > 1:
-            draw_h = fb_w / grid_aspect
-            draw_w = fb_w
-            offset_x = 0
-            offset_y = (fb_h - draw_h) / 2
-        elif grid_aspect < 1:
-            draw_h = fb_h
-            draw_w = fb_h * grid_aspect
-            offset_x = (fb_w - draw_w) / 2
-            offset_y = 0
-        else:
-            draw_h = fb_h if fb_aspect >= 1 else fb_w / grid_aspect
-            draw_w = fb_w if fb_aspect <= 1 else fb_h * grid_aspect
-            offset_x = (fb_w - draw_w) / 2
-            offset_y = (fb_h - draw_h) / 2
+        assert self.grid_paint is not None
+
+        height, width = self.grid_paint.shape
+
+        if self.viewport is None:
+            self.viewport = Viewport(height, width)
+            self.viewport.fit(fb_h, fb_w)
 
         imgui.set_next_window_pos((0.0, 0.0))
         imgui.set_next_window_size((fb_w, fb_h))
@@ -133,48 +184,181 @@ class App:
         )
 
         _ = imgui.begin("##grid", flags=flags)
-        imgui.set_cursor_pos((offset_x, offset_y))
 
-        imgui.image(
-            self.grid_texture,
-            (draw_w, draw_h),
-        )
+        io = imgui.get_io()
 
-        if (
-            self.state.started != True
-            and self.algorithm_manager.algorithm_instance.path is None  # pyright: ignore[reportOptionalMemberAccess]
-        ):
-            draw_list = imgui.get_window_draw_list()
-            imgui.push_font(None, HEADER_FONT_SIZE)
+        if imgui.is_window_hovered():
+            if io.mouse_wheel != 0:
+                mx, my = io.mouse_pos
+                self.viewport.zoom(1.25**io.mouse_wheel, mx, my, fb_h, fb_w)
 
-            text = "No Solution"
-            text_w, text_h = imgui.calc_text_size(text)
+            if imgui.is_mouse_double_clicked(imgui.MouseButton.LEFT):
+                self.viewport.fit(fb_h, fb_w)
+            elif imgui.is_mouse_dragging(imgui.MouseButton.LEFT):
+                self.viewport.pan(*io.mouse_delta)
 
-            banner_x = offset_x
-            banner_w = draw_w
+            if (
+                imgui.is_mouse_clicked(imgui.MouseButton.RIGHT)
+                and self.player is None
+                and self.grid is not None
+            ):
+                self.begin_stroke(*io.mouse_pos)
 
-            banner_h = text_h * 3.2
-            banner_y = offset_y + (draw_h - banner_h) * 0.5
+        if self.stroke is not None:
+            if imgui.is_mouse_down(imgui.MouseButton.RIGHT):
+                self.continue_stroke(*io.mouse_pos)
+            else:
+                self.stroke = None
 
-            text_x = banner_x + (banner_w - text_w) * 0.5
-            text_y = banner_y + (banner_h - text_h) * 0.5
+        self.upload_grid_region(fb_h, fb_w)
+        assert self.grid_region is not None
 
-            draw_list.add_rect_filled(
-                (banner_x, banner_y),
-                (banner_x + banner_w, banner_y + banner_h),
-                imgui.get_color_u32((0, 0, 0, 0.75)),
-            )
+        level, y0, y1, x0, x1 = self.grid_region
+        draw_list = imgui.get_window_draw_list()
 
-            draw_list.add_text(
-                (text_x, text_y),
-                imgui.get_color_u32((1, 1, 1, 1)),
-                text,
+        if y1 > y0 and x1 > x0:
+            # the grid is colourised by its own shader in the middle of the
+            # window's draw list, imgui restores its render state right after
+            self.grid_renderer.place(
+                self.viewport.to_screen(x0 << level, y0 << level),
+                self.viewport.to_screen(
+                    min(x1 << level, width), min(y1 << level, height)
+                ),
+            )
+            draw_list.add_callback(self.grid_renderer.draw, 0)
+            draw_list.add_callback(imgui.DRAW_CALLBACK_RESET_RENDER_STATE, 0)
+
+        left, top = self.viewport.to_screen(0, 0)
+        right, bottom = self.viewport.to_screen(width, height)
+        offset_x = max(left, 0.0)
+        offset_y = max(top, 0.0)
+        draw_w = min(right, fb_w) - offset_x
+        draw_h = min(bottom, fb_h) - offset_y
+
+        if self.player is not None:
+            no_solution = self.player.finished and len(self.player.trace.path) == 0
+        elif self.algorithm_manager.algorithm_instance is None:
+            no_solution = True
+        else:
+            no_solution = (
+                self.state.started != True
+                and self.algorithm_manager.algorithm_instance.path is None
             )
 
-            imgui.pop_font()
+        if no_solution:
+            self.render_banner("No Solution", offset_x, offset_y, draw_w, draw_h)
+        elif self.worker is not None and self.worker.paused:
+            self.render_banner("Paused", offset_x, offset_y, draw_w, draw_h)
+
+        imgui.end()
+
+        if self.player is not None:
+            self.render_replay(fb_h, fb_w)
+
+        if self.probe is not None:
+            self.render_metrics()
+
+        if self.edit_expansions is not None:
+            self.render_edit(fb_w)
+
+    def render_banner(
+        self, text: str, offset_x: float, offset_y: float, draw_w: float, draw_h: float
+    ):
+        draw_list = imgui.get_window_draw_list()
+
+        imgui.push_font(None, HEADER_FONT_SIZE)
+
+        text_w, text_h = imgui.calc_text_size(text)
+
+        banner_x = offset_x
+        banner_w = draw_w
+
+        banner_h = text_h * 3.2
+        banner_y = offset_y + (draw_h - banner_h) * 0.5
+
+        text_x = banner_x + (banner_w - text_w) * 0.5
+        text_y = banner_y + (banner_h - text_h) * 0.5
+
+        draw_list.add_rect_filled(
+            (banner_x, banner_y),
+            (banner_x + banner_w, banner_y + banner_h),
+            imgui.get_color_u32((0, 0, 0, 0.75)),
+        )
+
+        draw_list.add_text(
+            (text_x, text_y),
+            imgui.get_color_u32((1, 1, 1, 1)),
+            text,
+        )
+
+        imgui.pop_font()
+
+    def render_replay(self, fb_h: int, fb_w: int):
+        assert self.player is not None
+
+        imgui.set_next_window_pos((0.0, fb_h), pivot=(0.0, 1.0))
+        imgui.set_next_window_size((fb_w, 0.0))
+        imgui.set_next_window_bg_alpha(0.75)
+
+        flags = (
+            imgui.WindowFlags.NO_COLLAPSE
+            | imgui.WindowFlags.NO_MOVE
+            | imgui.WindowFlags.NO_RESIZE
+            | imgui.WindowFlags.NO_SAVED_SETTINGS
+            | imgui.WindowFlags.NO_TITLE_BAR
+        )
+
+        _ = imgui.begin("##replay", flags=flags)
+
+        if self.player.render():
+            self.rebuild_replay_texture()
 
         imgui.end()
 
+    def render_metrics(self):
+        assert self.probe is not None
+
+        imgui.set_next_window_pos((8.0, 8.0))
+        imgui.set_next_window_bg_alpha(0.75)
+
+        flags = (
+            imgui.WindowFlags.ALWAYS_AUTO_RESIZE
+            | imgui.WindowFlags.NO_COLLAPSE
+            | imgui.WindowFlags.NO_FOCUS_ON_APPEARING
+            | imgui.WindowFlags.NO_MOVE
+            | imgui.WindowFlags.NO_NAV
+            | imgui.WindowFlags.NO_SAVED_SETTINGS
+            | imgui.WindowFlags.NO_TITLE_BAR
+        )
+
+        _ = imgui.begin("##metrics", flags=flags)
+        self.probe.render()
+        imgui.end()
+
+    def render_edit(self, fb_w: int):
+        assert self.edit_expansions is not None
+
+        imgui.set_next_window_pos((fb_w - 8.0, 8.0), pivot=(1.0, 0.0))
+        imgui.set_next_window_bg_alpha(0.75)
+
+        flags = (
+            imgui.WindowFlags.ALWAYS_AUTO_RESIZE
+            | imgui.WindowFlags.NO_COLLAPSE
+            | imgui.WindowFlags.NO_FOCUS_ON_APPEARING
+            | imgui.WindowFlags.NO_MOVE
+            | imgui.WindowFlags.NO_NAV
+            | imgui.WindowFlags.NO_SAVED_SETTINGS
+            | imgui.WindowFlags.NO_TITLE_BAR
+        )
+
+        _ = imgui.begin("##edit", flags=flags)
+        imgui.text(
+            f"{'Repaired' if self.edit_repaired else 'Restarted'} after the last edit "
+            f"in {self.edit_seconds * 1e3:.2f} ms, "
+            f"{self.edit_expansions} cells expanded"
+        )
+        imgui.end()
+
     def render_menu(self, fb_h: int, fb_w: int):
         imgui.set_next_window_pos((0.0, 0.0))
         imgui.set_next_window_size((fb_w, fb_h))
@@ -205,6 +389,21 @@ class App:
         imgui.spacing()
         imgui.spacing()
 
+        imgui.push_font(None, HEADER_FONT_SIZE)
+        imgui.separator_text("Speed")
+        imgui.pop_font()
+        imgui.spacing()
+        imgui.indent(32.0)
+
+        self.scheduler.render()
+        _, self.state.instrumented = imgui.checkbox(
+            "Show counters and timers", self.state.instrumented
+        )
+
+        imgui.unindent(32.0)
+        imgui.spacing()
+        imgui.spacing()
+
         imgui.push_font(None, HEADER_FONT_SIZE)
         imgui.separator_text("Grid")
         imgui.pop_font()
@@ -226,6 +425,24 @@ class App:
             "##grid_width", self.state.grid_width
         )
         imgui.pop_item_width()
+        imgui.same_line()
+        imgui.text("Moves")
+        imgui.same_line()
+        imgui.push_item_width(128)
+        connectivity_changed, new_connectivity = imgui.combo(
+            "##connectivity",
+            CONNECTIVITIES.index(self.state.connectivity),
+            CONNECTIVITY_LABELS,
+        )
+        imgui.pop_item_width()
+
+        imgui.text("Maze")
+        imgui.same_line()
+        imgui.push_item_width(256)
+        generator_changed, new_generator = imgui.combo(
+            "##generator", self.state.generator, GENERATOR_LABELS
+        )
+        imgui.pop_item_width()
 
         imgui.spacing()
         imgui.spacing()
@@ -274,6 +491,29 @@ class App:
         )
         imgui.pop_item_width()
 
+        imgui.unindent(32.0)
+        imgui.spacing()
+        imgui.spacing()
+
+        imgui.push_font(None, HEADER_FONT_SIZE)
+        imgui.separator_text("Trace")
+        imgui.pop_font()
+        imgui.spacing()
+        imgui.indent(32.0)
+
+        imgui.text("File")
+        imgui.same_line()
+        imgui.push_item_width(width)
+        trace_path_changed, new_trace_path = imgui.input_text(
+            "##trace_path", self.state.trace_path
+        )
+        imgui.pop_item_width()
+        imgui.same_line()
+        replay_btn_pressed = imgui.button("Replay")
+
+        if self.state.trace_error is not None:
+            imgui.text_colored((1.0, 0.4, 0.4, 1.0), self.state.trace_error)
+
         imgui.unindent(32.0)
         imgui.pop_font()
 
@@ -320,9 +560,18 @@ class App:
             if self.state.target is not None:
                 target_changed, new_target = True, self.state.target
 
+        if connectivity_changed:
+            self.state.connectivity = CONNECTIVITIES[new_connectivity]
+
+        if generator_changed:
+            self.state.generator = new_generator
+
         if kernel_changed:
             self.state.kernel = new_kernel or None
 
+        if trace_path_changed:
+            self.state.trace_path = new_trace_path
+
         if origin_changed:
             ox, oy = new_origin
             self.state.origin = (
@@ -356,19 +605,163 @@ class App:
                 self.state.grid_width,
                 origin,
                 target,
-                np.random.default_rng(
-                    np.random.SeedSequence(list(self.state.kernel.encode("utf-8")))
-                ),
+                Grid.kernel_rng(self.state.kernel),
+                connectivity=self.state.connectivity,
+                generator=GENERATORS[self.state.generator](),
+                threads=os.process_cpu_count() or 1,
             )
 
-            self.algorithm_manager.instantiate_algorithm(grid, origin, target)
-            self.update_grid_texture()
-
-            self.state.started = True
+            self.player = None
+            self.edit_expansions = None
+            self.start(grid, origin, target)
             self.state.menu_visible = False
 
+        if replay_btn_pressed:
+            try:
+                trace = Trace.load(self.state.trace_path)
+            except (OSError, KeyError, ValueError) as error:
+                self.state.trace_error = str(error)
+            else:
+                self.state.trace_error = None
+                self.state.grid_height, self.state.grid_width = trace.cells.shape
+                self.player = Player(trace)
+                self.probe = None
+                self.edit_expansions = None
+                self.rebuild_replay_texture()
+
+                self.stop()
+                self.state.menu_visible = False
+
         imgui.end()
 
+    def start(self, grid: Grid, origin: int, target: int):
+        self.stop()
+
+        self.endpoints = (origin, target)
+        self.grid = grid
+        self.probe = None
+
+        try:
+            self.algorithm_manager.instantiate_algorithm(grid, origin, target)
+        except UnreachableError:
+            self.algorithm_manager.algorithm_instance = None
+            self.paint_grid_texture(grid)
+        else:
+            self.rebuild_grid_texture()
+
+            if self.state.instrumented:
+                self.probe = Probe(
+                    self.algorithm_manager.algorithm_instance, record_events=False
+                )
+
+            self.launch()
+
+    def launch(self):
+        assert self.algorithm_manager.algorithm_instance is not None
+
+        self.worker = Worker(
+            self.algorithm_manager.algorithm_instance, self.scheduler, self.probe
+        )
+        self.worker.start()
+        self.state.started = True
+
+    def stop(self):
+        # cancelling waits out the current slice, whatever it published is
+        # still painted so the texture matches the algorithm's state
+        if self.worker is not None:
+            self.worker.cancel()
+            self.update_grid_texture(self.worker.take())
+            self.worker = None
+
+        self.state.started = False
+
+    def cell_at(self, px: float, py: float) -> tuple[int, int]:
+        assert self.grid is not None
+        assert self.viewport is not None
+
+        x, y = self.viewport.to_grid(px, py)
+
+        return (
+            min(max(int(x), 0), self.grid.width - 1),
+            min(max(int(y), 0), self.grid.height - 1),
+        )
+
+    def begin_stroke(self, px: float, py: float):
+        assert self.grid is not None
+
+        x, y = self.cell_at(px, py)
+        value = Cell.FREE if self.grid.cells[y, x] == Cell.WALL else Cell.WALL
+
+        self.stroke = (value, x, y)
+        self.edit_grid(np.array([y * self.grid.width + x], dtype=np.intp), value)
+
+    def continue_stroke(self, px: float, py: float):
+        assert self.grid is not None
+        assert self.stroke is not None
+
+        value, x0, y0 = self.stroke
+        x1, y1 = self.cell_at(px, py)
+
+        if (x1, y1) == (x0, y0):
+            return
+
+        # fast drags skip cells between frames, fill the line in between
+        count = max(abs(x1 - x0), abs(y1 - y0)) + 1
+        xs = np.rint(np.linspace(x0, x1, count)).astype(np.intp)
+        ys = np.rint(np.linspace(y0, y1, count)).astype(np.intp)
+
+        self.stroke = (value, x1, y1)
+        self.edit_grid(ys * self.grid.width + xs, value)
+
+    def edit_grid(self, cells: npt.NDArray[np.intp], value: Cell):
+        assert self.grid is not None
+        assert self.grid_paint is not None
+
+        grid = self.grid
+        origin, target = self.endpoints
+
+        cells = np.unique(cells)
+        cells = cells[
+            (grid.cells.reshape(-1)[cells] != value)
+            & (cells != origin)
+            & (cells != target)
+        ]
+
+        if len(cells) == 0:
+            return
+
+        # the grid and the algorithm belong to the solver thread while it runs
+        self.stop()
+
+        # the time of updating the grid and repairing or restarting the
+        # search, the expansions that follow are counted as they come
+        start = time.perf_counter()
+
+        grid.set_cells(cells, value)
+
+        instance = self.algorithm_manager.algorithm_instance
+        flat_view = self.grid_paint.reshape(-1)
+        changed = [cells]
+
+        if instance is not None and instance.path is not None:
+            flat_view[instance.path] = Paint.EXPLORED
+            changed.append(instance.path)
+
+        flat_view[cells] = CELL_PAINT[value]
+
+        # incremental searches repair what the edit touched, the rest start over
+        if instance is not None and instance.repair(cells):
+            self.edit_repaired = True
+            self.edit_seconds = time.perf_counter() - start
+            self.patch_grid_paint(np.concatenate(changed))
+            self.launch()
+        else:
+            self.edit_repaired = False
+            self.start(grid, origin, target)
+            self.edit_seconds = time.perf_counter() - start
+
+        self.edit_expansions = 0
+
     def run(self) -> typing.Never:
         while not glfw.window_should_close(self.renderer.window):
             glfw.poll_events()
@@ -388,100 +781,143 @@ class App:
             else:
                 self.render_grid(fb_h, fb_w)
 
-            if self.state.started:
-                assert self.algorithm_manager.algorithm_instance is not None
+            if self.worker is not None:
+                # the search runs on the solver thread, a frame only picks up
+                # what it published since the last one
+                frame = self.worker.take()
 
-                solution_found = self.algorithm_manager.algorithm_instance.step()
+                with (
+                    self.probe.measure("update_grid_texture")
+                    if self.probe is not None
+                    else contextlib.nullcontext()
+                ):
+                    self.update_grid_texture(frame)
 
-                if solution_found is not None:
-                    if solution_found:
-                        self.algorithm_manager.algorithm_instance.construct_path()
+                if frame.solution_found is not None:
+                    self.worker = None
                     self.state.started = False
-                self.update_grid_texture()
+            elif self.player is not None and not self.state.menu_visible:
+                self.update_replay_texture()
 
             imgui.render()
             self.renderer.render(imgui.get_draw_data())
 
             glfw.swap_buffers(self.renderer.window)
 
+        self.stop()
+        self.grid_renderer.delete()
         self.renderer.shutdown()
         imgui.destroy_context(self.context)
         glfw.terminate()
         exit(0)
 
-    def update_grid_texture(self):
+    def reset_grid_paint(self, paint: npt.NDArray[np.uint8]):
+        if self.grid_paint is None or self.grid_paint.shape != paint.shape:
+            self.viewport = None
+
+        self.grid_paint = paint
+        self.grid_dirty = True
+        self.pyramid = Pyramid(paint)
+
+    def patch_grid_paint(self, changed: npt.NDArray[np.intp]):
+        assert self.pyramid is not None
+
+        if len(changed) > 0:
+            self.pyramid.update(changed)
+            self.grid_dirty = True
+
+    def rebuild_grid_texture(self):
         assert self.algorithm_manager.algorithm_instance is not None
 
-        if (
-            self.state.grid_height != self.state.texture_height
-            or self.state.grid_width != self.state.texture_width
-        ) and self.grid_texture is not None:
-            GL.glDeleteTextures([self.grid_texture])
-
-            self.grid_texture = None
-            self.state.texture_height = self.state.grid_height
-            self.state.texture_width = self.state.grid_width
-
-        if self.grid_texture is None:
-            self.grid_texture = GL.glGenTextures(1)
-            GL.glBindTexture(GL.GL_TEXTURE_2D, self.grid_texture)
-
-            GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
-
-            GL.glTexImage2D(
-                GL.GL_TEXTURE_2D,
-                0,
-                GL.GL_RGBA8,
-                self.state.texture_width,
-                self.state.texture_height,
-                0,
-                GL.GL_RGBA,
-                GL.GL_UNSIGNED_BYTE,
-                None,
-            )
+        instance = self.algorithm_manager.algorithm_instance
 
-            GL.glTexParameteri(
-                GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_NEAREST
-            )
-            GL.glTexParameteri(
-                GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_NEAREST
-            )
+        paint = CELL_PAINT[instance.grid.cells]
+        flat_view = paint.reshape(-1)
 
-            GL.glTexParameteri(
-                GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S, GL.GL_CLAMP_TO_EDGE
-            )
-            GL.glTexParameteri(
-                GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, GL.GL_CLAMP_TO_EDGE
-            )
+        flat_view[instance.explored()] = Paint.EXPLORED
+        flat_view[instance.frontier()] = Paint.FRONTIER
 
-            GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        if instance.path is not None:
+            flat_view[instance.path] = Paint.PATH
 
-        rgba = COLOR_LUT[self.algorithm_manager.algorithm_instance.grid.cells]
-        flat_view = rgba.reshape(-1, 4)
+        instance.track_changes()
 
-        flat_view[self.algorithm_manager.algorithm_instance.explored()] = EXPLORED_COLOR;
-        flat_view[self.algorithm_manager.algorithm_instance.frontier()] = FRONTIER_COLOR;
+        self.reset_grid_paint(paint)
 
-        if self.algorithm_manager.algorithm_instance.path is not None:
-            flat_view[self.algorithm_manager.algorithm_instance.path] = PATH_COLOR
+    def paint_grid_texture(self, grid: Grid):
+        self.reset_grid_paint(CELL_PAINT[grid.cells])
 
-        GL.glBindTexture(GL.GL_TEXTURE_2D, self.grid_texture)
+    def update_grid_texture(self, frame: Frame):
+        assert self.algorithm_manager.algorithm_instance is not None
+        assert self.grid_paint is not None
 
-        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
+        instance = self.algorithm_manager.algorithm_instance
 
-        GL.glTexSubImage2D(
-            GL.GL_TEXTURE_2D,
-            0,
-            0,
-            0,
-            self.state.texture_width,
-            self.state.texture_height,
-            GL.GL_RGBA,
-            GL.GL_UNSIGNED_BYTE,
-            rgba,
-        )
+        opened, closed = frame.changes()
+        flat_view = self.grid_paint.reshape(-1)
+
+        if self.edit_expansions is not None:
+            self.edit_expansions += len(closed)
+
+        flat_view[opened] = Paint.FRONTIER
+        flat_view[closed] = Paint.EXPLORED
+        changed = [opened, closed]
+
+        if instance.path is not None:
+            flat_view[instance.path] = Paint.PATH
+            changed.append(instance.path)
+
+        self.patch_grid_paint(np.concatenate(changed))
+
+    def rebuild_replay_texture(self):
+        assert self.player is not None
+
+        trace = self.player.trace
+
+        paint = CELL_PAINT[trace.cells]
+        flat_view = paint.reshape(-1)
+        seen = np.flatnonzero(self.player.marks)
+        flat_view[seen] = MARK_PAINT[self.player.marks[seen]]
+
+        if self.player.finished:
+            flat_view[trace.path] = Paint.PATH
+
+        self.reset_grid_paint(paint)
+
+    def update_replay_texture(self):
+        assert self.player is not None
+        assert self.grid_paint is not None
+
+        trace = self.player.trace
+        changed = self.player.advance()
+
+        flat_view = self.grid_paint.reshape(-1)
+        flat_view[changed] = MARK_PAINT[self.player.marks[changed]]
+
+        if self.player.finished:
+            flat_view[trace.path] = Paint.PATH
+            changed = np.concatenate((changed, trace.path))
+
+        self.patch_grid_paint(changed)
+
+    def upload_grid_region(self, fb_h: int, fb_w: int):
+        assert self.pyramid is not None
+        assert self.viewport is not None
+
+        region = self.viewport.region(fb_h, fb_w)
+
+        if region == self.grid_region and not self.grid_dirty:
+            return
+
+        self.grid_dirty = False
+        self.grid_region = region
+
+        level, y0, y1, x0, x1 = region
+
+        if y1 == y0 or x1 == x0:
+            return
 
-        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        self.grid_renderer.upload(self.pyramid.levels[level][y0:y1, x0:x1])
 
 
 if __name__ == "__main__":
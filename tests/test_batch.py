@@ -0,0 +1,85 @@
+import dataclasses
+import unittest
+
+import numpy as np
+
+from lib.algorithm_manager import AlgorithmManager
+from lib.algorithms.bfs import BFS
+from lib.batch import Query, Statistics, solve_all
+from lib.generators import Caves
+from lib.grid import Cell, Grid
+
+
+# timings and memory depend on the process, everything else may not
+def outcome(statistics: Statistics) -> Statistics:
+    return dataclasses.replace(
+        statistics, seconds=0.0, peak_memory=0, traced_memory=None
+    )
+
+
+class TestBatch(unittest.TestCase):
+    def assertSameAcrossJobs(
+        self, queries: list[Query], grid: Grid | None
+    ) -> list[Statistics]:
+        serial = [
+            outcome(statistics)
+            for statistics in solve_all(queries, grid, 25, 33, 8, Caves())
+        ]
+
+        self.assertEqual(len(serial), len(queries))
+
+        for jobs in (2, 3):
+            with self.subTest(jobs=jobs):
+                parallel = [
+                    outcome(statistics)
+                    for statistics in solve_all(
+                        queries, grid, 25, 33, 8, Caves(), jobs=jobs, chunk_size=5
+                    )
+                ]
+
+                self.assertEqual(parallel, serial)
+
+        return serial
+
+    def test_generated_grids(self):
+        queries = [
+            Query(algorithm, str(kernel), 0, 25 * 33 - 1)
+            for kernel in range(3)
+            for algorithm in (*AlgorithmManager.ALGORITHMS, None)
+        ]
+
+        self.assertSameAcrossJobs(queries, None)
+
+    def test_shared_grid(self):
+        grid = Grid.generate(
+            25,
+            33,
+            0,
+            25 * 33 - 1,
+            Grid.kernel_rng("batch"),
+            connectivity=8,
+            generator=Caves(),
+        )
+        free = np.flatnonzero(grid.cells.reshape(-1) != Cell.WALL)
+        rng = np.random.default_rng(0)
+        queries = [
+            Query(algorithm, None, int(origin), int(target))
+            for origin, target in rng.choice(free, (6, 2))
+            for algorithm in (*AlgorithmManager.ALGORITHMS, None)
+        ]
+
+        serial = self.assertSameAcrossJobs(queries, grid)
+
+        # cached distance fields count moves like a fresh breadth-first search
+        for query, statistics in zip(queries, serial):
+            if query.algorithm is BFS:
+                bfs = statistics
+            elif query.algorithm is None:
+                self.assertEqual(
+                    statistics.solved, grid.connected(query.origin, query.target)
+                )
+                self.assertEqual(statistics.path_length, bfs.path_length)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+import os
+import struct
+import tempfile
+import unittest
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.algorithms.astar import AStar
+from lib.algorithms.bfs import BFS
+from lib.export import Encoder, GifEncoder, export, open_encoder, quantise
+from lib.grid import Grid
+from lib.palette import PALETTE
+
+
+def decompress(data: bytes, min_code_size: int) -> list[int]:
+    clear = 1 << min_code_size
+    end = clear + 1
+    size = min_code_size + 1
+    table: list[list[int]] = [[code] for code in range(clear)] + [[], []]
+    value = int.from_bytes(data, "little")
+    position = 0
+    previous: list[int] | None = None
+    output: list[int] = []
+
+    while position + size <= len(data) * 8:
+        code = value >> position & ((1 << size) - 1)
+        position += size
+
+        if code == clear:
+            del table[end + 1 :]
+            size = min_code_size + 1
+            previous = None
+            continue
+
+        if code == end:
+            break
+
+        if code < len(table):
+            entry = table[code]
+        elif code == len(table) and previous is not None:
+            entry = previous + previous[:1]
+        else:
+            raise ValueError(f"invalid code {code}")
+
+        output += entry
+
+        if previous is not None and len(table) < 4096:
+            table.append(previous + entry[:1])
+
+            if len(table) == 1 << size and size < 12:
+                size += 1
+
+        previous = entry
+
+    return output
+
+
+# every frame of a GIF as RGB pixels, unchanged pixels of a frame are
+# transparent and keep what the frames before left behind
+def decode(data: bytes) -> list[npt.NDArray[np.uint8]]:
+    if data[:6] != b"GIF89a":
+        raise ValueError("not a GIF")
+
+    width, height, flags = struct.unpack_from("<HHB", data, 6)
+    position = 13
+    colors = np.frombuffer(data, np.uint8, 3 << (flags & 7) + 1, position).reshape(
+        -1, 3
+    )
+    position += len(colors) * 3
+
+    canvas = np.zeros((height, width), dtype=np.uint8)
+    transparent = None
+    frames: list[npt.NDArray[np.uint8]] = []
+
+    def blocks() -> bytes:
+        nonlocal position
+        content = bytearray()
+
+        while (length := data[position]) != 0:
+            content += data[position + 1 : position + 1 + length]
+            position += length + 1
+
+        position += 1
+
+        return bytes(content)
+
+    while (introducer := data[position]) != 0x3B:
+        position += 1
+
+        if introducer == 0x21:
+            label = data[position]
+            position += 1
+            extension = blocks()
+
+            if label == 0xF9 and extension[0] & 1:
+                transparent = extension[3]
+
+            continue
+
+        x, y, w, h, _, min_code_size = struct.unpack_from("<HHHHBB", data, position)
+        position += 10
+        pixels = np.array(decompress(blocks(), min_code_size), dtype=np.uint8)
+        pixels = pixels[: w * h].reshape(h, w)
+        region = canvas[y : y + h, x : x + w]
+
+        if transparent is None:
+            region[...] = pixels
+        else:
+            region[pixels != transparent] = pixels[pixels != transparent]
+
+        frames.append(colors[canvas])
+
+    return frames
+
+
+class Recorder(Encoder):
+    __slots__: tuple[str, ...] = ("encoder", "frames")
+
+    encoder: Encoder
+    frames: list[npt.NDArray[np.uint8]]
+
+    def __init__(self, encoder: Encoder):
+        super().__init__(encoder.height, encoder.width, encoder.scale, encoder.fps)
+
+        self.encoder = encoder
+        self.frames = []
+
+    def write(self, frame: npt.NDArray[np.uint8], duration: int = 1):
+        encoder = self.encoder
+
+        self.frames.append(encoder.colors[encoder.lookup[encoder.upscale(frame)]])
+        encoder.write(frame, duration)
+
+    def close(self):
+        self.encoder.close()
+
+
+class TestExport(unittest.TestCase):
+    def test_gif_frames_decode_to_the_painted_ones(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "search.gif")
+
+        for connectivity, algorithm, scale, colors in (
+            (4, BFS, 1, len(PALETTE)),
+            (8, AStar, 3, len(PALETTE)),
+            (4, AStar, 2, 3),
+            (8, BFS, 1, 2),
+        ):
+            with self.subTest(
+                algorithm.__name__,
+                connectivity=connectivity,
+                scale=scale,
+                colors=colors,
+            ):
+                for kernel in map(str, range(100)):
+                    grid = Grid.generate(
+                        23,
+                        31,
+                        0,
+                        23 * 31 - 1,
+                        Grid.kernel_rng(kernel),
+                        connectivity=connectivity,
+                    )
+
+                    if grid.connected(0, 23 * 31 - 1):
+                        break
+
+                encoder = open_encoder(path, 23, 31, scale, 30, colors)
+
+                self.assertIsInstance(encoder, GifEncoder)
+
+                with Recorder(encoder) as recorder:
+                    count = export(algorithm(grid, 0, 23 * 31 - 1), recorder, 3, 10)
+
+                with open(path, "rb") as file:
+                    frames = decode(file.read())
+
+                self.assertEqual(len(frames), count)
+                self.assertEqual(len(recorder.frames), count)
+
+                for frame, expected in zip(frames, recorder.frames):
+                    np.testing.assert_array_equal(frame, expected)
+
+    def test_quantise_keeps_the_higher_paint(self):
+        lookup, colors = quantise(len(PALETTE))
+
+        np.testing.assert_array_equal(lookup, np.arange(len(PALETTE)))
+        np.testing.assert_array_equal(colors, PALETTE[:, :3])
+
+        for count in range(2, len(PALETTE)):
+            with self.subTest(colors=count):
+                lookup, colors = quantise(count)
+
+                self.assertEqual(len(colors), count)
+                self.assertEqual(set(lookup.tolist()), set(range(count)))
+
+                # every paint is shown in the colour of some paint at least
+                # as high, never a lower one
+                for paint, index in enumerate(lookup.tolist()):
+                    keeper = np.flatnonzero(
+                        (PALETTE[:, :3] == colors[index]).all(axis=1)
+                    )
+                    self.assertGreaterEqual(int(keeper[-1]), paint)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from lib.grid import Cell, Grid, label_components
+from lib.maps import Scenario, load_map, load_movingai_map, load_scenarios
+
+MAP = b"type octile\r\nheight 3\r\nwidth 5\r\nmap\r\n.G@S.\r\nTTW..\r\n..O.@\r\n"
+
+SCENARIOS = (
+    "version 1\n"
+    "0\tarena.map\t5\t3\t0\t0\t4\t1\t4.41421356\n"
+    "\n"
+    "1\tarena.map\t5\t3\t1\t2\t3\t0\t2.41421356\n"
+)
+
+
+class TestGrid(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name: str, content: bytes) -> str:
+        path = os.path.join(self.directory, name)
+
+        with open(path, "wb") as file:
+            file.write(content)
+
+        return path
+
+    def test_save_and_load_round_trip(self):
+        grid = Grid.generate(
+            37, 45, 0, 37 * 45 - 1, Grid.kernel_rng("save"), connectivity=8
+        )
+        rng = np.random.default_rng(0)
+
+        # edits relabel components in place, the file has to keep them
+        for value in (Cell.WALL, Cell.FREE, Cell.WALL):
+            grid.set_cells(rng.choice(37 * 45, 40, replace=False), value)
+
+        path = os.path.join(self.directory, "grid.bin")
+        grid.save(path)
+
+        for mode in ("r", "c"):
+            with self.subTest(mode=mode):
+                loaded = Grid.load(path, mode)
+
+                self.assertEqual(loaded.connectivity, 8)
+                self.assertEqual(loaded.content_hash(), grid.content_hash())
+                np.testing.assert_array_equal(loaded.cells, grid.cells)
+                np.testing.assert_array_equal(loaded.passable, grid.passable)
+                np.testing.assert_array_equal(loaded.components, grid.components)
+
+    def test_loaded_components_partition_the_grid(self):
+        grid = Grid.generate(31, 29, 0, 31 * 29 - 1, Grid.kernel_rng("partition"))
+        grid.set_cells(np.arange(14 * 29, 15 * 29, dtype=np.intp), Cell.WALL)
+
+        path = os.path.join(self.directory, "grid.bin")
+        grid.save(path)
+        loaded = Grid.load(path)
+
+        # labels may differ from a fresh labelling, the partition may not
+        fresh = label_components(loaded.cells != Cell.WALL).reshape(-1)
+        pairs = np.unique(np.stack((loaded.components, fresh)), axis=1)
+
+        self.assertEqual(len(np.unique(pairs[0])), pairs.shape[1])
+        self.assertEqual(len(np.unique(pairs[1])), pairs.shape[1])
+
+    def test_load_rejects_other_files(self):
+        path = self.write("grid.bin", b"not a grid at all")
+
+        with self.assertRaises(ValueError):
+            Grid.load(path)
+
+    def test_movingai_map(self):
+        grid = load_map(self.write("arena.MAP", MAP))
+
+        self.assertEqual(grid.connectivity, 8)
+        np.testing.assert_array_equal(
+            grid.cells,
+            [
+                [Cell.FREE, Cell.FREE, Cell.WALL, Cell.FREE, Cell.FREE],
+                [Cell.WALL, Cell.WALL, Cell.WALL, Cell.FREE, Cell.FREE],
+                [Cell.FREE, Cell.FREE, Cell.WALL, Cell.FREE, Cell.WALL],
+            ],
+        )
+        self.assertFalse(grid.connected(0, 3))
+        self.assertTrue(grid.connected(3, 13))
+
+    def test_movingai_map_connectivity_and_errors(self):
+        grid = load_movingai_map(
+            self.write("four.map", MAP.replace(b"octile", b"quad").replace(b"\r", b""))
+        )
+
+        self.assertEqual(grid.connectivity, 4)
+
+        with self.assertRaises(ValueError):
+            load_movingai_map(self.write("short.map", MAP[:-10]))
+
+        with self.assertRaises(ValueError):
+            load_movingai_map(self.write("headless.map", b"map\n.....\n"))
+
+    def test_movingai_scenarios(self):
+        scenarios = load_scenarios(self.write("arena.map.scen", SCENARIOS.encode()))
+
+        self.assertEqual(
+            scenarios,
+            [
+                Scenario(0, "arena.map", 3, 5, (0, 0), (4, 1), 4.41421356),
+                Scenario(1, "arena.map", 3, 5, (1, 2), (3, 0), 2.41421356),
+            ],
+        )
+
+        with self.assertRaises(ValueError):
+            load_scenarios(self.write("broken.scen", b"version 1\n0 arena.map 5 3\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import unittest
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.algorithm_manager import AlgorithmManager
+from lib.algorithms import Algorithm, UnreachableError
+from lib.algorithms.astar import AStar
+from lib.algorithms.bfs import BFS
+from lib.algorithms.bibfs import Turn
+from lib.algorithms.bucket_astar import BucketAStar
+from lib.algorithms.flood import Flood
+from lib.algorithms.jps import JPS
+from lib.algorithms.level_bfs import LevelBFS
+from lib.algorithms.nbastar import NBAStar
+from lib.grid import Cell, Grid
+
+
+def unpack(visited: bytearray | npt.NDArray[np.uint8], length: int) -> set[int]:
+    bits = np.unpackbits(
+        np.frombuffer(visited, dtype=np.uint8), count=length, bitorder="little"
+    )
+
+    return set(np.flatnonzero(bits).tolist())
+
+
+# what explored() computed from each search's own state before the ledger
+EXPLORED = {
+    "AStar": lambda search: np.flatnonzero(search.distance > -1),
+    "BucketAStar": lambda search: np.flatnonzero(search.distance > -1),
+    "Flood": lambda search: np.flatnonzero(search.distance > -1),
+    "JPS": lambda search: np.flatnonzero(np.isfinite(search.distance)),
+    "NBAStar": lambda search: np.flatnonzero(
+        (search.distances[0] < search.INFINITY)
+        | (search.distances[1] < search.INFINITY)
+    ),
+    "BiBFS": lambda search: np.flatnonzero(search._visited != Turn.Neither),
+}
+
+
+def searches(connectivity: int):
+    grid = Grid.generate(
+        48, 57, 0, 48 * 57 - 1, Grid.kernel_rng("ledger"), connectivity=connectivity
+    )
+    free = np.flatnonzero(grid.cells.reshape(-1) != Cell.WALL)
+    rng = np.random.default_rng(connectivity)
+
+    for _ in range(3):
+        origin, target = (int(cell) for cell in rng.choice(free, 2, replace=False))
+
+        for algorithm in AlgorithmManager.ALGORITHMS:
+            try:
+                yield algorithm(grid, origin, target)
+            except UnreachableError:
+                continue
+
+
+def run(search: Algorithm):
+    while search.step() is None:
+        yield
+
+
+class TestLedger(unittest.TestCase):
+    def test_snapshots_are_views(self):
+        for search in searches(4):
+            with self.subTest(type(search).__name__):
+                for _ in run(search):
+                    cells = search.ledger.cells
+
+                    self.assertIs(search.explored().base, cells)
+                    self.assertIs(search.frontier().base, cells)
+
+    def test_snapshots_follow_changes(self):
+        for connectivity in (4, 8):
+            for search in searches(connectivity):
+                with self.subTest(type(search).__name__, connectivity=connectivity):
+                    search.track_changes()
+                    opened = set(search.frontier().tolist())
+                    closed: set[int] = set()
+
+                    for _ in run(search):
+                        added, removed = search.take_changes()
+                        opened.difference_update(removed.tolist())
+                        closed.update(removed.tolist())
+                        closed.difference_update(added.tolist())
+                        opened.update(added.tolist())
+
+                        explored = search.explored().tolist()
+                        frontier = search.frontier().tolist()
+
+                        self.assertEqual(len(explored), len(set(explored)))
+                        self.assertEqual(set(frontier), opened)
+                        self.assertEqual(set(explored), opened | closed)
+
+    def test_snapshots_match_search_state(self):
+        for connectivity in (4, 8):
+            for search in searches(connectivity):
+                name = type(search).__name__
+                length = search.grid.height * search.grid.width
+
+                with self.subTest(name, connectivity=connectivity):
+                    for _ in run(search):
+                        explored = set(search.explored().tolist())
+
+                        if isinstance(search, (BFS, LevelBFS)):
+                            self.assertEqual(explored, unpack(search._visited, length))
+                        elif name in EXPLORED:
+                            self.assertEqual(
+                                explored, set(EXPLORED[name](search).tolist())
+                            )
+
+                        if isinstance(search, (LevelBFS, Flood)):
+                            self.assertEqual(
+                                set(search.frontier().tolist()),
+                                set(search.level.tolist()),
+                            )
+
+    def test_queues_hold_the_frontier(self):
+        for search in searches(8):
+            if not isinstance(search, (AStar, BucketAStar, JPS, NBAStar)):
+                continue
+
+            with self.subTest(type(search).__name__):
+                for _ in run(search):
+                    frontier = set(search.frontier().tolist())
+                    closed = set(search.explored().tolist()) - frontier
+
+                    # queues keep stale entries of closed cells, the frontier
+                    # leaves them out
+                    if isinstance(search, BucketAStar):
+                        queued = {
+                            cell
+                            for bucket in search.buckets[search.lowest :]
+                            for _, cell in bucket
+                        }
+                    elif isinstance(search, (AStar, JPS)):
+                        queued = {cell for _, cell in search.queue}
+                    else:
+                        queued = {cell for queue in search.queues for *_, cell in queue}
+
+                    self.assertEqual(queued - closed, frontier)
+
+    def test_ledger_grows_with_the_search(self):
+        grid = Grid.generate(
+            256, 256, 0, 256 * 256 - 1, Grid.kernel_rng("grow"), connectivity=4
+        )
+        search = BFS(grid, 0, 256 * 256 - 1)
+
+        self.assertLess(len(search.ledger.cells), 256 * 256)
+        self.assertEqual(len(search.ledger.position), 0)
+
+        search.run_to_completion()
+
+        self.assertEqual(
+            set(search.explored().tolist()), unpack(search._visited, 256 * 256)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+import numpy as np
+
+from lib.algorithms import UnreachableError
+from lib.algorithms.lpastar import LPAStar
+from lib.generators import Caves
+from lib.grid import Cell, Grid
+
+
+def finish(search: LPAStar) -> bool:
+    while (solution_found := search.step()) is None:
+        pass
+
+    if solution_found:
+        search.construct_path()
+
+    return solution_found
+
+
+class TestLPAStar(unittest.TestCase):
+    def test_repairs_match_a_fresh_search(self):
+        for connectivity in (4, 8):
+            for generator in (None, Caves()):
+                grid = Grid.generate(
+                    48,
+                    48,
+                    0,
+                    48 * 48 - 1,
+                    Grid.kernel_rng(f"repair{connectivity}"),
+                    connectivity=connectivity,
+                    generator=generator,
+                )
+                free = np.flatnonzero(grid.cells.reshape(-1) != Cell.WALL)
+                rng = np.random.default_rng(connectivity)
+                origin, target = (int(cell) for cell in rng.choice(free, 2))
+
+                while not grid.connected(origin, target):
+                    origin, target = (int(cell) for cell in rng.choice(free, 2))
+
+                search = LPAStar(grid, origin, target)
+
+                self.assertTrue(finish(search))
+
+                for edit in range(30):
+                    y, x = rng.integers(0, 46, 2).tolist()
+                    cells = np.array(
+                        [
+                            cell
+                            for dy in range(3)
+                            for dx in range(3)
+                            if (cell := (y + dy) * 48 + x + dx) not in (origin, target)
+                        ],
+                        dtype=np.intp,
+                    )
+                    value = Cell.WALL if rng.random() < 0.6 else Cell.FREE
+
+                    grid.set_cells(cells, value)
+
+                    with self.subTest(
+                        connectivity=connectivity,
+                        generator=type(generator).__name__,
+                        edit=edit,
+                    ):
+                        self.assertTrue(search.repair(cells))
+
+                        try:
+                            fresh = LPAStar(grid, origin, target)
+                        except UnreachableError:
+                            self.assertFalse(finish(search))
+                            continue
+
+                        self.assertTrue(finish(search))
+                        self.assertTrue(finish(fresh))
+
+                        assert search.path is not None and fresh.path is not None
+
+                        self.assertEqual(search.path[0], origin)
+                        self.assertEqual(search.path[-1], target)
+                        self.assertTrue(
+                            np.all(grid.cells.reshape(-1)[search.path] != Cell.WALL)
+                        )
+                        self.assertEqual(
+                            grid.path_cost(search.path), grid.path_cost(fresh.path)
+                        )
+                        self.assertEqual(
+                            search.distance[target], fresh.distance[target]
+                        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import heapq
+import unittest
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.algorithm_manager import AlgorithmManager
+from lib.algorithms import Algorithm, UnreachableError
+from lib.algorithms.bfs import BFS
+from lib.algorithms.bibfs import BiBFS
+from lib.algorithms.flood import Flood
+from lib.algorithms.hpa import HPAStar
+from lib.algorithms.level_bfs import LevelBFS
+from lib.generators import GENERATORS
+from lib.grid import Cell, Grid
+
+# searches that count moves rather than price them
+BREADTH_FIRST = (BFS, BiBFS, LevelBFS, Flood)
+
+
+def queries(connectivity: int):
+    for generator in GENERATORS:
+        grid = Grid.generate(
+            33,
+            41,
+            0,
+            33 * 41 - 1,
+            Grid.kernel_rng(generator.__name__),
+            connectivity=connectivity,
+            generator=generator(),
+        )
+        free = np.flatnonzero(grid.cells.reshape(-1) != Cell.WALL)
+        rng = np.random.default_rng(connectivity)
+
+        for _ in range(3):
+            origin, target = (int(cell) for cell in rng.choice(free, 2, replace=False))
+
+            if grid.connected(origin, target):
+                yield grid, origin, target
+
+
+def flood(grid: Grid, origin: int, target: int) -> int:
+    search = Flood(grid, origin, target)
+    search.run_to_completion()
+
+    return int(search.distance[target])
+
+
+# the cheapest cost of every cell by Dijkstra, sums of moves are exact so
+# the searches have to match it to the last bit
+def costs(grid: Grid, origin: int) -> npt.NDArray[np.float64]:
+    cost = np.full(grid.height * grid.width, np.inf)
+    cost[origin] = 0
+    queue = [(0.0, origin)]
+
+    while len(queue) > 0:
+        distance, cell = heapq.heappop(queue)
+
+        if distance > cost[cell]:
+            continue
+
+        for delta, move in grid.moves[grid.passable[cell]]:
+            if distance + move < cost[cell + delta]:
+                cost[cell + delta] = distance + move
+                heapq.heappush(queue, (distance + move, cell + delta))
+
+    return cost
+
+
+def solve(algorithm: type[Algorithm], grid: Grid, origin: int, target: int):
+    search = algorithm(grid, origin, target)
+
+    if not search.run_to_completion().solution_found:
+        return None
+
+    search.construct_path()
+
+    return search.path
+
+
+class TestSearches(unittest.TestCase):
+    def assertWalks(
+        self, grid: Grid, path: npt.NDArray[np.intp], origin: int, target: int
+    ):
+        self.assertEqual(path[0], origin)
+        self.assertEqual(path[-1], target)
+
+        for a, b in zip(path[:-1].tolist(), path[1:].tolist()):
+            self.assertIn(b - a, grid.adjacency[grid.passable[a]])
+
+    def test_paths_match_the_flood_distance(self):
+        for connectivity in (4, 8):
+            for grid, origin, target in queries(connectivity):
+                moves = flood(grid, origin, target)
+                cost = costs(grid, origin)[target]
+
+                for algorithm in AlgorithmManager.ALGORITHMS:
+                    with self.subTest(algorithm.__name__, connectivity=connectivity):
+                        path = solve(algorithm, grid, origin, target)
+
+                        self.assertIsNotNone(path)
+                        assert path is not None
+
+                        self.assertWalks(grid, path, origin, target)
+
+                        if algorithm is HPAStar:
+                            # the abstraction trades optimality for speed
+                            self.assertGreaterEqual(len(path) - 1, moves)
+                        elif algorithm in BREADTH_FIRST or connectivity == 4:
+                            self.assertEqual(len(path) - 1, moves)
+                        else:
+                            self.assertGreaterEqual(len(path) - 1, moves)
+                            self.assertEqual(grid.path_cost(path), cost)
+
+    def test_edits_decide_reachability(self):
+        cells = np.zeros((9, 9), dtype=np.int8)
+        cells[4] = Cell.WALL
+        grid = Grid(cells, 8)
+        origin, target = 0, 9 * 9 - 1
+
+        for algorithm in AlgorithmManager.ALGORITHMS:
+            with self.subTest(algorithm.__name__), self.assertRaises(UnreachableError):
+                algorithm(grid, origin, target)
+
+        # a gap at the far end of the wall joins both halves again
+        grid.set_cell(4 * 9 + 8, Cell.FREE)
+
+        for algorithm in AlgorithmManager.ALGORITHMS:
+            with self.subTest(algorithm.__name__, gap=True):
+                path = solve(algorithm, grid, origin, target)
+
+                self.assertIsNotNone(path)
+                assert path is not None
+
+                self.assertWalks(grid, path, origin, target)
+                self.assertIn(4 * 9 + 8, path.tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
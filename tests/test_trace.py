@@ -0,0 +1,103 @@
+import io
+import unittest
+
+import numpy as np
+import numpy.typing as npt
+
+from lib.algorithm_manager import AlgorithmManager
+from lib.algorithms import Algorithm
+from lib.grid import Grid
+from lib.trace import Mark, Trace
+
+
+def marks(search: Algorithm) -> npt.NDArray[np.uint8]:
+    current = np.zeros(search.grid.height * search.grid.width, dtype=np.uint8)
+    current[search.explored()] = Mark.EXPLORED
+    current[search.frontier()] = Mark.FRONTIER
+
+    return current
+
+
+def corner_to_corner(height: int, width: int, connectivity: int = 4) -> Grid:
+    for kernel in map(str, range(100)):
+        grid = Grid.generate(
+            height,
+            width,
+            0,
+            height * width - 1,
+            Grid.kernel_rng(kernel),
+            connectivity=connectivity,
+        )
+
+        if grid.connected(0, height * width - 1):
+            return grid
+
+    raise AssertionError("no kernel connects the corners")
+
+
+class TestTrace(unittest.TestCase):
+    def test_seeking_matches_the_search(self):
+        for connectivity in (4, 8):
+            grid = corner_to_corner(29, 35, connectivity)
+
+            for algorithm in AlgorithmManager.ALGORITHMS:
+                with self.subTest(algorithm.__name__, connectivity=connectivity):
+                    trace = Trace.record(algorithm(grid, 0, 29 * 35 - 1), 5)
+
+                    # searches are deterministic, a twin stepped alongside
+                    # shows what every step of the trace has to look like
+                    twin = algorithm(grid, 0, 29 * 35 - 1)
+                    states = [marks(twin)]
+
+                    while twin.step() is None:
+                        states.append(marks(twin))
+
+                    states.append(marks(twin))
+
+                    self.assertEqual(trace.steps, len(states) - 1)
+
+                    for step in range(trace.steps + 1):
+                        np.testing.assert_array_equal(
+                            trace.marks_at(step), states[step]
+                        )
+
+                    twin.construct_path()
+                    np.testing.assert_array_equal(trace.path, twin.path)
+
+    def test_replay_in_chunks(self):
+        grid = corner_to_corner(40, 40)
+
+        for algorithm in AlgorithmManager.ALGORITHMS:
+            with self.subTest(algorithm.__name__):
+                trace = Trace.record(algorithm(grid, 0, 40 * 40 - 1), 16)
+                current = trace.marks_at(0)
+
+                for start in range(0, trace.steps, 7):
+                    trace.apply(current, start, min(start + 7, trace.steps))
+
+                np.testing.assert_array_equal(current, trace.marks_at(trace.steps))
+
+    def test_save_and_load_round_trip(self):
+        grid = corner_to_corner(33, 27, 8)
+        trace = Trace.record(AlgorithmManager.ALGORITHMS[0](grid, 0, 33 * 27 - 1), 8)
+        file = io.BytesIO()
+
+        trace.save(file)
+        file.seek(0)
+        loaded = Trace.load(file)
+
+        self.assertEqual(loaded.steps, trace.steps)
+        self.assertEqual(loaded.keyframe_interval, trace.keyframe_interval)
+
+        for name in Trace.__slots__:
+            with self.subTest(name):
+                np.testing.assert_array_equal(
+                    getattr(loaded, name), getattr(trace, name)
+                )
+
+        for step in range(0, trace.steps + 1, 3):
+            np.testing.assert_array_equal(loaded.marks_at(step), trace.marks_at(step))
+
+
+if __name__ == "__main__":
+    unittest.main()